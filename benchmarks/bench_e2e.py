@@ -0,0 +1,228 @@
+"""End to end benchmarks of the FordConnect client against the local stand-in
+
+Starts benchmarks/fordconnect_standin.py in process and measures, through
+the real Account and Vehicle code:
+
+  refresh   latency of the status fetch a coordinator refresh performs
+  command   lock round trip, from POST to the refreshed status, and a
+            forced status/location refresh
+  token     token refreshes caused by concurrent requests near expiry
+  fleet     status_all throughput with many vehicles on one account
+  outage    refreshes while every request fails, served from the cache
+            once the circuit breaker opens, and the recovery probe
+
+Everything runs offline. Needs aiohttp and Home Assistant installed:
+
+    python benchmarks/bench_e2e.py [--latency 0.05] [--vehicles 200] [--error-rate 0.02]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import aiohttp
+
+from fordconnect_standin import FordConnectStandin, StandinConfig
+
+from custom_components.fordpass.circuit_breaker import CircuitBreakers
+from custom_components.fordpass.fordpass_new import Account
+from custom_components.fordpass.persistence import atomic_write_json
+from custom_components.fordpass.rate_limit import RateLimiter
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * pct / 100), len(samples) - 1)]
+
+
+def report(name, samples):
+    print(
+        f"{name:<28} n={len(samples):<5} p50={percentile(samples, 50) * 1000:8.1f} ms"
+        f"  p95={percentile(samples, 95) * 1000:8.1f} ms  max={max(samples) * 1000:8.1f} ms"
+    )
+
+
+def make_account(session, standin, directory, client_id="bench"):
+    """Return an Account talking to the stand-in with its own token and cache files"""
+    account = Account(
+        session, client_id, "secret",
+        api_url=standin.api_url,
+        token_url=standin.token_url,
+        token_location=os.path.join(directory, client_id + "_token.txt"),
+        cache_location=os.path.join(directory, "cache", client_id) + "/",
+    )
+    # The stand-in has its own limits, don't let the client budget skew timings
+    account.rate_limiter = RateLimiter(limit=10 ** 9, reserve=0)
+    return account
+
+
+def write_token(account, standin, expires_in):
+    token = standin.token()
+    token["expires_on"] = int(time.time()) + expires_in
+    atomic_write_json(account.token_location, token)
+
+
+async def bench_refresh(session, standin, directory, rounds):
+    # Uses the account's own connection pool, like the integration does
+    account = make_account(None, standin, directory, "refresh")
+    write_token(account, standin, 3600)
+    vehicle = account.vehicle(next(iter(standin.vehicles)))
+
+    uncached, unchanged = [], []
+    for index in range(rounds):
+        vin = vehicle.vin
+        standin.update_vehicle(vin, "vehicleDetails", "odometer", 1000.0 + index)
+        start = time.perf_counter()
+        await vehicle.status(cached=False)
+        uncached.append(time.perf_counter() - start)
+
+        # Nothing changed on the car, the conditional request gets a 304
+        start = time.perf_counter()
+        await vehicle.status(cached=False)
+        unchanged.append(time.perf_counter() - start)
+
+    report("refresh (changed)", uncached)
+    report("refresh (304 not modified)", unchanged)
+    print(f"connection reuse             {account.metrics.connection_reuse}% {dict(account.metrics.connections)}")
+    await account.async_close()
+
+
+async def bench_command(session, standin, directory, rounds):
+    account = make_account(session, standin, directory, "command")
+    write_token(account, standin, 3600)
+    vehicle = account.vehicle(next(iter(standin.vehicles)))
+    await vehicle.status(cached=False)
+
+    samples = []
+    failures = 0
+    for index in range(rounds):
+        command = vehicle.lock if index % 2 else vehicle.unlock
+        start = time.perf_counter()
+        if not await command():
+            failures += 1
+        samples.append(time.perf_counter() - start)
+
+    report(f"command (completes {standin.config.command_time:.1f}s)", samples)
+    if failures:
+        print(f"  {failures} commands did not complete")
+
+    # Forced refresh: status and location commands, then the v3 status
+    samples = []
+    downloads = standin.counters["status"]
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await vehicle.request_update()
+        samples.append(time.perf_counter() - start)
+    report("forced refresh", samples)
+    print(f"  {(standin.counters['status'] - downloads) / rounds:.1f} status downloads per refresh")
+    await account.async_close()
+
+
+async def bench_token(session, standin, directory, concurrency):
+    vin = next(iter(standin.vehicles))
+    for label, expires_in in (("expired", -10), ("near expiry", 60)):
+        account = make_account(session, standin, directory, "token-" + label.replace(" ", "-"))
+        write_token(account, standin, expires_in)
+        vehicle = account.vehicle(vin)
+        before = standin.counters["token"]
+
+        start = time.perf_counter()
+        await asyncio.gather(*(vehicle.status(cached=False) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        # A proactive refresh runs in the background, give it time to land
+        await asyncio.sleep(standin.config.latency * 2 + 0.1)
+
+        print(
+            f"token ({label:<11})          {concurrency} concurrent requests in {elapsed * 1000:.1f} ms,"
+            f" {standin.counters['token'] - before} token refresh(es)"
+        )
+        await account.async_close()
+
+
+async def bench_fleet(session, standin, directory, rounds):
+    account = make_account(session, standin, directory, "fleet")
+    write_token(account, standin, 3600)
+    for vin in standin.vehicles:
+        account.vehicle(vin)
+
+    samples = []
+    errors = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        results = await account.status_all(cached=False)
+        samples.append(time.perf_counter() - start)
+        errors += sum(isinstance(result, Exception) for result in results.values())
+
+    best = min(samples)
+    print(
+        f"fleet ({len(standin.vehicles)} vehicles)".ljust(28)
+        + f" best={best * 1000:8.1f} ms  {len(standin.vehicles) / best:8.1f} vehicles/s"
+        + (f"  {errors} errors" if errors else "")
+    )
+    await account.async_close()
+
+
+async def bench_outage(session, standin, directory, rounds):
+    account = make_account(session, standin, directory, "outage")
+    # Short open time so the benchmark sees the probe close the circuit again
+    account.breakers = CircuitBreakers(open_time=2)
+    write_token(account, standin, 3600)
+    vehicle = account.vehicle(next(iter(standin.vehicles)))
+    await vehicle.status(cached=False)
+
+    error_rate, standin.config.error_rate = standin.config.error_rate, 1.0
+    errors = standin.counters["errors"]
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await vehicle.status(cached=False)
+        samples.append(time.perf_counter() - start)
+    report("refresh during outage", samples)
+    print(
+        f"outage: {standin.counters['errors'] - errors} failed requests for {rounds} refreshes,"
+        f" breaker {account.breakers.as_dict()['status']['state']},"
+        f" {account.metrics.cache['fallback']} served from cache"
+    )
+
+    standin.config.error_rate = error_rate
+    await asyncio.sleep(2.5)
+    start = time.perf_counter()
+    await vehicle.status(cached=False)
+    print(
+        f"recovery probe               {(time.perf_counter() - start) * 1000:8.1f} ms,"
+        f" breaker {account.breakers.as_dict()['status']['state']}"
+    )
+    await account.async_close()
+
+
+async def main(args):
+    config = StandinConfig(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        command_time=args.command_time, vehicles=args.vehicles,
+    )
+    standin = await FordConnectStandin(config).start()
+
+    with tempfile.TemporaryDirectory() as directory:
+        async with aiohttp.ClientSession() as session:
+            await bench_refresh(session, standin, directory, args.rounds)
+            await bench_command(session, standin, directory, max(args.rounds // 10, 2))
+            await bench_token(session, standin, directory, args.concurrency)
+            await bench_fleet(session, standin, directory, 3)
+            await bench_outage(session, standin, directory, args.rounds)
+
+    await standin.stop()
+    print("stand-in requests:", ", ".join(f"{key}={value}" for key, value in standin.counters.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FordPass end to end benchmarks")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--command-time", type=float, default=1.5)
+    parser.add_argument("--vehicles", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,131 @@
+"""Fleet refreshes within the request budget, against the local stand-in
+
+Runs simulated vehicles on one account through the integration's refresh
+path: a FordPassDataUpdateCoordinator per vehicle, refreshed by the
+FleetRefresher, with the account's real RateLimiter (RATE_LIMIT_REQUESTS
+per RATE_LIMIT_WINDOW, shared by every vehicle of the client_id). Once the
+refresher schedules without regard for the budget, once with the per
+vehicle interval sized to it. Reports the requests that reached the API,
+the refreshes the limiter turned away, the refreshes answered from the
+cache and how late a 5 ms timer on the same event loop fires. Runs
+offline, needs aiohttp and Home Assistant:
+
+    python benchmarks/bench_fleet.py [--vehicles 500] [--interval 60] [--latency 0.1]
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+
+from bench_e2e import make_account, percentile, write_token
+from fordconnect_standin import FordConnectStandin, StandinConfig
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.fordpass import FordPassDataUpdateCoordinator
+from custom_components.fordpass.fleet import FleetRefresher
+from custom_components.fordpass.rate_limit import RateLimited, RateLimiter
+
+PROBE_INTERVAL = 0.005
+
+
+class CountingLimiter(RateLimiter):
+    """The integration's limiter, counting the requests it turned away"""
+
+    def __init__(self):
+        super().__init__()
+        self.skipped = 0
+
+    async def acquire(self, urgent=False):
+        try:
+            await super().acquire(urgent)
+        except RateLimited:
+            self.skipped += 1
+            raise
+
+
+async def probe_loop(lags, stop):
+    """Record how late a short sleep wakes up, a measure of event loop blocking"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - start - PROBE_INTERVAL)
+
+
+async def run_fleet(hass, account, standin, vins, interval, budgeted):
+    coordinators = {
+        vin: FordPassDataUpdateCoordinator(hass, account, vin, interval, fleet=True)
+        for vin in vins
+    }
+    latencies = []
+
+    async def refresh(vin):
+        start = time.perf_counter()
+        await coordinators[vin].async_refresh()
+        latencies.append(time.perf_counter() - start)
+        return coordinators[vin].refresh_interval.total_seconds()
+
+    min_interval = None
+    if budgeted:
+        min_interval = lambda: account.rate_limiter.polling_interval(len(account.vins))  # noqa: E731
+
+    requests = standin.counters["status"]
+    lags, stop = [], asyncio.Event()
+    probe = asyncio.ensure_future(probe_loop(lags, stop))
+
+    refresher = FleetRefresher(refresh, interval, tick=0.25, min_interval=min_interval)
+    refresher.add(vins)
+    refresher.start()
+    await asyncio.sleep(interval + 1)
+    refresher.stop()
+
+    stop.set()
+    await probe
+
+    name = "budgeted" if budgeted else "unbudgeted"
+    every = max(interval, refresher.budget_interval())
+    print(
+        f"{name:<10} {refresher.refreshes:5d} refreshes in {interval}s, each vehicle every {every:7.0f}s"
+        f"  API requests={standin.counters['status'] - requests:4d}"
+        f" turned away={account.rate_limiter.skipped:4d}"
+        f" from cache={account.metrics.cache['fallback']:4d}"
+    )
+    if latencies:
+        print(
+            f"{'':<10} refresh p50={percentile(latencies, 50) * 1000:7.1f} ms p95={percentile(latencies, 95) * 1000:7.1f} ms"
+            f"  loop lag p99={percentile(lags, 99) * 1000:6.2f} ms max={max(lags) * 1000:6.2f} ms"
+        )
+
+
+async def main(args):
+    config = StandinConfig(latency=args.latency, jitter=args.latency / 2, vehicles=args.vehicles)
+    standin = await FordConnectStandin(config).start()
+    vins = list(standin.vehicles)
+
+    with tempfile.TemporaryDirectory() as directory:
+        hass = HomeAssistant(directory)
+        # Keep the output to the results, the refresher warns when it stretches the interval
+        logging.basicConfig(level=logging.CRITICAL)
+        for budgeted in (False, True):
+            account = make_account(None, standin, directory, "fleet-" + str(budgeted))
+            # Unlike the other benchmarks, the client budget is what is measured here
+            account.rate_limiter = CountingLimiter()
+            write_token(account, standin, 3600)
+            for vin in vins:
+                account.vehicle(vin)
+            await run_fleet(hass, account, standin, vins, args.interval, budgeted)
+            await account.async_close()
+        await hass.async_stop(force=True)
+
+    await standin.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FordPass fleet benchmark")
+    parser.add_argument("--vehicles", type=int, default=500)
+    parser.add_argument("--interval", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.1)
+    asyncio.run(main(parser.parse_args()))
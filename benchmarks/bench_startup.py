@@ -0,0 +1,116 @@
+"""Compare entry setup time with and without a stored snapshot
+
+Boots Home Assistant in a temporary config directory and sets up a FordPass
+entry through async_setup_entry, with the entry's account talking to the
+FordConnect stand-in (benchmarks/fordconnect_standin.py) at the given API
+latency. The cold setup has no snapshot and waits for the first v3 status
+fetch. The restored setup loads the snapshot the cold one stored, creates
+the entities from it and fetches live data in the background. Needs aiohttp
+and Home Assistant installed:
+
+    python benchmarks/bench_startup.py [api latency in seconds] [rounds]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from bench_e2e import make_account, write_token
+from fordconnect_standin import FordConnectStandin, StandinConfig
+
+from homeassistant import bootstrap, runner
+from homeassistant.config_entries import ConfigEntry
+
+from custom_components.fordpass.const import (
+    ACCOUNTS,
+    CONF_DISTANCE_UNIT,
+    CONF_PRESSURE_UNIT,
+    COORDINATOR,
+    DEFAULT_DISTANCE_UNIT,
+    DEFAULT_PRESSURE_UNIT,
+    DOMAIN,
+    VIN,
+)
+
+
+async def start_hass(config_dir):
+    """Boot Home Assistant with an empty configuration"""
+    with open(os.path.join(config_dir, "configuration.yaml"), "w", encoding="utf-8") as outfile:
+        outfile.write("homeassistant:\n  name: bench\n")
+    hass = await bootstrap.async_setup_hass(runner.RuntimeConfig(config_dir=config_dir, skip_pip=True))
+    # Bootstrap enables logging, keep the output to the results
+    logging.getLogger().setLevel(logging.CRITICAL)
+    return hass
+
+
+def use_standin(hass, standin, directory):
+    """Give the entry's client_id an account pointed at the stand-in
+
+    async_setup_entry takes the account registered for its client_id, the
+    same way entries on one client_id share it.
+    """
+    account = make_account(None, standin, directory)
+    write_token(account, standin, 3600)
+    hass.data.setdefault(DOMAIN, {}).setdefault(ACCOUNTS, {})[account.client_id] = account
+    return account
+
+
+async def timed_setup(hass, entry, standin, directory, add=False):
+    use_standin(hass, standin, directory)
+    downloads = standin.counters["status"]
+    start = time.perf_counter()
+    if add:
+        await hass.config_entries.async_add(entry)
+    else:
+        await hass.config_entries.async_setup(entry.entry_id)
+    elapsed = time.perf_counter() - start
+    if hass.data[DOMAIN].get(entry.entry_id) is None:
+        raise RuntimeError("Setting up the entry failed: " + str(entry.state))
+    return elapsed, standin.counters["status"] - downloads
+
+
+async def main(latency, rounds):
+    standin = await FordConnectStandin(StandinConfig(latency=latency)).start()
+    vin = next(iter(standin.vehicles))
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await start_hass(config_dir)
+        entry = ConfigEntry(
+            version=1, minor_version=1, domain=DOMAIN, title=vin, source="user",
+            data={"client_id": "bench", "client_secret": "secret", VIN: vin},
+            options={CONF_PRESSURE_UNIT: DEFAULT_PRESSURE_UNIT, CONF_DISTANCE_UNIT: DEFAULT_DISTANCE_UNIT},
+        )
+
+        cold, cold_downloads = await timed_setup(hass, entry, standin, config_dir, add=True)
+        coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+        # Write the snapshot now instead of after the save delay
+        await coordinator.snapshot.async_save_now(coordinator.data, coordinator.capabilities)
+
+        restored = []
+        for _ in range(rounds):
+            await hass.config_entries.async_unload(entry.entry_id)
+            elapsed, downloads = await timed_setup(hass, entry, standin, config_dir)
+            restored.append(elapsed)
+            if downloads:
+                raise RuntimeError("Restored setup waited for the API")
+            # Let the background refresh finish before the next round
+            await hass.async_block_till_done()
+
+        entities = len(hass.states.async_entity_ids())
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop(force=True)
+    await standin.stop()
+
+    print(f"API latency: {latency:.2f}s, {entities} entities")
+    print(f"cold setup:     {cold * 1000:9.2f} ms  ({cold_downloads} status download(s) before ready)")
+    print(f"restored setup: {min(restored) * 1000:9.2f} ms  (best of {rounds}, status fetched in the background)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 2.0,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    ))
@@ -0,0 +1,86 @@
+"""Measure the memory held per vehicle with tracemalloc
+
+Simulates a fleet where every refresh parses a new v3 response with one
+changed field. Per vehicle the response stays in the cache and the parsed
+state stays in the coordinator, as in the integration. Compares the old
+merged dict copies with VehicleState, which wraps the response and shares
+unchanged parts with the previous state. Needs Home Assistant installed:
+
+    python benchmarks/bench_state_memory.py [vehicles] [refreshes]
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from common import load_payload
+
+from custom_components.fordpass.state import VehicleState
+
+
+def responses(payload, vins, refreshes):
+    """Yield (vin, freshly parsed response) like the API would deliver them"""
+    for refresh in range(refreshes):
+        for vin in vins:
+            payload["vehicle"]["vehicleId"] = vin
+            payload["vehicle"]["vehicleDetails"]["odometer"] = 20000 + refresh
+            yield vin, json.loads(json.dumps(payload))
+
+
+def run(payload, vins, refreshes, parse):
+    cache, states = {}, {}
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for vin, result in responses(payload, vins, refreshes):
+        states[vin] = parse(result, states.get(vin))
+        cache[vin] = result
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak, elapsed, (cache, states)
+
+
+def parse_dict(result, previous):
+    """The merged document Vehicle.status built before VehicleState"""
+    return {
+        **result["vehicle"],
+        "metrics": {
+            **result["vehicle"]["vehicleStatus"],
+            **result["vehicle"]["vehicleDetails"]
+        }
+    }
+
+
+def parse_state(result, previous):
+    return VehicleState.from_response(result, previous)
+
+
+def main(vehicles, refreshes):
+    payload = load_payload()
+    vins = [f"1FMCU9J94NU{index:06d}" for index in range(vehicles)]
+
+    print(f"{vehicles} vehicles, {refreshes} refreshes each")
+    baseline = None
+    for name, parse in (("merged dicts", parse_dict), ("VehicleState", parse_state)):
+        current, peak, elapsed, _ = run(payload, vins, refreshes, parse)
+        baseline = baseline or current
+        print(
+            f"{name:<14} held {current / vehicles / 1024:7.1f} KiB/vehicle"
+            f"  peak {peak / 1024 / 1024:7.1f} MiB  {elapsed * 1000:8.1f} ms"
+            f"  ({100 * current / baseline:5.1f}%)"
+        )
+
+    # What the merged copies cost on top of the cached responses
+    cache_only, _, _, _ = run(payload, vins, refreshes, lambda result, previous: None)
+    print(f"responses only held {cache_only / vehicles / 1024:7.1f} KiB/vehicle")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
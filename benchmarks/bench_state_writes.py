@@ -0,0 +1,96 @@
+"""Count FordPass entity state writes per coordinator refresh
+
+Replays the recorded v3 payload through the sensor, lock and switch entities
+and reports how many state writes each refresh causes, compared to writing
+every entity on every refresh. Needs Home Assistant installed:
+
+    python benchmarks/bench_state_writes.py
+"""
+
+from types import SimpleNamespace
+
+from common import load_payload, mutate, vehicle_document
+
+from homeassistant.util.unit_system import METRIC_SYSTEM
+
+from custom_components.fordpass.const import SENSORS, SWITCHES
+from custom_components.fordpass.extractors import SensorValues
+from custom_components.fordpass.fordpass_new import diff_documents
+from custom_components.fordpass.lock import Lock
+from custom_components.fordpass.sensor import CarSensor
+from custom_components.fordpass.switch import Switch
+
+
+def numeric_state_ok(entity):
+    """Return False when HA would refuse the state, a numeric sensor without a number"""
+    try:
+        entity.state  # pylint: disable=pointless-statement
+    except ValueError:
+        return False
+    return True
+
+
+def build_entities(coordinator):
+    """Create the entities the platforms would add for this payload"""
+    entities = [CarSensor(coordinator, key, {}) for key in SENSORS]
+    entities.append(Lock(coordinator))
+    entities.extend(Switch(coordinator, key, {}) for key in SWITCHES)
+
+    writes = {"count": 0}
+
+    def count_write():
+        writes["count"] += 1
+
+    for entity in entities:
+        entity.hass = coordinator.hass
+        entity.async_write_ha_state = count_write
+
+    skipped = [entity.name for entity in entities if not numeric_state_ok(entity)]
+    if skipped:
+        print("skipping sensors without a numeric value in this payload: " + ", ".join(skipped))
+    entities = [entity for entity in entities if entity.name not in skipped]
+    return entities, writes
+
+
+def main():
+    payload = load_payload()
+    refreshes = [
+        ("unchanged", payload),
+        ("unchanged", payload),
+        ("odometer +1", mutate(payload, "vehicle.vehicleDetails.odometer", payload["vehicle"]["vehicleDetails"]["odometer"] + 1)),
+        ("unchanged", payload),
+        ("unlocked", mutate(payload, "vehicle.vehicleStatus.lockStatus", {"value": "UNLOCKED", "timeStamp": "10-18-2026 11:45:00"})),
+        ("lastUpdated moved", mutate(payload, "vehicle.lastUpdated", "10-18-2026 11:50:00")),
+    ]
+
+    coordinator = SimpleNamespace(
+        data=vehicle_document(payload),
+        vin=payload["vehicle"]["vehicleId"],
+        last_update_success=True,
+        hass=SimpleNamespace(config=SimpleNamespace(units=METRIC_SYSTEM)),
+        sensor_values=SensorValues(SENSORS),
+    )
+    coordinator.sensor_values.update(coordinator.data)
+    entities, writes = build_entities(coordinator)
+
+    # First refresh publishes everything, as adding the entities would
+    for entity in entities:
+        entity._handle_coordinator_update()  # pylint: disable=protected-access
+    print(f"{len(entities)} entities, initial publish: {writes['count']} writes")
+
+    total = 0
+    for label, refresh in refreshes:
+        data = vehicle_document(refresh)
+        coordinator.sensor_values.update(data, diff_documents(coordinator.data, data))
+        coordinator.data = data
+        writes["count"] = 0
+        for entity in entities:
+            entity._handle_coordinator_update()  # pylint: disable=protected-access
+        total += writes["count"]
+        print(f"{label:>20}: {writes['count']:3d} writes (always-write: {len(entities)})")
+
+    print(f"total: {total} writes over {len(refreshes)} refreshes, always-write: {len(entities) * len(refreshes)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Time telemetry queries over months of samples
+
+Fills a TelemetryStore per vehicle with one sample every poll interval
+over the given number of days, then times chart sized queries at each
+resolution, with the files already in the page cache and after reopening
+the store. Needs Home Assistant installed:
+
+    python benchmarks/bench_telemetry.py [vehicles] [days] [interval]
+
+Writing is one small append per column file and sample, so filling many
+vehicles takes a while.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from common import load_payload, vehicle_document
+
+from custom_components.fordpass.telemetry import TelemetryStore, extract_telemetry
+
+QUERIES = (
+    ("last day, raw", 86400, None),
+    ("last month, hourly", 30 * 86400, None),
+    ("whole range, daily", None, "day"),
+    ("whole range, hourly", None, "hour"),
+)
+
+
+def fill(store, values, start, days, interval):
+    timestamp = start
+    for index in range(int(days * 86400 / interval)):
+        values["odometer"] += 0.4
+        values["fuelLevel"] = 20 + (index % 500) / 10
+        store.append(timestamp, values)
+        timestamp += interval
+    return timestamp
+
+
+def time_queries(stores, end, days):
+    for name, window, resolution in QUERIES:
+        start = end - (window or days * 86400)
+        began = time.perf_counter()
+        rows = sum(len(store.query(start, end, resolution)["time"]) for store in stores)
+        elapsed = time.perf_counter() - began
+        print(f"  {name:<22} {elapsed / len(stores) * 1000:8.2f} ms/vehicle  {rows // len(stores):6d} rows")
+
+
+def main(vehicles, days, interval):
+    values = extract_telemetry(vehicle_document(load_payload()))
+    start = time.time() - days * 86400
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, str(index)) for index in range(vehicles)]
+        began = time.perf_counter()
+        end = start
+        for path in paths:
+            store = TelemetryStore(path)
+            end = fill(store, dict(values), start, days, interval)
+            store.close()
+        samples = int(days * 86400 / interval)
+        elapsed = time.perf_counter() - began
+        size = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(directory)
+            for name in names
+        )
+        print(
+            f"{vehicles} vehicles, {samples} samples each: written in {elapsed:.1f} s,"
+            f" {size / vehicles / 1024:.0f} KiB/vehicle on disk"
+        )
+
+        began = time.perf_counter()
+        stores = [TelemetryStore(path) for path in paths]
+        print(f"reopened in {(time.perf_counter() - began) / vehicles * 1000:.2f} ms/vehicle")
+        print("first queries")
+        time_queries(stores, end, days)
+        print("repeated queries")
+        time_queries(stores, end, days)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 180,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 300,
+    )
@@ -0,0 +1,36 @@
+"""Shared helpers for the FordPass benchmarks"""
+
+import copy
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAYLOADS = os.path.join(ROOT, "benchmarks", "payloads")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from custom_components.fordpass.state import VehicleState  # noqa: E402
+
+
+def load_payload(name="vehicle_v3.json"):
+    """Load a recorded API response"""
+    with open(os.path.join(PAYLOADS, name), encoding="utf-8") as infile:
+        return json.load(infile)
+
+
+def vehicle_document(payload):
+    """Build the coordinator document from a v3 response, as Vehicle.status does"""
+    return VehicleState.from_response(payload)
+
+
+def mutate(payload, path, value):
+    """Return a copy of the payload with one dotted path replaced"""
+    payload = copy.deepcopy(payload)
+    target = payload
+    keys = path.split(".")
+    for key in keys[:-1]:
+        target = target[key]
+    target[keys[-1]] = value
+    return payload
@@ -0,0 +1,283 @@
+"""Local stand-in for the FordConnect API, for benchmarks that run offline
+
+Serves the OAuth token endpoint, v2/vehicles, v3/vehicles/{vin} and the v1
+command and command status endpoints with recorded payloads. Latency, 429s,
+5xx errors and the time commands take to complete are configurable. Point an
+Account at it with api_url=standin.api_url and token_url=standin.token_url.
+
+    python benchmarks/fordconnect_standin.py --port 9900 --latency 0.2 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import copy
+import random
+import time
+import uuid
+from collections import Counter
+
+from aiohttp import web
+
+from common import load_payload
+
+TOKEN_PATH = "/oauth2/v2.0/token"
+
+
+def make_vin(index):
+    """Return a unique VIN for the n-th simulated vehicle"""
+    return f"1FMCU9J94NU{index:06d}"
+
+
+class StandinConfig:
+    """Behaviour of the stand-in server"""
+
+    def __init__(
+        self, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=0, rate_window=3600,
+        retry_after=60, command_time=2.0, command_failure_rate=0.0, vehicles=1, token_lifetime=1200
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        # Share of API requests answered with a 503
+        self.error_rate = error_rate
+        # Requests allowed per rate_window before 429s, 0 for no limit
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.retry_after = retry_after
+        self.command_time = command_time
+        self.command_failure_rate = command_failure_rate
+        self.vehicles = vehicles
+        self.token_lifetime = token_lifetime
+
+
+class FordConnectStandin:
+    """aiohttp application that behaves like the parts of FordConnect we use"""
+
+    def __init__(self, config=None, payload=None):
+        self.config = config or StandinConfig()
+        self.payload = payload or load_payload()
+        self.vehicles = {}
+        self.commands = {}
+        self.counters = {"token": 0, "vehicles": 0, "status": 0, "command": 0, "command_status": 0,
+                         "not_modified": 0, "rate_limited": 0, "errors": 0}
+        # Status downloads per VIN
+        self.status_requests = Counter()
+        self._requests = []
+        self._runner = None
+        self.base_url = None
+
+        for index in range(self.config.vehicles):
+            vin = make_vin(index) if self.config.vehicles > 1 else self.payload["vehicle"]["vehicleId"]
+            self.add_vehicle(vin)
+
+        self.app = web.Application(middlewares=[self._simulate])
+        self.app.router.add_post(TOKEN_PATH, self.handle_token)
+        self.app.router.add_get("/api/fordconnect/v2/vehicles", self.handle_vehicles)
+        self.app.router.add_get("/api/fordconnect/v3/vehicles/{vin}", self.handle_status)
+        self.app.router.add_post("/api/fordconnect/v1/vehicles/{vin}/{command}", self.handle_command)
+        self.app.router.add_get("/api/fordconnect/v1/vehicles/{vin}/{command}/{command_id}", self.handle_command_status)
+
+    @property
+    def api_url(self):
+        return self.base_url + "/api/fordconnect"
+
+    @property
+    def token_url(self):
+        return self.base_url + TOKEN_PATH
+
+    def add_vehicle(self, vin):
+        """Add a simulated vehicle based on the recorded payload"""
+        document = copy.deepcopy(self.payload)
+        document["vehicle"]["vehicleId"] = vin
+        self.vehicles[vin] = {"document": document, "version": 0}
+
+    def update_vehicle(self, vin, section, key, value):
+        """Change a vehicleStatus/vehicleDetails field, as the car would"""
+        vehicle = self.vehicles[vin]
+        vehicle["document"]["vehicle"][section][key] = value
+        vehicle["version"] += 1
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start serving, port 0 picks a free port"""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+        self.base_url = f"http://{host}:{port}"
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _rate_limited(self):
+        if not self.config.rate_limit:
+            return False
+        now = time.time()
+        self._requests = [t for t in self._requests if t > now - self.config.rate_window]
+        if len(self._requests) >= self.config.rate_limit:
+            return True
+        self._requests.append(now)
+        return False
+
+    @web.middleware
+    async def _simulate(self, request, handler):
+        delay = self.config.latency + random.uniform(0, self.config.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if request.path != TOKEN_PATH:
+            if not request.headers.get("authorization", "").startswith("Bearer "):
+                return web.json_response({"error": "unauthorized"}, status=401)
+            if self._rate_limited():
+                self.counters["rate_limited"] += 1
+                return web.json_response(
+                    {"error": "Too Many Requests"}, status=429,
+                    headers={"Retry-After": str(self.config.retry_after)}
+                )
+            if random.random() < self.config.error_rate:
+                self.counters["errors"] += 1
+                return web.json_response({"error": "Service Unavailable"}, status=503)
+
+        return await handler(request)
+
+    def token(self):
+        """Return a token document like the b2clogin endpoint does"""
+        now = int(time.time())
+        return {
+            "access_token": uuid.uuid4().hex,
+            "refresh_token": uuid.uuid4().hex,
+            "token_type": "Bearer",
+            "expires_in": self.config.token_lifetime,
+            "expires_on": now + self.config.token_lifetime,
+            "not_before": now,
+        }
+
+    async def handle_token(self, request):
+        self.counters["token"] += 1
+        form = await request.post()
+        if form.get("grant_type") not in ("authorization_code", "refresh_token"):
+            return web.json_response({"error": "unsupported_grant_type"}, status=400)
+        return web.json_response(self.token())
+
+    async def handle_vehicles(self, request):
+        self.counters["vehicles"] += 1
+        return web.json_response({
+            "status": "SUCCESS",
+            "vehicles": [
+                {
+                    "vehicleId": vin,
+                    "make": vehicle["document"]["vehicle"]["make"],
+                    "modelName": vehicle["document"]["vehicle"]["modelName"],
+                    "modelYear": vehicle["document"]["vehicle"]["modelYear"],
+                    "nickName": vehicle["document"]["vehicle"]["nickName"],
+                }
+                for vin, vehicle in self.vehicles.items()
+            ],
+        })
+
+    async def handle_status(self, request):
+        self.counters["status"] += 1
+        self.status_requests[request.match_info["vin"]] += 1
+        vehicle = self.vehicles.get(request.match_info["vin"])
+        if vehicle is None:
+            return web.json_response({"status": "FAILED", "error": "vehicle not found"}, status=404)
+
+        etag = f'"{request.match_info["vin"]}-{vehicle["version"]}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.counters["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.json_response(vehicle["document"], headers={"ETag": etag})
+
+    async def handle_command(self, request):
+        self.counters["command"] += 1
+        vin = request.match_info["vin"]
+        if vin not in self.vehicles:
+            return web.json_response({"status": "FAILED", "error": "vehicle not found"}, status=404)
+
+        command_id = uuid.uuid4().hex
+        failed = random.random() < self.config.command_failure_rate
+        self.commands[command_id] = {
+            "vin": vin,
+            "command": request.match_info["command"],
+            "done_at": time.time() + self.config.command_time,
+            "result": "FAILED" if failed else "COMPLETED",
+            "applied": False,
+        }
+        return web.json_response({"status": "SUCCESS", "commandStatus": "QUEUED", "commandId": command_id}, status=202)
+
+    async def handle_command_status(self, request):
+        self.counters["command_status"] += 1
+        command = self.commands.get(request.match_info["command_id"])
+        if command is None:
+            return web.json_response({"status": "FAILED", "error": "command not found"}, status=404)
+
+        if time.time() < command["done_at"]:
+            status = "PENDINGRESPONSE"
+        else:
+            status = command["result"]
+            if status == "COMPLETED" and not command["applied"]:
+                command["applied"] = True
+                self._apply(command)
+        return web.json_response({"status": "SUCCESS", "commandStatus": status, "commandId": request.match_info["command_id"]})
+
+    def _apply(self, command):
+        states = {"lock": "LOCKED", "unlock": "UNLOCKED"}
+        if command["command"] in states:
+            self.update_vehicle(command["vin"], "vehicleStatus", "lockStatus", {
+                "value": states[command["command"]],
+                "timeStamp": time.strftime("%m-%d-%Y %H:%M:%S", time.gmtime()),
+            })
+        elif command["command"] in ("startEngine", "stopEngine"):
+            self.update_vehicle(command["vin"], "vehicleStatus", "remoteStartStatus", {
+                "status": "ENGINE_RUNNING" if command["command"] == "startEngine" else "ENGINE_STOPPED",
+                "duration": 0,
+                "timeStamp": time.strftime("%m-%d-%Y %H:%M:%S", time.gmtime()),
+            })
+        else:
+            self.vehicles[command["vin"]]["version"] += 1
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9900)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 503")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per window before 429s, 0 for none")
+    parser.add_argument("--rate-window", type=int, default=3600)
+    parser.add_argument("--retry-after", type=int, default=60)
+    parser.add_argument("--command-time", type=float, default=2.0, help="seconds until commands complete")
+    parser.add_argument("--command-failure-rate", type=float, default=0.0)
+    parser.add_argument("--vehicles", type=int, default=1)
+    parser.add_argument("--token-lifetime", type=int, default=1200)
+    return parser.parse_args(args)
+
+
+def config_from_args(args):
+    return StandinConfig(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, rate_window=args.rate_window, retry_after=args.retry_after,
+        command_time=args.command_time, command_failure_rate=args.command_failure_rate,
+        vehicles=args.vehicles, token_lifetime=args.token_lifetime,
+    )
+
+
+async def serve(args):
+    standin = await FordConnectStandin(config_from_args(args)).start(args.host, args.port)
+    print(f"api_url:   {standin.api_url}")
+    print(f"token_url: {standin.token_url}")
+    print(f"vehicles:  {', '.join(list(standin.vehicles)[:5])}{' ...' if len(standin.vehicles) > 5 else ''}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await standin.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,93 @@
+"""POST recorded vehicle payloads to the push mode webhook of an entry
+
+Sends the recorded v3 response once as a full update, then a stream of
+partial updates as a driving car would report them: location and speed
+changes, a lock, and fuel and odometer changes, each with a later
+lastUpdated. Prints what the webhook answered. Needs aiohttp:
+
+    python benchmarks/push_payloads.py http://localhost:8123/api/webhook/<id> VIN [--count 50] [--delay 1]
+
+With --stale every fifth update repeats an old lastUpdated, which the
+integration should count as stale instead of applying.
+"""
+
+import argparse
+import asyncio
+import copy
+import datetime
+import time
+from collections import Counter
+
+import aiohttp
+
+from common import load_payload
+
+TIME_FORMAT = "%m-%d-%Y %H:%M:%S"
+
+
+def api_time(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime(TIME_FORMAT)
+
+
+def updates(vin, count, stale):
+    """Yield the full document and then count partial updates"""
+    payload = load_payload()
+    vehicle = copy.deepcopy(payload["vehicle"])
+    vehicle["vehicleId"] = vin
+    now = time.time() - count * 60
+    vehicle["lastUpdated"] = api_time(now)
+    yield {"vehicle": vehicle}
+
+    location = dict(vehicle["vehicleLocation"])
+    odometer = vehicle["vehicleDetails"]["odometer"]
+    fuel = vehicle["vehicleDetails"]["fuelLevel"]["value"]
+    for index in range(1, count + 1):
+        timestamp = now + index * 60
+        if stale and index % 5 == 0:
+            timestamp = now
+        update = {"vin": vin, "lastUpdated": api_time(timestamp)}
+        if index % 10 == 0:
+            update["vehicleStatus"] = {"lockStatus": {"value": "LOCKED", "timeStamp": api_time(timestamp)}}
+        elif index % 4 == 0:
+            odometer += 1.2
+            fuel -= 0.1
+            update["vehicleDetails"] = {
+                "odometer": round(odometer, 1),
+                "mileage": round(odometer, 1),
+                "fuelLevel": {**vehicle["vehicleDetails"]["fuelLevel"], "value": round(fuel, 1), "timeStamp": api_time(timestamp)},
+            }
+        else:
+            location = {
+                **location,
+                "latitude": round(location["latitude"] + 0.0021, 5),
+                "longitude": round(location["longitude"] + 0.0013, 5),
+                "speed": 48.0,
+                "timeStamp": api_time(timestamp),
+            }
+            update["vehicleLocation"] = location
+        yield update
+
+
+async def main(args):
+    results = Counter()
+    async with aiohttp.ClientSession() as session:
+        for update in updates(args.vin, args.count, args.stale):
+            start = time.perf_counter()
+            async with session.post(args.url, json=update) as response:
+                body = await response.json(content_type=None)
+            elapsed = (time.perf_counter() - start) * 1000
+            kind = "full" if "vehicle" in update else ",".join(key for key in update if key not in ("vin", "lastUpdated"))
+            print(f"{response.status} {elapsed:6.1f} ms  {kind:<16} {body}")
+            results[response.status] += 1
+            await asyncio.sleep(args.delay)
+    print("responses by status:", dict(results))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Post recorded FordPass payloads to a webhook")
+    parser.add_argument("url")
+    parser.add_argument("vin")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=1.0)
+    parser.add_argument("--stale", action="store_true")
+    asyncio.run(main(parser.parse_args()))
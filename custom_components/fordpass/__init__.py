@@ -1,18 +1,25 @@
 """The FordPass integration."""
 import asyncio
 import logging
+import shutil
+import time
+from collections import deque
 from datetime import timedelta
 
-import async_timeout
 import voluptuous as vol
+import homeassistant.helpers.config_validation as cv
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.components import webhook
+from homeassistant.const import CONF_WEBHOOK_ID, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, SupportsResponse, callback
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util.ssl import client_context
 
 from .const import (
     CONF_DISTANCE_UNIT,
@@ -25,12 +32,54 @@ from .const import (
     VIN,
     UPDATE_INTERVAL,
     UPDATE_INTERVAL_DEFAULT,
-    COORDINATOR
+    COMMAND_TIMEOUT,
+    COMMAND_TIMEOUT_DEFAULT,
+    ADAPTIVE_POLLING,
+    ADAPTIVE_POLLING_DEFAULT,
+    DAILY_REQUEST_BUDGET,
+    DAILY_REQUEST_BUDGET_DEFAULT,
+    PUSH_MODE,
+    PUSH_MODE_DEFAULT,
+    SAFETY_NET_INTERVAL,
+    SAFETY_NET_INTERVAL_DEFAULT,
+    PUSH,
+    COORDINATOR,
+    COORDINATORS,
+    ACCOUNTS,
+    FLEET,
+    VINS,
+    SENSORS
 )
-from .fordpass_new import Vehicle
+from .circuit_breaker import CircuitOpen
+from .deadline import REFRESH_DEADLINE, Deadline
+from .extractors import SensorValues, parse_datestr
+from .fleet import FleetRefresher, STARTUP_SPREAD
+from .fordpass_new import Account, diff_documents
+from .metrics import ENDPOINT_STATUS
+from .push import PushReceiver
+from .rate_limit import RateLimited
+from .scheduler import PollScheduler
+from .snapshot import SnapshotStore, detect_capabilities
+from .state import VehicleState
+from .telemetry import ROLLUPS, TELEMETRY_FIELDS, TelemetryStore, extract_telemetry
+from .trips import TripDetector
 
 CONFIG_SCHEMA = vol.Schema({DOMAIN: vol.Schema({})}, extra=vol.ALLOW_EXTRA)
 
+VIN_SCHEMA = vol.Schema({vol.Optional(VIN): cv.string})
+
+TELEMETRY_SCHEMA = vol.Schema({
+    vol.Required(VIN): cv.string,
+    vol.Optional("hours", default=24): vol.All(vol.Coerce(float), vol.Range(min=1, max=87600)),
+    vol.Optional("resolution"): vol.In(["raw", *ROLLUPS]),
+    vol.Optional("fields"): vol.All(cv.ensure_list, [vol.In(list(TELEMETRY_FIELDS))]),
+})
+
+TELEMETRY_DIRECTORY = ".fordpass-telemetry"
+
+# Polls in a row that must report new capabilities before entities are added or removed
+CAPABILITY_CONFIRMATIONS = 3
+
 PLATFORMS = ["lock", "sensor", "switch", "device_tracker"]
 
 _LOGGER = logging.getLogger(__name__)
@@ -39,6 +88,13 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the FordPass component."""
     hass.data.setdefault(DOMAIN, {})
+
+    async def async_close_accounts(event):
+        """Flush caches and close the connection pools on shutdown."""
+        for account in list(hass.data[DOMAIN].get(ACCOUNTS, {}).values()):
+            await account.async_close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_close_accounts)
     return True
 
 
@@ -46,23 +102,45 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up FordPass from a config entry."""
     client_id = entry.data["client_id"]
     client_secret = entry.data["client_secret"]
-    vin = entry.data[VIN]
 
     if UPDATE_INTERVAL in entry.options:
         update_interval = entry.options[UPDATE_INTERVAL]
     else:
         update_interval = UPDATE_INTERVAL_DEFAULT
 
+    if push_enabled(entry):
+        # Pushed data keeps the vehicles current, polling only catches missed updates
+        update_interval = entry.options.get(SAFETY_NET_INTERVAL, SAFETY_NET_INTERVAL_DEFAULT)
+
     _LOGGER.debug(update_interval)
 
+    command_timeout = entry.options.get(COMMAND_TIMEOUT, COMMAND_TIMEOUT_DEFAULT)
+
     for ar_entry in entry.data:
         _LOGGER.debug(ar_entry)
 
     _LOGGER.debug("Client id " + client_id)
 
-    coordinator = FordPassDataUpdateCoordinator(hass, client_id, client_secret, vin, update_interval, 1)
+    account = async_get_account(hass, client_id, client_secret)
 
-    await coordinator.async_refresh()  # Get initial data
+    if entry.data.get(FLEET):
+        return await async_setup_fleet_entry(hass, entry, account, update_interval, command_timeout)
+
+    vin = entry.data[VIN]
+    coordinator = FordPassDataUpdateCoordinator(
+        hass, account, vin, update_interval, command_timeout, create_scheduler(entry, update_interval), entry
+    )
+
+    await coordinator.async_open_telemetry()
+
+    # Start from the last known data when we have it and fetch live data in the background
+    snapshot = await coordinator.snapshot.async_load()
+    restored = snapshot is not None and snapshot["data"].get("vehicleId") == vin
+    if restored:
+        _LOGGER.debug("Restored snapshot for %s", vin)
+        coordinator.async_restore(snapshot)
+    else:
+        await coordinator.async_refresh()  # Get initial data
 
     fordpass_options_listener = entry.add_update_listener(options_update_listener)
 
@@ -70,25 +148,155 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         await async_update_options(hass, entry)
 
     if not coordinator.last_update_success:
+        await async_release_account(hass, account, vin)
         raise ConfigEntryNotReady
 
     hass.data[DOMAIN][entry.entry_id] = {
         COORDINATOR: coordinator,
+        COORDINATORS: [coordinator],
         "fordpass_options_listener": fordpass_options_listener
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    async def async_refresh_status_service(service_call):
-        await hass.async_add_executor_job(
-            refresh_status, hass, service_call, coordinator
+    if push_enabled(entry):
+        hass.data[DOMAIN][entry.entry_id][PUSH] = async_setup_push(hass, entry, [coordinator])
+
+    if restored:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} {vin} initial refresh"
+        )
+
+    async_register_services(hass)
+
+    return True
+
+
+async def async_setup_fleet_entry(hass: HomeAssistant, entry: ConfigEntry, account, update_interval, command_timeout):
+    """Set up a fleet entry, one coordinator per VIN refreshed in turn by a FleetRefresher."""
+    coordinators = [
+        FordPassDataUpdateCoordinator(
+            hass, account, vin, update_interval, command_timeout,
+            create_scheduler(entry, update_interval), entry, fleet=True
         )
+        for vin in entry.data[VINS]
+    ]
+
+    await asyncio.gather(*(coordinator.async_open_telemetry() for coordinator in coordinators))
+    snapshots = await asyncio.gather(*(coordinator.snapshot.async_load() for coordinator in coordinators))
+    restored, missing = [], []
+    for coordinator, snapshot in zip(coordinators, snapshots):
+        if snapshot is not None and snapshot["data"].get("vehicleId") == coordinator.vin:
+            coordinator.async_restore(snapshot)
+            restored.append(coordinator)
+        else:
+            missing.append(coordinator)
+
+    # Vehicles without a snapshot need data before their entities can be created
+    await asyncio.gather(*(coordinator.async_refresh() for coordinator in missing))
+    fetched = [coordinator for coordinator in missing if coordinator.last_update_success]
+
+    for coordinator in missing:
+        if not coordinator.last_update_success:
+            _LOGGER.warning("Could not fetch %s, it is added on the next reload", coordinator.vin)
+            account.remove_vehicle(coordinator.vin)
+
+    ready = restored + fetched
+    if not ready:
+        for coordinator in coordinators:
+            await async_release_account(hass, account, coordinator.vin)
+        raise ConfigEntryNotReady
+
+    fordpass_options_listener = entry.add_update_listener(options_update_listener)
+
+    if not entry.options:
+        await async_update_options(hass, entry)
+
+    by_vin = {coordinator.vin: coordinator for coordinator in ready}
+
+    async def async_refresh_vehicle(vin):
+        coordinator = by_vin[vin]
+        await coordinator.async_refresh()
+        return coordinator.refresh_interval.total_seconds()
+
+    # The budget is shared with every other vehicle on the client_id
+    refresher = FleetRefresher(
+        async_refresh_vehicle, update_interval,
+        min_interval=lambda: account.rate_limiter.polling_interval(len(account.vins))
+    )
+    refresher.add([coordinator.vin for coordinator in restored], min(STARTUP_SPREAD, update_interval))
+    refresher.add([coordinator.vin for coordinator in fetched])
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        COORDINATORS: ready,
+        FLEET: refresher,
+        "fordpass_options_listener": fordpass_options_listener
+    }
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    refresher.start()
+    entry.async_on_unload(refresher.stop)
+
+    if push_enabled(entry):
+        hass.data[DOMAIN][entry.entry_id][PUSH] = async_setup_push(hass, entry, ready)
+
+    async_register_services(hass)
+
+    _LOGGER.info("Fleet of %s vehicles set up, %s from snapshots", len(ready), len(restored))
+    return True
+
+
+def push_enabled(entry: ConfigEntry):
+    """Return True when the entry receives vehicle data through its webhook."""
+    return entry.options.get(PUSH_MODE, PUSH_MODE_DEFAULT) and CONF_WEBHOOK_ID in entry.options
+
+
+@callback
+def async_setup_push(hass: HomeAssistant, entry: ConfigEntry, coordinators):
+    """Register the webhook vehicle data of the entry can be posted to."""
+    webhook_id = entry.options[CONF_WEBHOOK_ID]
+    receiver = PushReceiver(coordinators)
+    # Anyone who can reach it could post vehicle data, so only accept it from the local network
+    webhook.async_register(
+        hass, DOMAIN, "FordPass " + entry.title, webhook_id, receiver.async_handle_webhook, local_only=True
+    )
+    entry.async_on_unload(lambda: webhook.async_unregister(hass, webhook_id))
+    _LOGGER.info("Push mode enabled for %s, post vehicle data to %s", entry.title, webhook.async_generate_url(hass, webhook_id))
+    return receiver
+
+
+def create_scheduler(entry: ConfigEntry, update_interval):
+    """Return the PollScheduler for a vehicle, or None when adaptive polling is off."""
+    if push_enabled(entry) or not entry.options.get(ADAPTIVE_POLLING, ADAPTIVE_POLLING_DEFAULT):
+        return None
+    return PollScheduler(
+        update_interval,
+        entry.options.get(DAILY_REQUEST_BUDGET, DAILY_REQUEST_BUDGET_DEFAULT)
+    )
+
+
+SERVICES = ["refresh_status", "clear_tokens", "reload", "poll_api", "telemetry"]
+
+
+@callback
+def async_register_services(hass: HomeAssistant):
+    """Register the services, they find their vehicles when called."""
+    if hass.services.has_service(DOMAIN, "poll_api"):
+        return
+
+    async def async_refresh_status_service(service_call):
+        await refresh_status(hass, service_call)
 
     async def async_clear_tokens_service(service_call):
-        await hass.async_add_executor_job(clear_tokens, hass, service_call, coordinator)
+        await clear_tokens(hass, service_call)
 
     async def poll_api_service(service_call):
-        await coordinator.async_request_refresh()
+        for account in async_service_accounts(hass, service_call):
+            await async_refresh_account(hass, account)
+
+    async def telemetry_service(service_call):
+        return await async_query_telemetry(hass, service_call)
 
     async def handle_reload(service):
         """Handle reload service call."""
@@ -106,11 +314,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         DOMAIN,
         "refresh_status",
         async_refresh_status_service,
+        schema=VIN_SCHEMA
     )
     hass.services.async_register(
         DOMAIN,
         "clear_tokens",
         async_clear_tokens_service,
+        schema=VIN_SCHEMA
     )
 
     hass.services.async_register(
@@ -122,10 +332,94 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     hass.services.async_register(
         DOMAIN,
         "poll_api",
-        poll_api_service
+        poll_api_service,
+        schema=VIN_SCHEMA
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        "telemetry",
+        telemetry_service,
+        schema=TELEMETRY_SCHEMA,
+        supports_response=SupportsResponse.ONLY
     )
 
-    return True
+
+@callback
+def async_remove_services(hass: HomeAssistant):
+    """Remove the services once no entry is loaded."""
+    for service in SERVICES:
+        hass.services.async_remove(DOMAIN, service)
+
+
+@callback
+def async_loaded_coordinators(hass: HomeAssistant, vin=None):
+    """Return the coordinators of all loaded entries, or the one of a VIN."""
+    return [
+        coordinator
+        for entry_id, data in hass.data[DOMAIN].items()
+        if entry_id != ACCOUNTS
+        for coordinator in data[COORDINATORS]
+        if vin is None or coordinator.vin == vin
+    ]
+
+
+@callback
+def async_service_coordinators(hass: HomeAssistant, service):
+    """Return the coordinators a service call is for, all of them without a VIN."""
+    vin = service.data.get(VIN)
+    coordinators = async_loaded_coordinators(hass, vin)
+    if vin is not None and not coordinators:
+        raise HomeAssistantError("No FordPass vehicle with VIN " + vin)
+    return coordinators
+
+
+@callback
+def async_service_accounts(hass: HomeAssistant, service):
+    """Return the accounts of the vehicles a service call is for."""
+    accounts = []
+    for coordinator in async_service_coordinators(hass, service):
+        if coordinator.account not in accounts:
+            accounts.append(coordinator.account)
+    return accounts
+
+
+@callback
+def async_get_account(hass: HomeAssistant, client_id, client_secret):
+    """Return the shared Account for a client_id, creating it if needed."""
+    accounts = hass.data[DOMAIN].setdefault(ACCOUNTS, {})
+    account = accounts.get(client_id)
+    if account is None:
+        # Each account keeps its own pool of keep-alive connections
+        account = Account(None, client_id, client_secret, ssl_context=client_context())
+        accounts[client_id] = account
+    return account
+
+
+async def async_release_account(hass: HomeAssistant, account, vin):
+    """Detach a vehicle and drop the Account once no vehicles use it."""
+    account.remove_vehicle(vin)
+    if not account.vins:
+        hass.data[DOMAIN].get(ACCOUNTS, {}).pop(account.client_id, None)
+        await account.async_close()
+
+
+@callback
+def async_account_coordinators(hass: HomeAssistant, account):
+    """Return the coordinators of all loaded entries using an Account."""
+    return [coordinator for coordinator in async_loaded_coordinators(hass) if coordinator.account is account]
+
+
+async def async_refresh_account(hass: HomeAssistant, account):
+    """Fetch every vehicle on an account concurrently and update their coordinators."""
+    async with Deadline(REFRESH_DEADLINE):
+        results = await account.status_all(cached=False)
+    for coordinator in async_account_coordinators(hass, account):
+        result = results.get(coordinator.vin)
+        if result is None or isinstance(result, Exception):
+            await coordinator.async_request_refresh()
+        else:
+            coordinator.async_set_vehicle_data(result)
 
 
 async def async_update_options(hass, config_entry):
@@ -147,24 +441,64 @@ async def options_update_listener(hass: HomeAssistant, entry: ConfigEntry):
     await hass.config_entries.async_reload(entry.entry_id)
 
 
-def refresh_status(hass, service, coordinator):
+async def refresh_status(hass, service):
     """Get latest vehicle status from vehicle, actively polls the car"""
     _LOGGER.debug("Running Service")
-    status = coordinator.vehicle.request_update()
-    if status == 200:
-        _LOGGER.debug("Refresh Sent")
+    coordinators = async_service_coordinators(hass, service)
+    # The refreshed status reaches the coordinators through on_status_update
+    results = await asyncio.gather(
+        *(coordinator.vehicle.request_update() for coordinator in coordinators), return_exceptions=True
+    )
+    for coordinator, result in zip(coordinators, results):
+        if isinstance(result, Exception):
+            _LOGGER.warning("Refreshing %s failed: %s", coordinator.vin, result)
+        elif result:
+            _LOGGER.debug("Refresh completed for %s", coordinator.vin)
+
+async def async_query_telemetry(hass, service):
+    """Return the stored telemetry of a vehicle over the last hours"""
+    vin = service.data[VIN]
+    coordinator = next(iter(async_loaded_coordinators(hass, vin)), None)
+    if coordinator is None or coordinator.telemetry is None:
+        raise HomeAssistantError("No telemetry for " + vin)
+    end = time.time()
+    start = end - service.data["hours"] * 3600
+    return await hass.async_add_executor_job(
+        coordinator.telemetry.query, start, end, service.data.get("resolution"), service.data.get("fields")
+    )
 
-def clear_tokens(hass, service, coordinator):
+
+async def clear_tokens(hass, service):
     """Clear the token file in config directory, only use in emergency"""
     _LOGGER.debug("Clearing Tokens")
-    coordinator.vehicle.clear_token()
+    for account in async_service_accounts(hass, service):
+        await account.clear_token()
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored snapshots when an entry is deleted."""
+    if entry.data.get(FLEET):
+        vins = entry.data[VINS]
+        for vin in vins:
+            await SnapshotStore(hass, entry.entry_id, vin).async_remove()
+    else:
+        vins = [entry.data[VIN]]
+        await SnapshotStore(hass, entry.entry_id).async_remove()
+    for vin in vins:
+        await hass.async_add_executor_job(
+            shutil.rmtree, hass.config.path(TELEMETRY_DIRECTORY, vin), True
+        )
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
 
     if await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        for coordinator in hass.data[DOMAIN].pop(entry.entry_id)[COORDINATORS]:
+            await coordinator.async_close_telemetry()
+            await async_release_account(hass, coordinator.account, coordinator.vin)
+        if not async_loaded_coordinators(hass):
+            async_remove_services(hass)
         return True
     return False
 
@@ -172,31 +506,249 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 class FordPassDataUpdateCoordinator(DataUpdateCoordinator):
     """DataUpdateCoordinator to handle fetching new data about the vehicle."""
 
-    def __init__(self, hass, client_id, client_secret, vin, update_interval, save_token=False):
-        """Initialize the coordinator and set up the Vehicle object."""
+    def __init__(self, hass, account, vin, update_interval, command_timeout=COMMAND_TIMEOUT_DEFAULT, scheduler=None, entry=None, fleet=False):
+        """Initialize the coordinator and attach the Vehicle to the shared Account.
+
+        In a fleet the coordinator does not poll by itself, the entry's
+        FleetRefresher refreshes it when refresh_interval has passed.
+        """
         self._hass = hass
         self.vin = vin
-        config_path = hass.config.path("custom_components/fordpass/" + client_id + "_fordpass_token.txt")
-        self.vehicle = Vehicle(client_id, client_secret, vin)
+        self.account = account
+        self.vehicle = account.vehicle(vin, command_timeout)
+        # Fields changed by the last refresh, dotted path -> (old, new)
+        self.changes = {}
+        self.sensor_values = SensorValues(SENSORS)
+        # Trips detected from the location samples, kept in memory only
+        self.trips = TripDetector()
+        # Opened by async_open_telemetry, the files live in the config directory
+        self.telemetry = None
+        # Samples waiting for the telemetry writer, appended in order by one task
+        self._telemetry_queue = deque()
+        self._telemetry_writer = None
+        self.scheduler = scheduler
+        self._base_interval = timedelta(seconds=update_interval)
+        self.refresh_interval = self._base_interval
+        self.fleet = fleet
+        self.vehicle.on_status_update = self.async_set_vehicle_data
+        self.entry = entry
+        if entry is None:
+            self.snapshot = None
+        else:
+            self.snapshot = SnapshotStore(hass, entry.entry_id, vin if fleet else None)
+        self.capabilities = None
+        # Capabilities seen in the last polls that differ from the current ones
+        self._pending_capabilities = None
+        self._pending_polls = 0
+        # Platforms' (async_add_entities, factory) for the entities the capabilities call for
+        self._entity_factories = []
+        self._capability_entities = {}
         self._available = True
+        # False while the status endpoint is down and data comes from the cache
+        self.api_available = True
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=update_interval),
+            update_interval=None if fleet else self._base_interval,
+            always_update=False,
         )
 
+    def track_changes(self, data):
+        """Record which fields differ from the data currently held and update sensor values."""
+        if data is self.data:
+            self.changes = {}
+            if self._pending_capabilities is not None:
+                self._confirm_capabilities(self._pending_capabilities)
+            return
+        self.changes = diff_documents(self.data, data)
+        _LOGGER.debug("%s changed fields for %s", len(self.changes), self.vin)
+        self.sensor_values.update(data, self.changes if self.data else None)
+        if data:
+            if not self.data or any(path.startswith("vehicleLocation") for path in self.changes):
+                self.record_location(data)
+            self.record_telemetry(data)
+            self._update_capabilities(data)
+
+    async def async_open_telemetry(self):
+        """Open the telemetry store of the vehicle in the executor."""
+        try:
+            self.telemetry = await self.hass.async_add_executor_job(
+                TelemetryStore, self.hass.config.path(TELEMETRY_DIRECTORY, self.vin)
+            )
+        except OSError as ex:
+            _LOGGER.warning("Telemetry of %s is not stored: %s", self.vin, ex)
+
+    def record_telemetry(self, data):
+        """Append the numeric fields of new vehicle data to the telemetry store."""
+        if self.telemetry is None:
+            return
+        try:
+            timestamp = parse_datestr(data["lastUpdated"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            # Missing, null or malformed, use the time it arrived
+            timestamp = time.time()
+        self._telemetry_queue.append((timestamp, extract_telemetry(data)))
+        if self._telemetry_writer is None:
+            self._telemetry_writer = self.hass.async_create_task(self._async_write_telemetry())
+
+    async def _async_write_telemetry(self):
+        """Store the queued samples in the executor until the queue is empty."""
+        try:
+            while self._telemetry_queue:
+                samples = list(self._telemetry_queue)
+                self._telemetry_queue.clear()
+                await self.hass.async_add_executor_job(self._append_telemetry, samples)
+        finally:
+            self._telemetry_writer = None
+
+    def _append_telemetry(self, samples):
+        for timestamp, values in samples:
+            try:
+                self.telemetry.append(timestamp, values)
+            except OSError as ex:
+                _LOGGER.warning("Could not store telemetry of %s: %s", self.vin, ex)
+
+    async def async_close_telemetry(self):
+        """Wait for queued samples to be stored and close the telemetry store."""
+        if self._telemetry_writer is not None:
+            await self._telemetry_writer
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.telemetry = None
+
+    def record_location(self, data):
+        """Add the reported location to the trip history."""
+        location = data.get("vehicleLocation")
+        if not location or not location.get("timeStamp"):
+            return
+        try:
+            timestamp = parse_datestr(location["timeStamp"]).timestamp()
+            latitude = float(location["latitude"])
+            longitude = float(location["longitude"])
+            speed = float(location.get("speed") or 0)
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.debug("Unusable location for %s: %s", self.vin, location)
+            return
+        self.trips.add(timestamp, latitude, longitude, speed)
+
+    def _update_capabilities(self, data):
+        capabilities = detect_capabilities(data)
+        if self.capabilities is None:
+            self.capabilities = capabilities
+        else:
+            self._confirm_capabilities(capabilities)
+        if self.snapshot is not None:
+            self.snapshot.async_save(data, self.capabilities)
+
+    def _confirm_capabilities(self, capabilities):
+        """Switch to new capabilities once CAPABILITY_CONFIRMATIONS polls in a row reported them."""
+        if capabilities == self.capabilities:
+            self._pending_capabilities = None
+            return
+        if capabilities != self._pending_capabilities:
+            self._pending_capabilities = capabilities
+            self._pending_polls = 0
+        self._pending_polls += 1
+        if self._pending_polls < CAPABILITY_CONFIRMATIONS:
+            return
+        _LOGGER.info("Capabilities of %s changed, updating its entities", self.vin)
+        self.capabilities = capabilities
+        self._pending_capabilities = None
+        self.async_update_entities()
+
+    @callback
+    def async_add_vehicle_entities(self, async_add_entities, factory):
+        """Add the entities factory(coordinator) returns for the current capabilities.
+
+        When the capabilities change the factory is asked again and only the
+        entities that appeared or disappeared are added or removed.
+        """
+        self._entity_factories.append((async_add_entities, factory))
+        entities = factory(self)
+        self._capability_entities.update((entity.unique_id, entity) for entity in entities)
+        async_add_entities(entities, False)
+
+    @callback
+    def async_update_entities(self):
+        """Add and remove entities to match the current capabilities."""
+        wanted = set()
+        for async_add_entities, factory in self._entity_factories:
+            added = []
+            for entity in factory(self):
+                wanted.add(entity.unique_id)
+                if entity.unique_id not in self._capability_entities:
+                    self._capability_entities[entity.unique_id] = entity
+                    added.append(entity)
+            if added:
+                async_add_entities(added, False)
+        registry = er.async_get(self.hass)
+        for unique_id in [unique_id for unique_id in self._capability_entities if unique_id not in wanted]:
+            entity = self._capability_entities.pop(unique_id)
+            if entity.registry_entry is not None:
+                # Also removes the entity from the state machine
+                registry.async_remove(entity.entity_id)
+            elif entity.hass is not None:
+                self.hass.async_create_task(entity.async_remove())
+
+    @callback
+    def async_restore(self, snapshot):
+        """Use a stored snapshot as the current data until the first refresh."""
+        data = VehicleState.from_dict(snapshot["data"])
+        self.capabilities = snapshot["capabilities"]
+        self.sensor_values.update(data)
+        self.record_location(data)
+        self.data = data
+
+    @callback
+    def async_push(self, data):
+        """Apply vehicle data received through the webhook."""
+        # Later polls build on the pushed data, and are applied even when the
+        # API still returns the document from before the push
+        self.vehicle.last_status = data
+        self.vehicle.fingerprint = None
+        self.async_set_vehicle_data(data)
+
+    @callback
+    def async_set_vehicle_data(self, data):
+        """Publish vehicle data fetched outside of a scheduled refresh."""
+        self.track_changes(data)
+        self.schedule_next(data)
+        self.async_set_updated_data(data)
+
+    def schedule_next(self, data):
+        """Adapt the update interval to what the vehicle is doing."""
+        if self.scheduler is not None:
+            self._set_interval(timedelta(seconds=self.scheduler.next_interval(data)))
+        else:
+            self._set_interval(self._base_interval)
+
+    def _set_interval(self, interval):
+        self.refresh_interval = interval
+        if not self.fleet:
+            self.update_interval = interval
+
+    def _update_api_available(self):
+        available = self.account.breakers.available(ENDPOINT_STATUS)
+        if available != self.api_available:
+            _LOGGER.info("FordPass status for %s is %s", self.vin, "live again" if available else "served from cache")
+        self.api_available = available
+
     async def _async_update_data(self):
         """Fetch data from FordPass."""
         try:
-            async with async_timeout.timeout(600):
-                data = (await self._hass.async_add_executor_job(
-                    self.vehicle.status  # Fetch new status
-                ))
+            async with Deadline(REFRESH_DEADLINE):
+                if self.scheduler is not None:
+                    self.scheduler.record_request()
+                data = await self.vehicle.status()  # Fetch new status
+                self._update_api_available()
 
                 if not data:
-                    data = {}
+                    data = VehicleState({})
+
+                self.track_changes(data)
+                self.schedule_next(data)
 
                 # If data has now been fetched but was previously unavailable, log and reset
                 if not self._available:
@@ -204,8 +756,22 @@ class FordPassDataUpdateCoordinator(DataUpdateCoordinator):
                     self._available = True
 
                 return data
+        except (RateLimited, CircuitOpen) as ex:
+            self._update_api_available()
+            if self.data is None:
+                raise UpdateFailed(
+                    f"Rate limited fetching FordPass data for {self.vin}"
+                    if isinstance(ex, RateLimited) else
+                    f"FordPass unavailable for {self.vin}"
+                ) from ex
+            # Keep the current data and come back once the budget or the API allows
+            _LOGGER.debug("Skipping refresh for %s: %s", self.vin, ex)
+            retry_in = max(ex.retry_at - time.time(), self.refresh_interval.total_seconds())
+            self._set_interval(timedelta(seconds=retry_in))
+            return self.data
         except Exception as ex:
             self._available = False  # Mark as unavailable
+            self._update_api_available()
             _LOGGER.warning(str(ex))
             _LOGGER.warning("Error communicating with FordPass for %s", self.vin)
             _LOGGER.exception(ex)
@@ -217,6 +783,9 @@ class FordPassDataUpdateCoordinator(DataUpdateCoordinator):
 class FordPassEntity(CoordinatorEntity):
     """Defines a base FordPass entity."""
 
+    _command_status = None
+    _last_published = None
+
     def __init__(
         self, *, device_id: str, name: str, coordinator: FordPassDataUpdateCoordinator
     ):
@@ -235,6 +804,37 @@ class FordPassEntity(CoordinatorEntity):
         """Return the unique ID of the entity."""
         return f"{self.coordinator.vin}-{self._device_id}"
 
+    def _published_state(self):
+        """Return everything this entity would write to the state machine."""
+        return (
+            self.available,
+            self.state,
+            self.state_attributes,
+            self.extra_state_attributes,
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write state when the value or attributes actually changed."""
+        try:
+            published = self._published_state()
+        except Exception:  # pylint: disable=broad-except
+            # Raising here would stop the coordinator from updating the entities after this one
+            _LOGGER.exception("Error reading the state of %s", self.entity_id)
+            return
+        if published == self._last_published:
+            return
+        self._last_published = published
+        self.async_write_ha_state()
+
+    @callback
+    def _command_progress(self, command, status):
+        """Publish the progress of a running remote command."""
+        _LOGGER.debug("Command %s for %s: %s", command, self.coordinator.vin, status)
+        self._command_status = status
+        self._last_published = None
+        self.async_write_ha_state()
+
     @property
     def device_info(self):
         """Return device information about this device."""
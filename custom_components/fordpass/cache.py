@@ -0,0 +1,127 @@
+"""Two tier (memory and disk) cache for FordConnect responses"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from .persistence import DebouncedWriter, read_json
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_ENTRIES = 64
+
+# url fragment -> (seconds a response is fresh, seconds it may be served stale)
+ENDPOINT_TTLS = (
+    ("/fordconnect/v2/vehicles", (3600, 86400)),
+    ("/fordconnect/v3/vehicles/", (60, 3600)),
+)
+DEFAULT_TTL = (0, 0)
+
+
+def endpoint_ttl(url):
+    """Return the (fresh, stale) lifetimes for an endpoint"""
+    for fragment, ttl in ENDPOINT_TTLS:
+        if fragment in url:
+            return ttl
+    return DEFAULT_TTL
+
+
+class CacheEntry:
+    """A cached document and when it was fetched"""
+
+    __slots__ = ("document", "fetched_at")
+
+    def __init__(self, document, fetched_at):
+        self.document = document
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self):
+        """Return the age of the entry in seconds"""
+        return time.time() - self.fetched_at
+
+
+class ResponseCache:
+    """Bounded LRU of responses in memory, backed by JSON files on disk
+
+    Memory is checked first; on a miss the disk copy is loaded in the
+    executor and kept in memory. Writes go to memory at once and are batched
+    to disk by a DebouncedWriter.
+    """
+
+    def __init__(self, cache_location, max_entries=MAX_ENTRIES):
+        self.cache_location = cache_location
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._writer = DebouncedWriter()
+
+    def get(self, url):
+        """Return the in-memory entry for a url, or None"""
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    async def async_get(self, url):
+        """Return the entry for a url from memory or disk, or None"""
+        entry = self.get(url)
+        if entry is not None:
+            return entry
+        try:
+            loaded = await asyncio.get_running_loop().run_in_executor(None, self.read_json_cache, url)
+        except (OSError, ValueError):
+            return None
+        if loaded is None:
+            return None
+        entry = CacheEntry(*loaded)
+        self._store(url, entry)
+        return entry
+
+    def set(self, url, document):
+        """Store a fresh document in memory and queue it for writing to disk"""
+        self._store(url, CacheEntry(document, time.time()))
+        self._writer.schedule(self.get_json_cache_filename(url), document)
+
+    @property
+    def writes(self):
+        """Return the number of cache files written"""
+        return self._writer.writes
+
+    async def async_flush(self):
+        """Write pending entries to disk"""
+        await self._writer.async_flush()
+
+    def clear(self):
+        """Drop all in-memory entries"""
+        self._entries.clear()
+
+    def _store(self, url, entry):
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_json_cache_filename(self, url):
+
+        urlhash = hashlib.sha1()
+        urlhash.update(url.encode())
+        urlhash_string = urlhash.hexdigest()
+
+        return os.path.join(self.cache_location, urlhash_string + ".json")
+
+    def read_json_cache(self, url):
+        """Return (document, modification time) of the cache file, or None"""
+        filename = self.get_json_cache_filename(url)
+        if not os.path.isfile(filename):
+            return None
+
+        _LOGGER.debug("Reading cached json from " + filename)
+
+        data = read_json(filename)
+        if data is None:
+            return None
+
+        return data, os.path.getmtime(filename)
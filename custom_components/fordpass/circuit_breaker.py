@@ -0,0 +1,142 @@
+"""Circuit breakers that stop calling a FordConnect endpoint while it is down"""
+
+import logging
+import random
+import time
+
+from .metrics import endpoint_name
+
+_LOGGER = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Consecutive failures that open the circuit
+FAILURE_THRESHOLD = 3
+# Seconds the circuit stays open the first time, doubled every time a probe fails
+OPEN_TIME = 30
+MAX_OPEN_TIME = 900
+# Backoff between retries of one request
+RETRY_DELAY = 1
+MAX_RETRY_DELAY = 10
+
+
+def backoff_delay(attempt, base=RETRY_DELAY, maximum=MAX_RETRY_DELAY):
+    """Return a jittered exponential delay for the given retry attempt (0 based)"""
+    delay = min(base * 2 ** attempt, maximum)
+    # Equal jitter: never retry at once, but spread clients that failed together
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an endpoint whose circuit is open"""
+
+    def __init__(self, endpoint, retry_at):
+        super().__init__(f"{endpoint} unavailable, next probe in {max(retry_at - time.time(), 0):.0f}s")
+        self.endpoint = endpoint
+        self.retry_at = retry_at
+
+
+class CircuitBreaker:
+    """Closed, open or half-open state of one endpoint
+
+    After FAILURE_THRESHOLD failures in a row the circuit opens and calls
+    fail at once. When the open time has passed a single call is let
+    through as a probe: success closes the circuit, failure opens it again
+    for twice as long, with jitter, up to MAX_OPEN_TIME.
+    """
+
+    def __init__(self, name, threshold=FAILURE_THRESHOLD, open_time=OPEN_TIME, max_open_time=MAX_OPEN_TIME):
+        self.name = name
+        self.threshold = threshold
+        self.open_time = open_time
+        self.max_open_time = max_open_time
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self.retry_at = 0
+        self._trips = 0
+
+    @property
+    def available(self):
+        return self.state == CLOSED
+
+    def before_call(self):
+        """Raise CircuitOpen unless a call may go out now, returns True for a probe"""
+        if self.state == CLOSED:
+            return False
+        if self.state == OPEN and time.time() >= self.retry_at:
+            _LOGGER.debug("Probing " + self.name)
+            self.state = HALF_OPEN
+            return True
+        # Open, or half-open with the probe still running
+        self.rejected += 1
+        raise CircuitOpen(self.name, self.retry_at)
+
+    def record_success(self):
+        if self.state != CLOSED:
+            _LOGGER.info("FordConnect " + self.name + " is available again")
+        self.state = CLOSED
+        self.failures = 0
+        self._trips = 0
+
+    def release_probe(self):
+        """Let the next call probe when a probe ended without an outcome, e.g. cancelled"""
+        if self.state == HALF_OPEN:
+            self.state = OPEN
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self._open()
+
+    def _open(self):
+        delay = min(self.open_time * 2 ** self._trips, self.max_open_time)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if self.state == CLOSED:
+            _LOGGER.warning(
+                "FordConnect " + self.name + " failed " + str(self.failures)
+                + " times, serving cached data for " + str(round(delay)) + "s"
+            )
+        self.state = OPEN
+        self.retry_at = time.time() + delay
+        self.opened += 1
+        self._trips += 1
+
+    def as_dict(self):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_at": self.retry_at if self.state != CLOSED else None,
+        }
+
+
+class CircuitBreakers:
+    """The circuit breakers of an Account, one per endpoint"""
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._breakers = {}
+
+    def for_url(self, url):
+        name = endpoint_name(url)
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name, **self._kwargs)
+        return breaker
+
+    def available(self, name):
+        breaker = self._breakers.get(name)
+        return breaker is None or breaker.available
+
+    @property
+    def open(self):
+        """Return the names of the endpoints that are not available"""
+        return [name for name, breaker in self._breakers.items() if not breaker.available]
+
+    def as_dict(self):
+        return {name: breaker.as_dict() for name, breaker in self._breakers.items()}
@@ -0,0 +1,140 @@
+"""Serializes the remote commands sent to one vehicle"""
+
+import asyncio
+import logging
+from collections import deque
+
+from .command_tracker import COMMAND_STATUS_CANCELLED
+from .deadline import COMMAND_DEADLINE_MARGIN, Deadline
+
+_LOGGER = logging.getLogger(__name__)
+
+OPPOSITE_COMMANDS = {
+    "lock": ("unlock",),
+    "unlock": ("lock",),
+    "startEngine": ("stopEngine",),
+    "stopEngine": ("startEngine",),
+}
+
+
+class QueuedCommand:
+    """A command waiting to be sent or running, shared by everyone who asked for it"""
+
+    __slots__ = ("command", "future", "progress", "superseded")
+
+    def __init__(self, command, future):
+        self.command = command
+        self.future = future
+        self.progress = []
+        self.superseded = False
+
+    def report(self, command, status):
+        """Pass command progress on to every caller"""
+        for callback in list(self.progress):
+            try:
+                callback(command, status)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error reporting progress for " + command)
+
+    def resolve(self, result):
+        if not self.future.done():
+            self.future.set_result(result)
+
+
+class CommandQueue:
+    """Sends the commands of a vehicle one at a time
+
+    Submitting a command that is already queued or running does not send it
+    again, the callers share its result. Submitting the opposite of a queued
+    command drops the queued one, the opposite of a running command stops it
+    being tracked.
+    """
+
+    def __init__(self, vehicle):
+        self._vehicle = vehicle
+        self._pending = deque()
+        self._active = None
+        self._worker = None
+
+    @property
+    def busy(self):
+        """Return True while commands are queued or running"""
+        return self._active is not None or bool(self._pending)
+
+    async def submit(self, command, progress=None):
+        """Queue a command and wait for it, returns True when it completed"""
+        queued = self._find(command)
+        if queued is not None:
+            _LOGGER.debug("Joining " + command + " already queued for " + self._vehicle.vin)
+            self._vehicle.account.metrics.record_command_queue("joined")
+        else:
+            self._supersede(command)
+            queued = QueuedCommand(command, asyncio.get_running_loop().create_future())
+            self._pending.append(queued)
+            if self._worker is None:
+                self._worker = asyncio.ensure_future(self._run())
+
+        if progress is not None:
+            queued.progress.append(progress)
+        # A caller giving up must not cancel the command for the others
+        return await asyncio.shield(queued.future)
+
+    def cancel(self):
+        """Drop queued commands and stop the running one"""
+        for queued in self._pending:
+            queued.superseded = True
+            queued.resolve(False)
+        self._pending.clear()
+        if self._active is not None:
+            self._active.superseded = True
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    def _find(self, command):
+        if self._active is not None and self._active.command == command and not self._active.superseded:
+            return self._active
+        for queued in self._pending:
+            if queued.command == command:
+                return queued
+        return None
+
+    def _supersede(self, command):
+        for opposite in OPPOSITE_COMMANDS.get(command, ()):
+            for queued in [queued for queued in self._pending if queued.command == opposite]:
+                _LOGGER.debug("Dropping queued " + opposite + " in favour of " + command)
+                self._pending.remove(queued)
+                queued.superseded = True
+                queued.report(opposite, COMMAND_STATUS_CANCELLED)
+                queued.resolve(False)
+                self._vehicle.account.metrics.record_command_queue("superseded")
+
+            active = self._active
+            if active is not None and active.command == opposite and not active.superseded:
+                _LOGGER.debug("Cancelling " + opposite + " in favour of " + command)
+                active.superseded = True
+                self._vehicle.cancel_command(opposite)
+                self._vehicle.account.metrics.record_command_queue("superseded")
+
+    async def _run(self):
+        try:
+            while self._pending:
+                queued = self._active = self._pending.popleft()
+                try:
+                    # Each command gets its own budget, not the one of whoever queued it first
+                    async with Deadline(self._vehicle.command_timeout + COMMAND_DEADLINE_MARGIN, detached=True):
+                        result = await self._vehicle.send_command(queued.command, queued.report)
+                except asyncio.CancelledError:
+                    queued.resolve(False)
+                    raise
+                except Exception as ex:  # pylint: disable=broad-except
+                    if not queued.future.done():
+                        queued.future.set_exception(ex)
+                else:
+                    queued.resolve(result)
+                finally:
+                    if self._active is queued:
+                        self._active = None
+        finally:
+            if self._worker is asyncio.current_task():
+                self._worker = None
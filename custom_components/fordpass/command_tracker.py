@@ -0,0 +1,113 @@
+"""Tracks FordConnect commands until the vehicle reports a result"""
+
+import asyncio
+import logging
+import random
+import time
+
+from .circuit_breaker import CircuitOpen
+from .deadline import current_deadline
+
+_LOGGER = logging.getLogger(__name__)
+
+POLL_INITIAL_DELAY = 1.0
+POLL_MAX_DELAY = 15.0
+POLL_BACKOFF = 1.6
+POLL_JITTER = 0.2
+
+COMMAND_STATUS_QUEUED = "QUEUED"
+COMMAND_STATUS_COMPLETED = "COMPLETED"
+COMMAND_STATUS_FAILED = "FAILED"
+COMMAND_STATUS_TIMEOUT = "TIMEOUT"
+COMMAND_STATUS_CANCELLED = "CANCELLED"
+
+
+class CommandTracker:
+    """Polls the status of a single command with exponential backoff"""
+
+    def __init__(self, vehicle, command, command_id, timeout, progress=None):
+        self.vehicle = vehicle
+        self.command = command
+        self.command_id = command_id
+        self.timeout = timeout
+        self.status = COMMAND_STATUS_QUEUED
+        self._progress = progress
+        self._task = None
+        self._cancelled = False
+
+    def start(self):
+        """Start polling in the background"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._poll())
+        return self._task
+
+    def cancel(self):
+        """Stop polling, the pending wait() returns False"""
+        if self._task is not None and not self._task.done():
+            self._cancelled = True
+            self._task.cancel()
+
+    @property
+    def done(self):
+        """Return True once the command has a final result"""
+        return self._task is not None and self._task.done()
+
+    async def wait(self):
+        """Wait for the command to finish, returns True when it completed"""
+        task = self.start()
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if not self._cancelled:
+                raise
+            self._report(COMMAND_STATUS_CANCELLED)
+            return False
+
+    def _report(self, status):
+        if status == self.status:
+            return
+        self.status = status
+        if self._progress is not None:
+            try:
+                self._progress(self.command, status)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error reporting progress for " + self.command)
+
+    async def _poll(self):
+        timeout = self.timeout
+        current = current_deadline()
+        if current is not None:
+            # Time out before the operation's deadline cancels the poll
+            timeout = min(timeout, current.remaining)
+        deadline = time.monotonic() + timeout
+        delay = POLL_INITIAL_DELAY
+
+        while True:
+            sleep = delay * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+            await asyncio.sleep(min(sleep, max(deadline - time.monotonic(), 0)))
+
+            try:
+                status_response = await self.vehicle.command_status(self.command, self.command_id)
+            except CircuitOpen as ex:
+                # The endpoint is down, try again on the next poll until the deadline
+                _LOGGER.debug(str(ex))
+                status_response = None
+            _LOGGER.debug(status_response)
+
+            if status_response is not None and status_response.get("status") is not None:
+                status = status_response.get("commandStatus")
+                if status:
+                    self._report(status)
+
+                if status == COMMAND_STATUS_COMPLETED:
+                    return True
+
+                if status == COMMAND_STATUS_FAILED:
+                    return False
+
+            if time.monotonic() >= deadline:
+                _LOGGER.debug("Command " + self.command + " timed out after " + str(round(timeout)) + "s")
+                self._report(COMMAND_STATUS_TIMEOUT)
+                return False
+
+            delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
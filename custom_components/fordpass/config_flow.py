@@ -6,8 +6,10 @@ import string
 import hashlib
 import voluptuous as vol
 from homeassistant import config_entries, core, exceptions
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.components import webhook
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, CONF_WEBHOOK_ID
 from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from base64 import urlsafe_b64encode
 
 
@@ -22,10 +24,22 @@ from .const import (  # pylint:disable=unused-import
     VIN,
     UPDATE_INTERVAL,
     UPDATE_INTERVAL_DEFAULT,
+    COMMAND_TIMEOUT,
+    COMMAND_TIMEOUT_DEFAULT,
+    ADAPTIVE_POLLING,
+    ADAPTIVE_POLLING_DEFAULT,
+    DAILY_REQUEST_BUDGET,
+    DAILY_REQUEST_BUDGET_DEFAULT,
+    PUSH_MODE,
+    PUSH_MODE_DEFAULT,
+    SAFETY_NET_INTERVAL,
+    SAFETY_NET_INTERVAL_DEFAULT,
     DISTANCE_CONVERSION_DISABLED,
-    DISTANCE_CONVERSION_DISABLED_DEFAULT
+    DISTANCE_CONVERSION_DISABLED_DEFAULT,
+    FLEET,
+    VINS
 )
-from .fordpass_new import Vehicle
+from .fordpass_new import Account
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,30 +62,37 @@ VIN_SCHEME = vol.Schema(
 def configured_vehicles(hass):
     """Return a list of configured vehicles"""
     return {
-        entry.data[VIN]
+        vin
         for entry in hass.config_entries.async_entries(DOMAIN)
+        for vin in entry.data.get(VINS, [entry.data.get(VIN)])
     }
 
 async def validate_token(hass: core.HomeAssistant, data):
-    vehicle = Vehicle(data["client_id"], data["client_secret"], "")
-    results = await hass.async_add_executor_job(
-        vehicle.generate_tokens,
-        data["tokenstr"]
-        )
-
-    if results:
-        _LOGGER.debug("Getting Vehicles")
-        vehicles = await(hass.async_add_executor_job(vehicle.vehicles))
-        _LOGGER.debug(vehicles)
-        return vehicles
+    account = Account(async_get_clientsession(hass), data["client_id"], data["client_secret"])
+    try:
+        results = await account.generate_tokens(data["tokenstr"])
+
+        if results:
+            _LOGGER.debug("Getting Vehicles")
+            # Vehicles added since the last look must show up, and errors must not hide behind the cache
+            vehicles = await account.vehicles(cached=False)
+            _LOGGER.debug(vehicles)
+            return vehicles
+    finally:
+        # Stop this account's token refresh, the entry's own account takes over
+        await account.async_close()
 
 async def validate_vin(hass: core.HomeAssistant, data):
-    vehicle = Vehicle(data['client_id'], data['client_secret'], data[VIN])
-    test = await(hass.async_add_executor_job(vehicle.get_status))
+    account = Account(async_get_clientsession(hass), data['client_id'], data['client_secret'])
+    try:
+        vehicle = account.vehicle(data[VIN])
+        test = await vehicle.status()
+    finally:
+        await account.async_close()
     _LOGGER.debug("GOT SOMETHING BACK?")
     _LOGGER.debug(test)
-    if test and test.status_code == 200:
-        _LOGGER.debug("200 Code")
+    if test and test.get("vehicleId") == data[VIN]:
+        _LOGGER.debug("Vehicle found")
         return True
     if not test:
         raise InvalidVin
@@ -85,6 +106,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     client_secret = None
     client_id = None
     login_input = {}
+    available_vehicles = {}
 
     async def async_step_user(self, user_input=None):
         errors = {}
@@ -173,6 +195,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(step_id="vin", data_schema=VIN_SCHEME, errors=errors)
     
     async def async_step_vehicle(self, user_input=None):
+        if user_input is not None and user_input[VIN] == FLEET:
+            vins = [vin for vin in self.available_vehicles if vin != FLEET]
+            self.login_input[FLEET] = True
+            self.login_input[VINS] = vins
+            return self.async_create_entry(title=f"Fleet ({len(vins)} vehicles)", data=self.login_input)
+
         if user_input is not None:
             _LOGGER.debug("Checking Vehicle is accessible")
             self.login_input[VIN] = user_input["vin"]
@@ -196,6 +224,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             _LOGGER.debug("No Vehicles?")
             return self.async_abort(reason="no_vehicles")
 
+        if len(avaliable_vehicles) > 1:
+            avaliable_vehicles[FLEET] = f"All {len(avaliable_vehicles)} vehicles (fleet mode)"
+        self.available_vehicles = avaliable_vehicles
+
         return self.async_show_form(
             step_id="vehicle",
             data_schema = vol.Schema(
@@ -218,6 +250,12 @@ class OptionsFlow(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         if user_input is not None:
+            # Keep the webhook address stable once push mode was enabled
+            webhook_id = self.config_entry.options.get(CONF_WEBHOOK_ID)
+            if webhook_id is None and user_input.get(PUSH_MODE):
+                webhook_id = webhook.async_generate_id()
+            if webhook_id is not None:
+                user_input[CONF_WEBHOOK_ID] = webhook_id
             return self.async_create_entry(title="", data=user_input)
         options = {
             vol.Optional(
@@ -244,6 +282,36 @@ class OptionsFlow(config_entries.OptionsFlow):
                     UPDATE_INTERVAL, UPDATE_INTERVAL_DEFAULT
                 ),
             ): int,
+            vol.Optional(
+                COMMAND_TIMEOUT,
+                default=self.config_entry.options.get(
+                    COMMAND_TIMEOUT, COMMAND_TIMEOUT_DEFAULT
+                ),
+            ): int,
+            vol.Optional(
+                ADAPTIVE_POLLING,
+                default=self.config_entry.options.get(
+                    ADAPTIVE_POLLING, ADAPTIVE_POLLING_DEFAULT
+                ),
+            ): bool,
+            vol.Optional(
+                DAILY_REQUEST_BUDGET,
+                default=self.config_entry.options.get(
+                    DAILY_REQUEST_BUDGET, DAILY_REQUEST_BUDGET_DEFAULT
+                ),
+            ): int,
+            vol.Optional(
+                PUSH_MODE,
+                default=self.config_entry.options.get(
+                    PUSH_MODE, PUSH_MODE_DEFAULT
+                ),
+            ): bool,
+            vol.Optional(
+                SAFETY_NET_INTERVAL,
+                default=self.config_entry.options.get(
+                    SAFETY_NET_INTERVAL, SAFETY_NET_INTERVAL_DEFAULT
+                ),
+            ): int,
             
         }
 
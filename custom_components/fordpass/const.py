@@ -22,25 +22,62 @@ DISTANCE_CONVERSION_DISABLED_DEFAULT = False
 UPDATE_INTERVAL = "update_interval"
 UPDATE_INTERVAL_DEFAULT = 900
 
+COMMAND_TIMEOUT = "command_timeout"
+COMMAND_TIMEOUT_DEFAULT = 130
+
+ADAPTIVE_POLLING = "adaptive_polling"
+ADAPTIVE_POLLING_DEFAULT = True
+DAILY_REQUEST_BUDGET = "daily_request_budget"
+DAILY_REQUEST_BUDGET_DEFAULT = 720
+
+# Push mode receives vehicle data through a webhook and only polls as a safety net
+PUSH_MODE = "push_mode"
+PUSH_MODE_DEFAULT = False
+SAFETY_NET_INTERVAL = "safety_net_interval"
+SAFETY_NET_INTERVAL_DEFAULT = 21600
+PUSH = "push"
+
 COORDINATOR = "coordinator"
+COORDINATORS = "coordinators"
+ACCOUNTS = "accounts"
+
+# Fleet entries hold many VINs under one entry
+FLEET = "fleet"
+VINS = "vins"
 
 SENSORS = {
-    "odometer": {"icon": "mdi:counter", "state_class": "total", "device_class": "distance", "api_key": "odometer", "measurement": "km"},
-    "fuel": {"icon": "mdi:gas-station", "api_key": ["fuelLevel"], "measurement": "%"},
-    "hvBattery": {"icon": "mdi:battery", "api_key": ["batteryChargeLevel"], "measurement": "%"},
-    "hvChargingStatus": {"icon": "mdi:power-plug-battery", "api_key": ["chargingStatus"]},
-    "hvPlugStatus": {"icon": "mdi:power-plug-outline", "api_key": ["plugStatus"]},
-    "tirePressureWarning": {"icon": "mdi:car-tire-alert", "api_key": "tirePressureWarning" },
-    "alarm": {"icon": "mdi:bell", "api_key": "alarmStatus"},
-    "ignitionStatus": {"icon": "hass:power", "api_key": "ignitionStatus"},
-    "doorStatus": {"icon": "mdi:car-door", "api_key": "doorStatus"},
-    "windowPosition": {"icon": "mdi:car-door", "api_key": "windowStatus"},
-    "lastRefresh": {"icon": "mdi:clock", "device_class": "timestamp", "api_key": "lastRefresh" , "sensor_type": "single"},
-    "speed": {"icon": "mdi:speedometer", "device_class": "speed", "state_class": "measurement", "api_key": "vehicleLocation", "measurement": "km/h"},
-    "deepSleep": {"icon": "mdi:power-sleep", "name": "Deep Sleep Mode Active", "api_key": "commandPreclusion", "api_class": "states"},
-    "remoteStartStatus": {"icon": "mdi:remote", "api_key": "remoteStartCountdownTimer"},
-    "firmwareUpgradeInProgress": {"icon": "mdi:car-cog", "api_key": "firmwareUpgradeInProgress" },
-    "deepSleepInProgress": {"icon": "mdi:sleep", "api_key": "deepSleepInProgress" }
+    "odometer": {"icon": "mdi:counter", "state_class": "total", "device_class": "distance", "api_key": "odometer", "measurement": "km", "value": "metrics.odometer", "round": True, "default": None, "attributes_map": {}},
+    "fuel": {"icon": "mdi:gas-station", "api_key": ["fuelLevel"], "measurement": "%", "value": "metrics.fuelLevel.value", "round": True, "default": None, "value_default": 0},
+    "hvBattery": {"icon": "mdi:battery", "api_key": ["batteryChargeLevel"], "measurement": "%", "value": "metrics.batteryChargeLevel.value", "round": True, "default": None, "value_default": 0, "attributes_map": {"distanceToEmpty": "metrics.batteryChargeLevel.distanceToEmpty"}},
+    "hvChargingStatus": {"icon": "mdi:power-plug-battery", "api_key": ["chargingStatus"], "value": "metrics.chargingStatus.value"},
+    "hvPlugStatus": {"icon": "mdi:power-plug-outline", "api_key": ["plugStatus"], "value": "metrics.plugStatus.value"},
+    "tirePressureWarning": {"icon": "mdi:car-tire-alert", "api_key": "tirePressureWarning", "value": "metrics.tirePressureWarning"},
+    "alarm": {"icon": "mdi:bell", "api_key": "alarmStatus", "value": "metrics.alarmStatus.value", "attributes": "metrics.alarmStatus"},
+    "ignitionStatus": {"icon": "hass:power", "api_key": "ignitionStatus", "value": "metrics.ignitionStatus.value", "attributes": "metrics.ignitionStatus"},
+    "doorStatus": {"icon": "mdi:car-door", "api_key": "doorStatus", "value_fn": "door_status", "attributes_fn": "door_attributes", "sources": ["metrics.doorStatus", "hoodStatus"]},
+    "windowPosition": {"icon": "mdi:car-door", "api_key": "windowStatus", "value_fn": "window_position", "attributes_fn": "window_attributes", "sources": ["windowStatus"]},
+    "lastRefresh": {"icon": "mdi:clock", "device_class": "timestamp", "api_key": "lastRefresh", "sensor_type": "single", "value_fn": "last_refresh", "sources": ["lastUpdated"]},
+    "speed": {"icon": "mdi:speedometer", "device_class": "speed", "state_class": "measurement", "api_key": "vehicleLocation", "measurement": "km/h", "value": "metrics.vehicleLocation.speed"},
+    "deepSleep": {"icon": "mdi:power-sleep", "name": "Deep Sleep Mode Active", "api_key": "commandPreclusion", "api_class": "states", "value": "metrics.deepSleepStatus"},
+    "remoteStartStatus": {"icon": "mdi:remote", "api_key": "remoteStartCountdownTimer", "value_fn": "remote_start_status", "attributes_fn": "remote_start_attributes", "sources": ["remoteStartCountdownTimer"]},
+    "firmwareUpgradeInProgress": {"icon": "mdi:car-cog", "api_key": "firmwareUpgradeInProgress", "value": "metrics.firmwareUpgradeInProgress", "attributes": "metrics.firmwareUpgradeInProgress"},
+    "deepSleepInProgress": {"icon": "mdi:sleep", "api_key": "deepSleepInProgress", "value": "metrics.deepSleepInProgress"}
+}
+
+METRIC_SENSORS = {
+    "api_latency": {"icon": "mdi:timer-outline", "measurement": "ms"},
+    "api_errors": {"icon": "mdi:alert-circle-outline", "state_class": "total_increasing"},
+    "cache_hit_ratio": {"icon": "mdi:database-check", "measurement": "%"},
+    "command_duration": {"icon": "mdi:timer-sand", "measurement": "s"},
+    "token_refreshes": {"icon": "mdi:key-change", "state_class": "total_increasing"},
+    "connection_reuse": {"icon": "mdi:connection", "measurement": "%"},
+}
+
+TRIP_SENSORS = {
+    "last_trip_distance": {"icon": "mdi:map-marker-distance", "device_class": "distance", "measurement": "km"},
+    "last_trip_duration": {"icon": "mdi:timer-outline", "device_class": "duration", "measurement": "min"},
+    "distance_today": {"icon": "mdi:road-variant", "device_class": "distance", "state_class": "total_increasing", "measurement": "km"},
+    "trips_today": {"icon": "mdi:car-clock", "state_class": "total_increasing"},
 }
 
 SWITCHES = {
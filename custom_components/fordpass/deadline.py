@@ -0,0 +1,92 @@
+"""Time budgets shared by every request made for one operation"""
+
+import asyncio
+import contextvars
+
+# Budget of a coordinator refresh: the status fetch with its retries and a token refresh
+REFRESH_DEADLINE = 120
+# Sending a command and fetching the status after it, on top of the command timeout
+COMMAND_DEADLINE_MARGIN = 60
+# Longest a single request may take when the budget allows more
+REQUEST_TIMEOUT = 60
+
+_current = contextvars.ContextVar("fordpass_deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when an operation has used up its time budget"""
+
+
+class Deadline:
+    """Gives the code inside `async with` a total time budget
+
+    Requests made inside size their timeouts and retries to what is left,
+    see request_timeout and sleep_before_retry, and whatever still runs when
+    the budget is spent is cancelled and DeadlineExceeded raised. A nested
+    Deadline never extends the one around it, a detached one starts afresh
+    for work that may outlive its caller.
+    """
+
+    def __init__(self, budget, detached=False):
+        self.budget = budget
+        self.detached = detached
+        self.expires_at = None
+        self._loop = None
+        self._token = None
+        self._timeout = None
+
+    @property
+    def remaining(self):
+        """Return the seconds left"""
+        return max(self.expires_at - self._loop.time(), 0)
+
+    def timeout(self, timeout=REQUEST_TIMEOUT):
+        """Return the timeout for the next request, raises DeadlineExceeded when no time is left"""
+        remaining = self.remaining
+        if remaining <= 0:
+            raise DeadlineExceeded(f"No time left of the {self.budget}s budget")
+        return min(timeout, remaining) if timeout else remaining
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self.expires_at = self._loop.time() + self.budget
+        parent = None if self.detached else _current.get()
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self._token = _current.set(self)
+        self._timeout = asyncio.timeout_at(self.expires_at)
+        await self._timeout.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        try:
+            return await self._timeout.__aexit__(exc_type, exc, tb)
+        except TimeoutError as ex:
+            raise DeadlineExceeded(f"Operation exceeded its {self.budget}s budget") from ex
+
+
+def current_deadline():
+    """Return the Deadline of the running operation, or None"""
+    return _current.get()
+
+
+def request_timeout(timeout=REQUEST_TIMEOUT):
+    """Return the timeout for a request, shortened to the budget that is left"""
+    deadline = _current.get()
+    return timeout if deadline is None else deadline.timeout(timeout)
+
+
+async def sleep_before_retry(delay):
+    """Wait before a retry, or raise DeadlineExceeded when the budget would run out first"""
+    deadline = _current.get()
+    if deadline is not None and deadline.remaining <= delay:
+        raise DeadlineExceeded(f"No time left to retry within the {deadline.budget}s budget")
+    await asyncio.sleep(delay)
+
+
+def create_detached_task(coro):
+    """Run coro in a task that is not bound by the caller's deadline"""
+    context = contextvars.copy_context()
+    context.run(_current.set, None)
+    return asyncio.get_running_loop().create_task(coro, context=context)
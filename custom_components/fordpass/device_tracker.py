@@ -5,22 +5,24 @@ from homeassistant.components.device_tracker import SourceType
 from homeassistant.components.device_tracker.config_entry import TrackerEntity
 
 from . import FordPassEntity
-from .const import DOMAIN, COORDINATOR
+from .const import DOMAIN, COORDINATORS
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Add the Entities from the config."""
-    entry = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
-
-    # Added a check to see if the car supports GPS
     _LOGGER.debug("START GPS")
-    _LOGGER.debug(entry.data["vehicleLocation"])
-    if "vehicleLocation" in entry.data and entry.data["vehicleLocation"] is not None:
-        async_add_entities([CarTracker(entry, "gps")], True)
-    else:
-        _LOGGER.debug("Vehicle does not support GPS")
+    for entry in hass.data[DOMAIN][config_entry.entry_id][COORDINATORS]:
+        entry.async_add_vehicle_entities(async_add_entities, vehicle_trackers)
+
+
+def vehicle_trackers(coordinator):
+    """Return the tracker if the vehicle supports GPS"""
+    if coordinator.capabilities["gps"]:
+        return [CarTracker(coordinator, "gps")]
+    _LOGGER.debug("Vehicle does not support GPS")
+    return []
 
 
 class CarTracker(FordPassEntity, TrackerEntity):
@@ -34,15 +36,21 @@ class CarTracker(FordPassEntity, TrackerEntity):
         # Required for HA 2022.7
         self.coordinator_context = object()
 
+    def _coordinate(self, key):
+        location = self.coordinator.data.location
+        if not location or location.get(key) is None:
+            return None
+        return float(location[key])
+
     @property
     def latitude(self):
-        """Return latitude"""
-        return float(self.coordinator.data["vehicleLocation"]["latitude"])
+        """Return latitude, None while the car reports no location"""
+        return self._coordinate("latitude")
 
     @property
     def longitude(self):
-        """Return longtitude"""
-        return float(self.coordinator.data["vehicleLocation"]["longitude"])
+        """Return longtitude, None while the car reports no location"""
+        return self._coordinate("longitude")
 
     @property
     def source_type(self):
@@ -61,10 +69,11 @@ class CarTracker(FordPassEntity, TrackerEntity):
 
     @property
     def extra_state_attributes(self):
+        location = self.coordinator.data.location or {}
         atts = {
-            "direction": self.coordinator.data["vehicleLocation"]["direction"],
-            "speed": self.coordinator.data["vehicleLocation"]["speed"],
-            "timestamp": self.coordinator.data["vehicleLocation"]["timeStamp"],
+            "direction": location.get("direction"),
+            "speed": location.get("speed"),
+            "timestamp": location.get("timeStamp"),
         }
         return atts
 
@@ -0,0 +1,55 @@
+"""Diagnostics support for FordPass."""
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant
+
+from .const import COORDINATORS, DOMAIN, FLEET, PUSH
+
+TO_REDACT = {
+    "client_id",
+    "client_secret",
+    "vin",
+    "vehicleId",
+    "latitude",
+    "longitude",
+}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinators = entry_data[COORDINATORS]
+    account = coordinators[0].account
+
+    diagnostics = {
+        "entry": async_redact_data(entry.data, TO_REDACT | {"vins"}),
+        "options": async_redact_data(entry.options, {CONF_WEBHOOK_ID}),
+        "rate_limit": account.rate_limiter.as_dict(),
+        "circuit_breakers": account.breakers.as_dict(),
+        "metrics": account.metrics.as_dict(),
+        "cache_writes": account.cache.writes,
+    }
+
+    if PUSH in entry_data:
+        diagnostics["push"] = entry_data[PUSH].as_dict()
+
+    if entry.data.get(FLEET):
+        diagnostics["fleet"] = {
+            "vehicles": len(coordinators),
+            "failing": sum(not coordinator.last_update_success for coordinator in coordinators),
+            "shortest_interval": min(coordinator.refresh_interval.total_seconds() for coordinator in coordinators),
+            "longest_interval": max(coordinator.refresh_interval.total_seconds() for coordinator in coordinators),
+        }
+        return diagnostics
+
+    coordinator = coordinators[0]
+    diagnostics.update({
+        "update_interval": coordinator.refresh_interval.total_seconds(),
+        "last_update_success": coordinator.last_update_success,
+        "api_available": coordinator.api_available,
+        "capabilities": coordinator.capabilities,
+        "data": async_redact_data(coordinator.data or {}, TO_REDACT),
+    })
+    return diagnostics
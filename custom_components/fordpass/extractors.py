@@ -0,0 +1,228 @@
+"""Sensor value extraction driven by the SENSORS table"""
+
+import logging
+from collections.abc import Mapping
+from datetime import datetime
+from functools import lru_cache
+
+from homeassistant.util import dt
+
+from .state import VehicleState
+
+_LOGGER = logging.getLogger(__name__)
+
+UNSUPPORTED = "Unsupported"
+_MISSING = object()
+
+
+def compile_path(path):
+    """Return a function reading a dotted path from the vehicle document"""
+    keys = tuple(path.split("."))
+
+    def get(data):
+        for key in keys:
+            if not isinstance(data, (dict, Mapping)):
+                return _MISSING
+            data = data.get(key, _MISSING)
+            if data is _MISSING:
+                return _MISSING
+        return data
+
+    return get
+
+
+@lru_cache(maxsize=32)
+def parse_datestr(datestr):
+    """Parse the API timestamp format into a local datetime"""
+    return dt.as_local(datetime.strptime(datestr + " +0000", "%m-%d-%Y %H:%M:%S %z"))
+
+
+def door_status(data):
+    for value in data.get("metrics", {}).get("doorStatus", []):
+        if value["value"] in ["CLOSED", "Invalid", "UNKNOWN"]:
+            continue
+        return "Open"
+    if data.get("hoodStatus", {}).get("value") == "OPEN":
+        return "Open"
+    return "Closed"
+
+
+def door_attributes(data):
+    if isinstance(data, VehicleState):
+        return dict(data.doors) or None
+    doors = {}
+    for value in data.get("metrics", {}).get("doorStatus", []):
+        if "vehicleDoor" not in value:
+            continue
+        if value['vehicleDoor'] == "UNSPECIFIED_FRONT":
+            doors["FRONT_" + value['vehicleOccupantRole']] = value.get('value', None)
+        else:
+            doors[value['vehicleDoor']] = value.get('value', None)
+
+    if "hoodStatus" in data:
+        doors["HOOD"] = data["hoodStatus"]["value"]
+
+    return doors or None
+
+
+def window_position(data):
+    for window in data.get("windowStatus", []):
+        windowrange = window.get("value", {}).get("doubleRange", {})
+        if windowrange.get("lowerBound", 0.0) != 0.0 or windowrange.get("upperBound", 0.0) != 0.0:
+            return "Open"
+    return "Closed"
+
+
+def window_attributes(data):
+    if isinstance(data, VehicleState):
+        return dict(data.windows)
+    windows = {}
+    for window in data.get("windowStatus", []):
+        if window["vehicleWindow"] == "UNSPECIFIED_FRONT":
+            windows[window["vehicleSide"]] = window
+        else:
+            windows[window["vehicleWindow"]] = window
+    return windows
+
+
+def last_refresh(data):
+    return parse_datestr(data.get("lastUpdated", ""))
+
+
+def remote_start_status(data):
+    countdown_timer = data.get("remoteStartCountdownTimer", {}).get("value", 0)
+    return "Active" if countdown_timer > 0 else "Inactive"
+
+
+def remote_start_attributes(data):
+    return {"Countdown:": data.get("remoteStartCountdownTimer", {}).get("value", 0)}
+
+
+EXTRACTOR_FUNCTIONS = {
+    "door_status": door_status,
+    "door_attributes": door_attributes,
+    "window_position": window_position,
+    "window_attributes": window_attributes,
+    "last_refresh": last_refresh,
+    "remote_start_status": remote_start_status,
+    "remote_start_attributes": remote_start_attributes,
+}
+
+
+class CompiledSensor:
+    """Precompiled value and attribute extractors for one SENSORS entry"""
+
+    __slots__ = ("key", "value", "attributes", "sources")
+
+    def __init__(self, key, spec):
+        self.key = key
+        self.value = self._compile_value(spec)
+        self.attributes = self._compile_attributes(spec)
+        self.sources = tuple(spec.get("sources", ())) or self._sources(spec)
+
+    @staticmethod
+    def _compile_value(spec):
+        if "value_fn" in spec:
+            return EXTRACTOR_FUNCTIONS[spec["value_fn"]]
+        if "value" not in spec:
+            return lambda data: None
+
+        get = compile_path(spec["value"])
+        default = spec.get("default", UNSUPPORTED)
+        if "value_default" in spec:
+            get = CompiledSensor._with_value_default(get, spec["value"], spec["value_default"])
+        if spec.get("round"):
+            def value(data):
+                result = get(data)
+                return default if result is _MISSING or result is None else round(result)
+        else:
+            def value(data):
+                result = get(data)
+                return default if result is _MISSING else result
+        return value
+
+    @staticmethod
+    def _with_value_default(get, path, value_default):
+        """Return value_default when the field is there without its value, e.g. fuelLevel without value"""
+        get_field = compile_path(path.rsplit(".", 1)[0])
+
+        def get_value(data):
+            result = get(data)
+            if result is _MISSING and isinstance(get_field(data), (dict, Mapping)):
+                return value_default
+            return result
+        return get_value
+
+    @staticmethod
+    def _compile_attributes(spec):
+        if "attributes_fn" in spec:
+            return EXTRACTOR_FUNCTIONS[spec["attributes_fn"]]
+        if "attributes_map" in spec:
+            getters = {name: compile_path(path) for name, path in spec["attributes_map"].items()}
+
+            def attributes(data):
+                result = {}
+                for name, get in getters.items():
+                    value = get(data)
+                    result[name] = None if value is _MISSING else value
+                return result
+            return attributes
+        if "attributes" in spec:
+            get = compile_path(spec["attributes"])
+
+            def attributes(data):
+                value = get(data)
+                return {} if value is _MISSING else value
+            return attributes
+        return lambda data: None
+
+    @staticmethod
+    def _sources(spec):
+        paths = [spec["value"]] if "value" in spec else []
+        if "attributes" in spec:
+            paths.append(spec["attributes"])
+        paths.extend(spec.get("attributes_map", {}).values())
+        # Depend on the field itself, e.g. metrics.fuelLevel for metrics.fuelLevel.value
+        return tuple({".".join(path.split(".")[:2]) for path in paths})
+
+    def affected_by(self, changes):
+        """Return True if any of the changed paths feeds this sensor"""
+        for path in changes:
+            for source in self.sources:
+                if path == source or path.startswith(source + ".") or source.startswith(path + "."):
+                    return True
+        return False
+
+
+class SensorValues:
+    """Sensor states and attributes, computed once per coordinator update"""
+
+    def __init__(self, sensors):
+        self._compiled = [CompiledSensor(key, spec) for key, spec in sensors.items()]
+        self._states = {}
+        self._attributes = {}
+
+    def update(self, data, changes=None):
+        """Recompute the sensors affected by changes, or all when changes is None"""
+        if not data:
+            self._states.clear()
+            self._attributes.clear()
+            return
+        for sensor in self._compiled:
+            if changes is not None and sensor.key in self._states and not sensor.affected_by(changes):
+                continue
+            try:
+                self._states[sensor.key] = sensor.value(data)
+                self._attributes[sensor.key] = sensor.attributes(data)
+            except (KeyError, TypeError, ValueError) as ex:
+                _LOGGER.debug("Could not extract %s: %s", sensor.key, ex)
+                self._states[sensor.key] = None
+                self._attributes[sensor.key] = None
+
+    def state(self, key):
+        """Return the cached state of a sensor"""
+        return self._states.get(key)
+
+    def attributes(self, key):
+        """Return the cached attributes of a sensor"""
+        return self._attributes.get(key)
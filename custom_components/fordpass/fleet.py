@@ -0,0 +1,109 @@
+"""Spreads the refreshes of many vehicles on one entry over the poll interval"""
+
+import asyncio
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between checks for vehicles that are due
+FLEET_TICK = 5
+# Vehicles restored from a snapshot get their first refresh within this many seconds
+STARTUP_SPREAD = 120
+
+
+class FleetRefresher:
+    """Refreshes each vehicle of a fleet in its own slot of the interval
+
+    refresh(vin) fetches one vehicle and returns the seconds until it should
+    be refreshed again, or None for the default interval. Vehicles are given
+    evenly spaced first slots, so requests trickle out instead of arriving in
+    one burst every interval. Concurrency is that of the shared Account.
+
+    min_interval() returns the shortest interval per vehicle the request
+    budget of the account allows. Refreshes are never scheduled closer
+    together than that, and a warning says so when the interval has to be
+    stretched.
+    """
+
+    def __init__(self, refresh, interval, tick=FLEET_TICK, min_interval=None):
+        self._refresh = refresh
+        self.interval = interval
+        self.tick = tick
+        self._min_interval = min_interval
+        # True while the budget does not allow the configured interval
+        self.budget_limited = False
+        self._due = {}
+        self._running = set()
+        self._tasks = set()
+        self._timer = None
+        self.refreshes = 0
+
+    def add(self, vins, spread=None):
+        """Schedule vehicles, their first refreshes spread over spread seconds"""
+        vins = list(vins)
+        spread = self.interval if spread is None else spread
+        # Vehicles added together must not overdraw the budget either
+        spread = max(spread, self.budget_interval())
+        now = time.monotonic()
+        for index, vin in enumerate(vins):
+            self._due[vin] = now + spread * (index + 1) / len(vins)
+
+    def budget_interval(self):
+        """Return the shortest interval per vehicle the request budget allows"""
+        if self._min_interval is None:
+            return 0
+        minimum = self._min_interval()
+        if minimum > self.interval and not self.budget_limited:
+            _LOGGER.warning(
+                "Refreshing every vehicle every " + str(round(self.interval))
+                + "s does not fit the FordConnect request budget of the account, refreshing each every "
+                + str(round(minimum)) + "s instead"
+            )
+            self.budget_limited = True
+        elif minimum <= self.interval and self.budget_limited:
+            _LOGGER.info("Refreshing every " + str(round(self.interval)) + "s fits the request budget again")
+            self.budget_limited = False
+        return minimum
+
+    def remove(self, vin):
+        self._due.pop(vin, None)
+
+    @property
+    def vins(self):
+        return list(self._due)
+
+    def start(self):
+        """Start checking for due vehicles"""
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.tick, self._tick)
+
+    def stop(self):
+        """Stop refreshing and cancel refreshes in flight"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for task in list(self._tasks):
+            task.cancel()
+
+    def _tick(self):
+        self._timer = asyncio.get_running_loop().call_later(self.tick, self._tick)
+        now = time.monotonic()
+        for vin, due in list(self._due.items()):
+            if due <= now and vin not in self._running:
+                self._running.add(vin)
+                task = asyncio.ensure_future(self._async_refresh(vin))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _async_refresh(self, vin):
+        interval = None
+        try:
+            interval = await self._refresh(vin)
+            self.refreshes += 1
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.debug("Refreshing " + vin + " failed: " + str(ex))
+        finally:
+            self._running.discard(vin)
+            if vin in self._due:
+                self._due[vin] = time.monotonic() + max(interval or self.interval, self.budget_interval())
@@ -1,18 +1,34 @@
 """Fordpass API Library"""
 
+import asyncio
 import json
 import logging
 import os
 import hashlib
 import time
+from collections.abc import Mapping
 from base64 import urlsafe_b64encode
-import requests
-from pathlib import Path
-
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from urllib.parse import urlparse, parse_qs
 
+import aiohttp
+
+from .cache import ResponseCache, endpoint_ttl
+from .circuit_breaker import CircuitBreakers, CircuitOpen, backoff_delay
+from .command_queue import CommandQueue
+from .command_tracker import CommandTracker
+from .const import COMMAND_TIMEOUT_DEFAULT
+from .deadline import (
+    REQUEST_TIMEOUT,
+    DeadlineExceeded,
+    create_detached_task,
+    request_timeout,
+    sleep_before_retry,
+)
+from .metrics import ClientMetrics
+from .rate_limit import RateLimiter, RateLimited
+from .state import VehicleState
+from .token_manager import TokenManager
+
 _LOGGER = logging.getLogger(__name__)
 defaultHeaders = {
     "Accept": "*/*",
@@ -37,38 +53,156 @@ AUTONOMIC_URL = "https://localhost:9803"
 AUTONOMIC_ACCOUNT_URL = "https://localhost:9804"
 FORD_LOGIN_URL = "https://localhost:9805"
 
-session = requests.Session()
+API_URL = "https://api.mps.ford.com/api/fordconnect"
+TOKEN_URL = "https://dah2vb2cprod.b2clogin.com/914d88b1-3523-4bf6-9be4-1b96b4f6f919/oauth2/v2.0/token?p=B2C_1A_signup_signin_common"
+
+MAX_CONCURRENT_REQUESTS = 4
+
+# A forced refresh wakes the car for all of these at once
+REFRESH_COMMAND = "refresh"
+REFRESH_COMMANDS = ("status", "location")
+
+# Connection pool of an account: API requests are bounded by the request
+# semaphore, the extra connection keeps token refreshes from queueing behind them
+CONNECTIONS_PER_HOST = MAX_CONCURRENT_REQUESTS + 1
+# Keep idle connections (and their TLS sessions) open between close requests
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+
+
+def create_session(metrics=None, ssl_context=None):
+    """Return a ClientSession with its own keep-alive connection pool
+
+    When metrics are given, new and reused connections are counted.
+    """
+    connector = aiohttp.TCPConnector(
+        limit_per_host=CONNECTIONS_PER_HOST,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        ssl=ssl_context if ssl_context is not None else True,
+    )
+    trace_configs = []
+    if metrics is not None:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_connection_create_end(session, context, params):
+            metrics.record_connection(False)
+
+        async def on_connection_reuseconn(session, context, params):
+            metrics.record_connection(True)
+
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_configs.append(trace_config)
+    return aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+
+
+def document_fingerprint(document):
+    """Return a stable hash of a JSON document"""
+    return hashlib.sha1(json.dumps(document, sort_keys=True).encode()).hexdigest()
+
+
+def diff_documents(old, new, prefix=""):
+    """Return the changed fields between two documents
+
+    Nested mappings are walked and reported by dotted path, anything else
+    (lists included) is compared as a whole. Values are (old, new) tuples.
+    """
+    if old is None:
+        old = {}
+    changes = {}
+    for key in old.keys() | new.keys():
+        old_value = old.get(key)
+        new_value = new.get(key)
+        # Unchanged sections are shared between states, skip them cheaply
+        if old_value is new_value or old_value == new_value:
+            continue
+        path = prefix + key
+        if isinstance(old_value, Mapping) and isinstance(new_value, Mapping):
+            changes.update(diff_documents(old_value, new_value, path + "."))
+        else:
+            changes[path] = (old_value, new_value)
+    return changes
 
 
-class Vehicle:
-    # Represents a Ford vehicle, with methods for status and issuing commands
+class Account:
+    # Represents a FordConnect API client, shared by all vehicles using the same client_id
+    # Without a session the account creates and closes its own connection pool
 
     def __init__(
-        self, client_id, client_secret, vin
+        self, session, client_id, client_secret, max_concurrent_requests=MAX_CONCURRENT_REQUESTS,
+        api_url=API_URL, token_url=TOKEN_URL, token_location=None, cache_location=None, ssl_context=None
     ):
+        self.metrics = ClientMetrics()
+        self._owns_session = session is None
+        if session is None:
+            session = create_session(self.metrics, ssl_context)
+        self.session = session
         self.client_id = client_id
         self.client_secret = client_secret
-        self.vin = vin
-        self.token = None
-        self.expires = None
-        self.expires_at = None
-        self.refresh_token = None
-        adapter = HTTPAdapter()
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._vehicles = {}
+        # url -> (etag, last_modified, document) for conditional requests
+        self._validators = {}
+        self.rate_limiter = RateLimiter()
+        # Endpoints that keep failing are not called until a probe succeeds
+        self.breakers = CircuitBreakers()
+        self._revalidating = {}
+        # Urls answered from the cache because fetching them failed
+        self._serving_cached = set()
 
         self.application_id = "AFDC085B-377A-4351-B23E-5E1D35FB3700"
 
-        self.token_location = "custom_components/fordpass/" + client_id + "_fordpass_token.txt"
-        self.cache_location = ".fordpass-cache/" + client_id + "/"
+        self.api_url = api_url
+        self.token_url = token_url
+        self.token_location = token_location or "custom_components/fordpass/" + client_id + "_fordpass_token.txt"
+        self.cache_location = cache_location or ".fordpass-cache/" + client_id + "/"
+        self.tokens = TokenManager(self.token_location, self.refresh_token_func)
+        self.cache = ResponseCache(self.cache_location)
 
         _LOGGER.debug(self.token_location)
 
     def base64_url_encode(self, data):
         """Encode string to base64"""
         return urlsafe_b64encode(data).rstrip(b'=')
-    
-    def generate_tokens(self, urlstring):
+
+    async def _run_in_executor(self, func, *args):
+        """Run blocking file access outside the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def vehicle(self, vin, command_timeout=COMMAND_TIMEOUT_DEFAULT):
+        """Return the Vehicle for a VIN on this account"""
+        vehicle = self._vehicles.get(vin)
+        if vehicle is None:
+            vehicle = Vehicle(self, vin, command_timeout)
+            self._vehicles[vin] = vehicle
+        vehicle.command_timeout = command_timeout
+        return vehicle
+
+    def remove_vehicle(self, vin):
+        """Detach a vehicle and stop its pending commands"""
+        vehicle = self._vehicles.pop(vin, None)
+        if vehicle is not None:
+            vehicle.cancel_commands()
+
+    @property
+    def vins(self):
+        """Return the VINs of all attached vehicles"""
+        return list(self._vehicles)
+
+    async def status_all(self, cached=True):
+        """Fetch the status of all attached vehicles concurrently
+
+        Concurrency is bounded by the account's request semaphore. Returns a
+        dict of VIN to status, or to the exception raised for that vehicle.
+        """
+        vehicles = list(self._vehicles.values())
+        results = await asyncio.gather(
+            *(vehicle.status(cached) for vehicle in vehicles), return_exceptions=True
+        )
+        return {vehicle.vin: result for vehicle, result in zip(vehicles, results)}
+
+    async def generate_tokens(self, urlstring):
         code_url = urlparse(urlstring).query
 
         query_string = parse_qs(code_url)
@@ -86,22 +220,20 @@ class Vehicle:
         headers = {
             **loginHeaders,
         }
-        req = requests.post(
-                f"https://dah2vb2cprod.b2clogin.com/914d88b1-3523-4bf6-9be4-1b96b4f6f919/oauth2/v2.0/token?p=B2C_1A_signup_signin_common",
-                headers=headers,
-                data=data,
-                verify=True,
-                timeout=30
-            )
+        async with self.session.post(
+            self.token_url,
+            headers=headers,
+            data=data,
+            timeout=aiohttp.ClientTimeout(total=request_timeout())
+        ) as req:
+            result = await req.json(content_type=None)
 
-        self.write_token(req.json())
+        await self.tokens.async_set(result)
 
         return True
 
-    def refresh_token_func(self, token):
-        """Refresh token if still valid"""
-
-        _LOGGER.info("Refreshing fordpass token")
+    async def refresh_token_func(self, token):
+        """Exchange the refresh token for a new token"""
 
         data = {
             "grant_type": "refresh_token",
@@ -114,286 +246,428 @@ class Vehicle:
             **loginHeaders
         }
 
-        response = session.post(
-            f"https://dah2vb2cprod.b2clogin.com/914d88b1-3523-4bf6-9be4-1b96b4f6f919/oauth2/v2.0/token?p=B2C_1A_signup_signin_common",
-            data=data,
-            headers=headers,
-        )
-
-        if response.status_code == 200:
-            result = response.json()
-            self.write_token(result)
-
-            self.token = result["access_token"]
-            self.refresh_token = result["refresh_token"]
-            self.expires_at = result["expires_on"]
-
-            _LOGGER.debug("WRITING REFRESH TOKEN")
-            return result
-        if response.status_code == 401:
-            _LOGGER.debug("401 response stage 2: refresh stage 1 token")
-            response.raise_for_status()
-
-
-    def __acquire_token(self):
-
-        # Fetch and refresh token as needed
-        # If file exists read in token file and check it's valid
-        _LOGGER.debug("Fetching token")
-
-        if os.path.isfile(self.token_location):
-            data = self.read_token()
-            self.token = data["access_token"]
-            self.refresh_token = data["refresh_token"]
-            self.expires_at = data["expires_on"]
-        else:
-            data = {}
-            data["access_token"] = self.token
-            data["refresh_token"] = self.refresh_token
-            data["expires_on"] = self.expires_at
-
-        if self.expires_at:
-            if time.time() >= self.expires_at:
-                _LOGGER.debug("No token, or has expired, requesting new token")
-                self.refresh_token_func(data)
-
-        _LOGGER.debug("Token is valid, continuing")
-
-    def write_token(self, token):
-        """Save token to file for reuse"""
-        with open(self.token_location, "w", encoding="utf-8") as outfile:
-            json.dump(token, outfile)
-
-    def read_token(self):
-        """Read saved token from file"""
+        total = request_timeout()
+        breaker = self.breakers.for_url(self.token_url)
+        probe = breaker.before_call()
+        start = time.monotonic()
         try:
-            with open(self.token_location, encoding="utf-8") as token_file:
-                token = json.load(token_file)
-                return token
-        except ValueError:
-            _LOGGER.debug("Fixing malformed token")
-            with open(self.token_location, encoding="utf-8") as token_file:
-                token = json.load(token_file)
-                return token
-
-    def request_update(self):
-        status = self.__request_and_poll_command("status") and self.__request_and_poll_command("location")
-
-        if status:
-            self.status()
+            async with self.session.post(
+                self.token_url,
+                data=data,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=total)
+            ) as response:
+                self.metrics.record_response(self.token_url, time.monotonic() - start, response.status)
+                self._record_outcome(breaker, response.status)
+                if response.status == 200:
+                    _LOGGER.debug("Got refreshed token")
+                    result = await response.json(content_type=None)
+                    self.metrics.record_token_refresh(True)
+                    return result
+                if response.status == 401:
+                    _LOGGER.debug("401 response stage 2: refresh stage 1 token")
+                response.raise_for_status()
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as error:
+            self._record_error(breaker, error, total)
+            self.metrics.record_token_refresh(False)
+            raise
+        except Exception:
+            self.metrics.record_token_refresh(False)
+            raise
+        finally:
+            if probe:
+                breaker.release_probe()
+        return None
 
-        return status
+    @staticmethod
+    def _record_error(breaker, error, total):
+        """Count a failed call, but not a timeout the deadline cut short"""
+        if not isinstance(error, asyncio.TimeoutError) or total >= REQUEST_TIMEOUT:
+            breaker.record_failure()
+
+    @staticmethod
+    def _record_outcome(breaker, status):
+        """Server errors count against the endpoint, any other answer shows it is up"""
+        if status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
 
+    async def acquire_token(self):
+        """Return a valid access token"""
+        return await self.tokens.async_get_access_token()
 
-    def clear_token(self):
+    async def clear_token(self):
         """Clear tokens from config directory"""
+        await self.tokens.async_clear()
+        await self._run_in_executor(self._remove_legacy_tokens)
+
+    def _remove_legacy_tokens(self):
         if os.path.isfile("/tmp/fordpass_token.txt"):
             os.remove("/tmp/fordpass_token.txt")
         if os.path.isfile("/tmp/token.txt"):
             os.remove("/tmp/token.txt")
-        if os.path.isfile(self.token_location):
-            os.remove(self.token_location)
-
 
-    def status(self):
-        """Get Vehicle status from API"""
-
-        _LOGGER.debug("Fetch vehicle status")
-
-        result = self.get_json_with_cache(f"https://api.mps.ford.com/api/fordconnect/v3/vehicles/{self.vin}", timeout=300)
-
-        if result:
-
-            v = {
-                **result["vehicle"],
-                "metrics": {
-                   **result["vehicle"]["vehicleStatus"],
-                   **result["vehicle"]["vehicleDetails"]
-                }
-            }
-
-            return v
-
-        raise Exception("No result from v3 vehicle fetch, and no cached result available")
-
-    def get_json_with_cache(self, url, timeout=30):
+    async def async_close(self):
+        """Release resources held by the account and write pending cache files"""
+        self.tokens.close()
+        await self.cache.async_flush()
+        if self._owns_session and not self.session.closed:
+            await self.session.close()
+
+    async def get_json_with_cache(self, url, timeout=REQUEST_TIMEOUT, conditional=False, cached=True, on_revalidated=None, fallback=True):
+        """Get a document, serving it from the response cache while it is usable
+
+        Fresh cache entries are returned as is. Within the endpoint's stale
+        window the cached document is returned at once and fetched again in
+        the background, on_revalidated gets the new document. cached=False
+        always asks the API. When asking fails the cached document is
+        returned instead, unless fallback=False.
+        """
+        fresh_ttl, stale_ttl = endpoint_ttl(url)
+        if cached and stale_ttl:
+            entry = await self.cache.async_get(url)
+            if entry is not None and entry.age < stale_ttl:
+                if entry.age < fresh_ttl:
+                    _LOGGER.debug("Fresh cached result for " + url)
+                    self.metrics.record_cache("fresh")
+                else:
+                    _LOGGER.debug("Stale cached result for " + url + ", revalidating")
+                    self.metrics.record_cache("stale")
+                    self._revalidate(url, timeout, conditional, on_revalidated)
+                return entry.document
+            self.metrics.record_cache("miss")
+
+        return await self._fetch_with_cache(url, timeout, conditional, fallback)
+
+    def _revalidate(self, url, timeout, conditional, on_revalidated):
+        task = self._revalidating.get(url)
+        if task is None:
+            # Runs on after the caller returned, so not within its deadline
+            task = create_detached_task(self._fetch_with_cache(url, timeout, conditional))
+            self._revalidating[url] = task
+            task.add_done_callback(lambda _: self._revalidating.pop(url, None))
+
+        def done(task):
+            if task.cancelled():
+                return
+            if task.exception() is not None:
+                self._cached_served(url, task.exception())
+                return
+            if on_revalidated is not None and task.result():
+                on_revalidated(task.result())
+
+        task.add_done_callback(done)
+
+    async def _fetch_with_cache(self, url, timeout, conditional, fallback=True):
         try:
-            response = self.get_for_json(url, timeout)
+            response = await self.get_for_json(url, timeout=timeout, conditional=conditional)
 
             if response:
-                try:
-                    _LOGGER.debug("Writing cached result for " + url + " to cache")
-                    self.write_json_cache(url, response)
-                except:
-                    """Ignore"""
+                _LOGGER.debug("Writing cached result for " + url + " to cache")
+                self.cache.set(url, response)
+                if url in self._serving_cached:
+                    self._serving_cached.discard(url)
+                    _LOGGER.info("Fetching " + url + " works again")
 
                 return response
-        except requests.exceptions.HTTPError as error:
-            _LOGGER.debug("Response code " + error.status_code + " for url " + url)
+        except aiohttp.ClientResponseError as error:
+            _LOGGER.debug("Response code " + str(error.status) + " for url " + url)
 
-            if error.status_code == 429:
-                try:
-                    _LOGGER.debug("Reading cached result for " + url + " from cache")
-                    cached = self.read_json_cache(url)
+            if fallback and (error.status == 429 or error.status >= 500):
+                _LOGGER.debug("Reading cached result for " + url + " from cache")
+                entry = await self.cache.async_get(url)
 
-                    if (cached):
-                        return cached
-                except:
-                    raise error
+                if entry is not None:
+                    self._cached_served(url, error, entry)
+                    return entry.document
 
             _LOGGER.debug("No cached result for " + url)
             raise error
+        except (RateLimited, CircuitOpen, DeadlineExceeded) as error:
+            if not fallback:
+                raise
+            _LOGGER.debug(str(error) + ", reading cached result for " + url + " from cache")
+            entry = await self.cache.async_get(url)
+
+            if entry is not None:
+                self._cached_served(url, error, entry)
+                return entry.document
+            raise error
         return None
 
-    def get_for_json(self, url, retry=2, timeout=30):
-        self.__acquire_token()
+    def _cached_served(self, url, error, entry=None):
+        """Note that a cached document stands in for one that could not be fetched"""
+        if entry is not None:
+            self.metrics.record_cache("fallback")
+        if url in self._serving_cached:
+            _LOGGER.debug("Fetching " + url + " failed again: " + str(error))
+            return
+        self._serving_cached.add(url)
+        age = "" if entry is None else " from " + str(round(entry.age / 60)) + " minutes ago"
+        _LOGGER.warning("Fetching " + url + " failed (" + str(error) + "), serving cached data" + age + " until it works again")
+
+    async def get_for_json(self, url, retry=2, timeout=REQUEST_TIMEOUT, conditional=False, urgent=False, attempt=0):
+        breaker = self.breakers.for_url(url)
+        if not breaker.available and time.time() < breaker.retry_at:
+            # Fail before spending budget or a token refresh on it
+            breaker.before_call()
+        await self.rate_limiter.acquire(urgent)
+        token = await self.acquire_token()
 
         _LOGGER.debug("Request for " + url + " start")
 
         headers = {
             **apiHeaders,
             "application-id": self.application_id,
-            "authorization": f"Bearer {self.token}"
+            "authorization": f"Bearer {token}"
         }
 
+        validator = self._validators.get(url) if conditional else None
+        if validator is not None:
+            etag, last_modified, _ = validator
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        total = request_timeout(timeout)
+        probe = breaker.before_call()
         try:
-            response = session.get(
-                url,
-                headers=headers,
-                timeout=timeout
-            )
-        except requests.Timeout as error:
+            async with self._semaphore:
+                start = time.monotonic()
+                async with self.session.get(
+                    url,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=total)
+                ) as response:
+                    self.metrics.record_response(url, time.monotonic() - start, response.status)
+                    self._record_outcome(breaker, response.status)
+                    if response.status == 304 and validator is not None:
+                        _LOGGER.debug("Request for " + url + ": not modified")
+                        return validator[2]
+
+                    if response.status == 429:
+                        self.rate_limiter.on_rate_limited(response.headers.get("Retry-After"))
+
+                    if 500 <= response.status <= 503:
+                        _LOGGER.debug("Request for " + url + ": 500 error")
+                        if retry <= 0:
+                            response.raise_for_status()
+                    else:
+                        if 200 <= response.status < 300:
+
+                            json_response = await response.json(content_type=None)
+
+                            _LOGGER.debug("Request for " + url + ": ok")
+
+                            if conditional:
+                                self._remember_validators(url, response, json_response)
+
+                            if json_response:
+                                return json_response
+
+                        _LOGGER.debug("Request for " + url + ": error")
+                        response.raise_for_status()
+                        return None
+        except asyncio.TimeoutError as error:
             _LOGGER.info("Timeout on request for " + url)
+            self.metrics.record_timeout(url, time.monotonic() - start)
+            if total < timeout:
+                raise DeadlineExceeded("Deadline reached waiting for " + url) from error
+            breaker.record_failure()
             if retry <= 0:
                 raise error
+        except aiohttp.ClientConnectionError:
+            breaker.record_failure()
+            raise
+        finally:
+            if probe:
+                breaker.release_probe()
+
+        await sleep_before_retry(backoff_delay(attempt))
+
+        self.metrics.record_retry(url)
+        return await self.get_for_json(url, retry - 1, timeout, conditional, urgent, attempt + 1)
+
+    def _remember_validators(self, url, response, document):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if document and (etag or last_modified):
+            self._validators[url] = (etag, last_modified, document)
+        else:
+            self._validators.pop(url, None)
 
-            return self.get_for_json(url, retry - 1, timeout)
-
-        if 500 <= response.status_code <= 503:
-            _LOGGER.debug("Request for " + url + ": 500 error")
-            if retry <= 0:
-                response.raise_for_status()
-
-            time.sleep(1)
-
-            return self.get_for_json(url, retry - 1, timeout)
-
-
-        if 200 <= response.status_code < 300:
-
-            json_response = response.json()
-
-            _LOGGER.debug("Request for " + url + ": ok")
-
-            if json_response:
-                return json_response
+    async def vehicles(self, cached=True):
+        """Get vehicle list from account, cached=False asks the API and never falls back to the cache"""
 
-        _LOGGER.debug("Request for " + url + ": error")
-        response.raise_for_status()
+        response = await self.get_json_with_cache(f"{self.api_url}/v2/vehicles", cached=cached, fallback=cached)
+        return response["vehicles"]
 
+    async def post_for_json(self, url, data):
+        await self.rate_limiter.acquire(urgent=True)
+        token = await self.acquire_token()
+        headers = {
+            **apiHeaders,
+            "Application-Id": self.application_id,
+            "authorization": f"Bearer {token}"
+        }
 
-    def vehicles(self):
-        """Get vehicle list from account"""
+        total = request_timeout()
+        breaker = self.breakers.for_url(url)
+        probe = breaker.before_call()
+        try:
+            async with self._semaphore:
+                start = time.monotonic()
+                async with self.session.post(
+                    url,
+                    headers=headers,
+                    data=json.dumps(data),
+                    timeout=aiohttp.ClientTimeout(total=total)
+                ) as r:
+                    self.metrics.record_response(url, time.monotonic() - start, r.status)
+                    self._record_outcome(breaker, r.status)
+                    if 200 <= r.status < 300:
+                        return await r.json(content_type=None)
+
+                    if r.status == 429:
+                        self.rate_limiter.on_rate_limited(r.headers.get("Retry-After"))
+
+                    r.raise_for_status()
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as error:
+            self._record_error(breaker, error, total)
+            raise
+        finally:
+            if probe:
+                breaker.release_probe()
+        return None
 
-        response = self.get_json_with_cache("https://api.mps.ford.com/api/fordconnect/v2/vehicles", timeout=300)
-        return response["vehicles"]
 
-    def get_json_cache_filename(self, url):
+class Vehicle:
+    # Represents a Ford vehicle, with methods for status and issuing commands
 
-        urlhash = hashlib.sha1()
-        urlhash.update(url.encode())
-        urlhash_string = urlhash.hexdigest()
+    def __init__(
+        self, account, vin, command_timeout=COMMAND_TIMEOUT_DEFAULT
+    ):
+        self.account = account
+        self.vin = vin
+        self.command_timeout = command_timeout
+        self._trackers = {}
+        self.commands = CommandQueue(self)
+        self.fingerprint = None
+        self.last_status = None
+        self.on_status_update = None
+
+    async def request_update(self, progress=None):
+        """Ask the car to report its status and location, then fetch the new status"""
+        return await self.commands.submit(REFRESH_COMMAND, progress)
+
+    async def status(self, cached=True):
+        """Get Vehicle status from API
+
+        With cached=True a recent response may be returned from the cache,
+        if it was stale the fresh status is passed to on_status_update once
+        it arrives.
+        """
 
-        return os.path.join(self.cache_location, urlhash_string + ".json")
+        _LOGGER.debug("Fetch vehicle status")
 
-    def write_json_cache(self, url, jsondata):
+        result = await self.account.get_json_with_cache(
+            f"{self.account.api_url}/v3/vehicles/{self.vin}",
+            conditional=True,
+            cached=cached,
+            on_revalidated=self._status_revalidated
+        )
 
-        cachePath = Path(self.cache_location)
-        cachePath.mkdir(exist_ok=True, parents=True)
+        if result:
+            return self._parse_status(result)
 
-        filename = self.get_json_cache_filename(url)
-        _LOGGER.debug("Write to cache file " + filename)
+        raise Exception("No result from v3 vehicle fetch, and no cached result available")
 
-        with open(filename, "w", encoding="utf-8") as outfile:
-            json.dump(jsondata, outfile)
+    def _parse_status(self, result):
+        fingerprint = document_fingerprint(result)
+        if fingerprint == self.fingerprint and self.last_status is not None:
+            _LOGGER.debug("Vehicle status unchanged for " + self.vin)
+            return self.last_status
 
-    def read_json_cache(self, url):
-        filename = self.get_json_cache_filename(url)
+        v = VehicleState.from_response(result, self.last_status)
 
-        _LOGGER.debug("Reading cached json from " + filename)
+        self.fingerprint = fingerprint
+        self.last_status = v
 
-        with open(filename, "r", encoding="utf-8") as infile:
-            data = json.load(infile)
+        return v
 
-        return data
+    def _status_revalidated(self, result):
+        """Pass the status fetched in the background to on_status_update"""
+        v = self._parse_status(result)
+        if self.on_status_update is not None:
+            self.on_status_update(v)
 
-    def start(self):
+    async def start(self, progress=None):
         """
         Issue a start command to the engine
         """
-        return self.__request_and_poll_command("startEngine")
+        return await self.commands.submit("startEngine", progress)
 
-    def stop(self):
+    async def stop(self, progress=None):
         """
         Issue a stop command to the engine
         """
-        return self.__request_and_poll_command("stopEngine")
+        return await self.commands.submit("stopEngine", progress)
 
-    def lock(self):
+    async def lock(self, progress=None):
         """
         Issue a lock command to the doors
         """
 
-        return self.__request_and_poll_command("lock")
+        return await self.commands.submit("lock", progress)
 
-    def unlock(self):
+    async def unlock(self, progress=None):
         """
         Issue an unlock command to the doors
         """
-        return self.__request_and_poll_command("unlock")
+        return await self.commands.submit("unlock", progress)
 
+    async def send_command(self, command, progress=None):
+        """Send command to the new Command endpoint and poll it until it finishes
 
-    def __make_request(self, method, url, data, params):
-        """
-        Make a request to the given URL, passing data/params as needed
+        Use the methods above instead, they go through the vehicle's command queue.
         """
+        if command == REFRESH_COMMAND:
+            return await self._refresh(progress)
 
-        headers = {
-            **apiHeaders,
-            "auth-token": self.token,
-            "Application-Id": self.region,
-        }
-
-        return getattr(requests, method.lower())(
-            url, headers=headers, data=data, params=params
-        )
+        completed = await self._send_and_track(command, progress)
+        if completed:
+            await self._publish_status()
 
+        return completed
 
-    def post_for_json(self, url, data):
-        self.__acquire_token()
-        headers = {
-            **apiHeaders,
-            "Application-Id": self.application_id,
-            "authorization": f"Bearer {self.token}"
-        }
-
-        r = session.post(
-            url,
-            headers=headers,
-            data=data
+    async def _refresh(self, progress):
+        """Send the refresh commands together and fetch the status once they finish"""
+        results = await asyncio.gather(
+            *(self._send_and_track(command, progress) for command in REFRESH_COMMANDS),
+            return_exceptions=True
         )
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            _LOGGER.debug("Refresh command failed for " + self.vin + ": " + str(error))
 
-        if 200 <= r.status_code < 300:
-            return r.json()
+        if any(result is True for result in results):
+            await self._publish_status()
+        elif errors:
+            raise errors[0]
 
-        r.raise_for_status()
+        return all(result is True for result in results)
 
+    async def _publish_status(self):
+        """Fetch the status after a command and hand it to on_status_update"""
+        v = await self.status(cached=False)
+        if self.on_status_update is not None:
+            self.on_status_update(v)
+        return v
 
-    def __request_and_poll_command(self, command):
-        """Send command to the new Command endpoint"""
-        self.__acquire_token()
-
-        response = self.post_for_json(f"https://api.mps.ford.com/api/fordconnect/v1/vehicles/{self.vin}/{command}", {})
+    async def _send_and_track(self, command, progress):
+        response = await self.account.post_for_json(f"{self.account.api_url}/v1/vehicles/{self.vin}/{command}", {})
 
         command_id = response["commandId"]
 
@@ -406,28 +680,31 @@ class Vehicle:
         if command == "status":
             refresh_command_name = "statusrefresh"
 
-        return self.__poll_command_status_and_refresh(refresh_command_name, command_id)
-
-    def __poll_command_status_and_refresh(self, command, command_id):
-        i = 1
-
-        while i < 14:
-            # Check status every 10 seconds for 90 seconds until command completes or time expires
-            status_response = self.get_for_json(f"https://api.mps.ford.com/api/fordconnect/v1/vehicles/{self.vin}/{command}/{command_id}")
-
-            _LOGGER.debug(status_response)
-
-            if status_response is not None and status_response["status"] is not None:
-                status = status_response["commandStatus"]
-
-                if status == "COMPLETED":
-                    self.status()
-                    return True
-
-                if status == "FAILED":
-                    return False
-
-            i += 1
-            _LOGGER.debug("Looping again")
-            time.sleep(10)
-        return False
\ No newline at end of file
+        tracker = CommandTracker(self, refresh_command_name, command_id, self.command_timeout, progress)
+        self._trackers[command] = tracker
+        start = time.monotonic()
+        try:
+            completed = await tracker.wait()
+        finally:
+            if self._trackers.get(command) is tracker:
+                del self._trackers[command]
+            self.account.metrics.record_command(command, time.monotonic() - start, tracker.status)
+
+        return completed
+
+    async def command_status(self, command, command_id):
+        """Get the current status of a previously issued command"""
+        return await self.account.get_for_json(f"{self.account.api_url}/v1/vehicles/{self.vin}/{command}/{command_id}", urgent=True)
+
+    def cancel_command(self, command):
+        """Stop tracking a running command"""
+        tracker = self._trackers.pop(command, None)
+        if tracker is not None:
+            tracker.cancel()
+
+    def cancel_commands(self):
+        """Drop queued commands and stop tracking running ones"""
+        self.commands.cancel()
+        for tracker in list(self._trackers.values()):
+            tracker.cancel()
+        self._trackers.clear()
@@ -4,20 +4,23 @@ import logging
 from homeassistant.components.lock import LockEntity
 
 from . import FordPassEntity
-from .const import DOMAIN, COORDINATOR
+from .const import DOMAIN, COORDINATORS
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Add the lock from the config."""
-    entry = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
+    for entry in hass.data[DOMAIN][config_entry.entry_id][COORDINATORS]:
+        entry.async_add_vehicle_entities(async_add_entities, vehicle_locks)
 
-    lock = Lock(entry)
-    if lock.coordinator.data["metrics"]["lockStatus"] and lock.coordinator.data["metrics"]["lockStatus"]["value"] != "ERROR":
-        async_add_entities([lock], False)
-    else:
-        _LOGGER.debug("Ford model doesn't support remote locking")
+
+def vehicle_locks(coordinator):
+    """Return the lock if the vehicle supports remote locking"""
+    if coordinator.capabilities["lock"]:
+        return [Lock(coordinator)]
+    _LOGGER.debug("Ford model doesn't support remote locking")
+    return []
 
 
 class Lock(FordPassEntity, LockEntity):
@@ -36,11 +39,8 @@ class Lock(FordPassEntity, LockEntity):
         self._attr_is_locking = True
         self.async_write_ha_state()
         _LOGGER.debug("Locking %s", self.coordinator.vin)
-        status = await self.coordinator.hass.async_add_executor_job(
-            self.coordinator.vehicle.lock
-        )
+        status = await self.coordinator.vehicle.lock(self._command_progress)
         _LOGGER.debug(status)
-        await self.coordinator.async_request_refresh()
         _LOGGER.debug("Locking here")
         self._attr_is_locking = False
         self.async_write_ha_state()
@@ -50,20 +50,18 @@ class Lock(FordPassEntity, LockEntity):
         _LOGGER.debug("Unlocking %s", self.coordinator.vin)
         self._attr_is_unlocking = True
         self.async_write_ha_state()
-        status = await self.coordinator.hass.async_add_executor_job(
-            self.coordinator.vehicle.unlock
-        )
+        status = await self.coordinator.vehicle.unlock(self._command_progress)
         _LOGGER.debug(status)
-        await self.coordinator.async_request_refresh()
         self._attr_is_unlocking = False
         self.async_write_ha_state()
 
     @property
     def is_locked(self):
         """Determine if the lock is locked."""
-        if self.coordinator.data["metrics"] is None or self.coordinator.data["metrics"]["lockStatus"] is None:
+        lock_status = self.coordinator.data.lock_status
+        if lock_status is None:
             return None
-        return self.coordinator.data["metrics"]["lockStatus"]["value"] == "LOCKED"
+        return lock_status == "LOCKED"
 
     @property
     def icon(self):
@@ -74,3 +72,8 @@ class Lock(FordPassEntity, LockEntity):
     def name(self):
         """Return Name"""
         return "fordpass_doorlock"
+
+    @property
+    def extra_state_attributes(self):
+        """Return the status of the last remote command"""
+        return {"command_status": self._command_status}
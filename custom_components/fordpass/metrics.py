@@ -0,0 +1,245 @@
+"""Request, cache, token and command metrics collected by the FordConnect client"""
+
+import logging
+from collections import Counter
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bounds in seconds, the last bucket counts everything slower
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COMMAND_BUCKETS = (5, 10, 20, 30, 60, 90, 130, 300)
+
+ENDPOINT_TOKEN = "token"
+ENDPOINT_VEHICLES = "vehicles"
+ENDPOINT_STATUS = "status"
+ENDPOINT_COMMAND = "command"
+ENDPOINT_COMMAND_STATUS = "command_status"
+
+
+def endpoint_name(url):
+    """Return the endpoint a FordConnect url belongs to"""
+    if "/oauth2/" in url:
+        return ENDPOINT_TOKEN
+    if "/v2/vehicles" in url:
+        return ENDPOINT_VEHICLES
+    if "/v3/vehicles/" in url:
+        return ENDPOINT_STATUS
+    if "/v1/vehicles/" in url:
+        # v1/vehicles/{vin}/{command}[/{command_id}]
+        parts = url.split("/v1/vehicles/", 1)[1].strip("/").split("/")
+        return ENDPOINT_COMMAND_STATUS if len(parts) > 2 else ENDPOINT_COMMAND
+    return "other"
+
+
+class Histogram:
+    """Fixed bucket histogram of durations"""
+
+    __slots__ = ("buckets", "counts", "count", "total", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        """Add a sample"""
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        """Add the samples of a histogram with the same buckets"""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, pct):
+        """Return the bucket bound below which pct percent of samples fall"""
+        if not self.count:
+            return None
+        target = self.count * pct / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def as_dict(self):
+        labels = [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 3) if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class EndpointMetrics:
+    """Counters of a single endpoint"""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.responses = Counter()
+        self.retries = 0
+        self.timeouts = 0
+
+    @property
+    def errors(self):
+        """Return the number of failed requests, timeouts included"""
+        return self.timeouts + sum(
+            count for status, count in self.responses.items() if status >= 400
+        )
+
+    def as_dict(self):
+        return {
+            "latency": self.latency.as_dict(),
+            "responses": dict(self.responses),
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+class ClientMetrics:
+    """All metrics of one Account, cheap enough to collect on every request"""
+
+    def __init__(self):
+        self.endpoints = {}
+        # fresh/stale: served from the cache, miss: had to ask the API,
+        # fallback: served from the cache because the API refused
+        self.cache = Counter()
+        self.token_refreshes = 0
+        self.token_refresh_failures = 0
+        self.commands = {}
+        self.command_results = Counter()
+        self.connections = Counter()
+        # Commands that were not sent because they joined or replaced another
+        self.command_queue = Counter()
+
+    def endpoint(self, url):
+        name = endpoint_name(url)
+        metrics = self.endpoints.get(name)
+        if metrics is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def record_response(self, url, seconds, status):
+        """Count a request that got a response"""
+        metrics = self.endpoint(url)
+        metrics.latency.observe(seconds)
+        metrics.responses[status] += 1
+
+    def record_timeout(self, url, seconds):
+        metrics = self.endpoint(url)
+        metrics.latency.observe(seconds)
+        metrics.timeouts += 1
+
+    def record_retry(self, url):
+        self.endpoint(url).retries += 1
+
+    def record_cache(self, outcome):
+        self.cache[outcome] += 1
+
+    def record_token_refresh(self, success):
+        if success:
+            self.token_refreshes += 1
+        else:
+            self.token_refresh_failures += 1
+
+    def record_connection(self, reused):
+        """Count a request that opened a new connection or reused a pooled one"""
+        self.connections["reused" if reused else "created"] += 1
+
+    def record_command_queue(self, outcome):
+        self.command_queue[outcome] += 1
+
+    def record_command(self, command, seconds, status):
+        """Count a finished command and how long it took"""
+        histogram = self.commands.get(command)
+        if histogram is None:
+            histogram = self.commands[command] = Histogram(COMMAND_BUCKETS)
+        histogram.observe(seconds)
+        self.command_results[status] += 1
+
+    @property
+    def api_latency(self):
+        """Return the 95th percentile status request latency in milliseconds"""
+        metrics = self.endpoints.get(ENDPOINT_STATUS)
+        p95 = metrics.latency.percentile(95) if metrics is not None else None
+        return round(p95 * 1000) if p95 is not None else None
+
+    @property
+    def api_errors(self):
+        """Return the number of failed requests over all endpoints"""
+        return sum(metrics.errors for metrics in self.endpoints.values())
+
+    @property
+    def cache_hit_ratio(self):
+        """Return the percentage of cacheable reads served from the cache"""
+        hits = self.cache["fresh"] + self.cache["stale"]
+        lookups = hits + self.cache["miss"]
+        return round(100 * hits / lookups, 1) if lookups else None
+
+    @property
+    def command_duration(self):
+        """Return the 95th percentile command completion time in seconds"""
+        samples = Histogram(COMMAND_BUCKETS)
+        for histogram in self.commands.values():
+            samples.merge(histogram)
+        return samples.percentile(95)
+
+    @property
+    def connection_reuse(self):
+        """Return the percentage of requests sent on a pooled connection"""
+        total = self.connections["reused"] + self.connections["created"]
+        return round(100 * self.connections["reused"] / total, 1) if total else None
+
+    def attributes(self, key):
+        """Return the state attributes of a metric sensor"""
+        if key == "api_latency":
+            return {name: metrics.latency.as_dict() for name, metrics in self.endpoints.items()}
+        if key == "api_errors":
+            return {
+                name: {"errors": metrics.errors, "retries": metrics.retries, "timeouts": metrics.timeouts}
+                for name, metrics in self.endpoints.items()
+            }
+        if key == "cache_hit_ratio":
+            return dict(self.cache)
+        if key == "command_duration":
+            return {
+                "results": dict(self.command_results),
+                "queue": dict(self.command_queue),
+                **{command: histogram.as_dict() for command, histogram in self.commands.items()},
+            }
+        if key == "connection_reuse":
+            return dict(self.connections)
+        if key == "token_refreshes":
+            return {"failures": self.token_refresh_failures}
+        return {}
+
+    def as_dict(self):
+        """Return all metrics for diagnostics"""
+        return {
+            "endpoints": {name: metrics.as_dict() for name, metrics in self.endpoints.items()},
+            "cache": {**self.cache, "hit_ratio": self.cache_hit_ratio},
+            "token_refreshes": self.token_refreshes,
+            "token_refresh_failures": self.token_refresh_failures,
+            "commands": {command: histogram.as_dict() for command, histogram in self.commands.items()},
+            "command_results": dict(self.command_results),
+            "command_queue": dict(self.command_queue),
+            "connections": {**self.connections, "reuse": self.connection_reuse},
+        }
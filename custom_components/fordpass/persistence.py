@@ -0,0 +1,134 @@
+"""Crash-safe JSON files for tokens and cached responses"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKUP_SUFFIX = ".bak"
+WRITE_DELAY = 60
+
+
+def _checksum(payload):
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def atomic_write_json(path, data):
+    """Write data with a checksum, keeping the previous good file as a backup
+
+    The new content goes to a temporary file in the same directory which is
+    flushed to disk and renamed over the target, so a crash leaves either the
+    old or the new file, never a truncated one.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    payload = json.dumps(data, sort_keys=True)
+    envelope = json.dumps({"checksum": _checksum(payload), "data": data}, sort_keys=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as outfile:
+            outfile.write(envelope)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        if os.path.isfile(path) and _read_checked(path) is not None:
+            os.replace(path, path + BACKUP_SUFFIX)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_checked(path):
+    """Return the data of a file if it is intact, otherwise None"""
+    try:
+        with open(path, encoding="utf-8") as infile:
+            content = json.load(infile)
+    except (OSError, ValueError):
+        return None
+
+    if isinstance(content, dict) and set(content) == {"checksum", "data"}:
+        if _checksum(json.dumps(content["data"], sort_keys=True)) != content["checksum"]:
+            _LOGGER.warning("Checksum mismatch in %s", path)
+            return None
+        return content["data"]
+
+    # Plain JSON written before checksums were added
+    return content
+
+
+def read_json(path):
+    """Return the data of a file, falling back to the last good version
+
+    Returns None when neither the file nor its backup can be read.
+    """
+    data = _read_checked(path)
+    if data is not None:
+        return data
+
+    backup = path + BACKUP_SUFFIX
+    data = _read_checked(backup)
+    if data is not None:
+        _LOGGER.warning("Recovered %s from its backup", path)
+        os.replace(backup, path)
+    return data
+
+
+def remove_json(path):
+    """Remove a file and its backup"""
+    for candidate in (path, path + BACKUP_SUFFIX):
+        if os.path.isfile(candidate):
+            os.remove(candidate)
+
+
+class DebouncedWriter:
+    """Batches frequent writes, only the latest data per file is written
+
+    Files queued within the delay after the first one are written together
+    in the executor, or earlier when flushed.
+    """
+
+    def __init__(self, delay=WRITE_DELAY):
+        self.delay = delay
+        self._pending = {}
+        self._timer = None
+        self.writes = 0
+
+    def schedule(self, path, data):
+        """Queue data to be written to path"""
+        self._pending[path] = data
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self._flush_due)
+
+    def _flush_due(self):
+        self._timer = None
+        task = asyncio.ensure_future(self.async_flush())
+        task.add_done_callback(self._flush_done)
+
+    @staticmethod
+    def _flush_done(task):
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.warning("Could not write fordpass files: %s", task.exception())
+
+    async def async_flush(self):
+        """Write all queued files now"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_all, pending)
+
+    def _write_all(self, pending):
+        for path, data in pending.items():
+            try:
+                atomic_write_json(path, data)
+                self.writes += 1
+            except OSError as ex:
+                _LOGGER.warning("Could not write %s: %s", path, ex)
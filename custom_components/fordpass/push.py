@@ -0,0 +1,144 @@
+"""Push mode, vehicle status and events posted to a Home Assistant webhook"""
+
+import logging
+from collections import Counter
+from http import HTTPStatus
+
+from aiohttp import web
+
+from .extractors import parse_datestr
+from .state import VehicleState
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sections of the v3 vehicle document a partial update may carry, and their type
+PUSH_SECTIONS = {
+    "vehicleStatus": dict,
+    "vehicleDetails": dict,
+    "vehicleLocation": dict,
+    "hoodStatus": dict,
+    "windowStatus": list,
+    "remoteStartCountdownTimer": dict,
+    "lastUpdated": str,
+}
+
+# Sections a full v3 document must carry, it replaces the held document
+FULL_SECTIONS = ("vehicleDetails", "vehicleStatus")
+
+MAX_UPDATES = 100
+
+
+class InvalidPush(Exception):
+    """Raised for a notification that cannot be applied"""
+
+    def __init__(self, reason, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+
+
+def _check_sections(sections, allow_null=False):
+    """Raise InvalidPush unless each section has the shape it replaces"""
+    for key, value in sections.items():
+        if key not in PUSH_SECTIONS or (allow_null and value is None):
+            continue
+        if not isinstance(value, PUSH_SECTIONS[key]):
+            raise InvalidPush("invalid " + key)
+
+
+def _timestamp(value):
+    try:
+        return parse_datestr(value).timestamp()
+    except (TypeError, ValueError) as ex:
+        raise InvalidPush("invalid lastUpdated") from ex
+
+
+class PushReceiver:
+    """Validates posted notifications and merges them into the coordinators
+
+    A notification is either a full v3 response ({"vehicle": {...}}) or a
+    partial update naming the vin with one or more PUSH_SECTIONS. The body
+    may also be a list of notifications. Updates older than the data held
+    are counted and dropped.
+    """
+
+    def __init__(self, coordinators):
+        self.coordinators = {coordinator.vin: coordinator for coordinator in coordinators}
+        self.stats = Counter()
+
+    async def async_handle_webhook(self, hass, webhook_id, request):
+        """Handle a POST to the webhook of the entry"""
+        try:
+            payload = await request.json()
+        except ValueError:
+            self.stats["rejected"] += 1
+            return web.json_response({"error": "invalid json"}, status=HTTPStatus.BAD_REQUEST)
+
+        notifications = payload if isinstance(payload, list) else [payload]
+        if not notifications or len(notifications) > MAX_UPDATES:
+            self.stats["rejected"] += 1
+            return web.json_response({"error": "expected 1 to " + str(MAX_UPDATES) + " updates"}, status=HTTPStatus.BAD_REQUEST)
+
+        results = Counter()
+        for notification in notifications:
+            try:
+                results[self.apply(notification)] += 1
+            except InvalidPush as ex:
+                _LOGGER.debug("Rejected pushed update: " + ex.reason)
+                self.stats["rejected"] += 1
+                if len(notifications) == 1:
+                    return web.json_response({"error": ex.reason}, status=ex.status)
+                results["rejected"] += 1
+        return web.json_response(dict(results))
+
+    def apply(self, notification):
+        """Merge one notification, returns "applied" or "stale" """
+        coordinator, full, sections = self._parse(notification)
+        current = coordinator.data
+        last_updated = sections.get("lastUpdated")
+        if last_updated is not None and current is not None and current.get("lastUpdated"):
+            if _timestamp(last_updated) < _timestamp(current["lastUpdated"]):
+                self.stats["stale"] += 1
+                return "stale"
+
+        if full or current is None or current.vin is None:
+            vehicle = sections if full else {"vehicleId": coordinator.vin, **sections}
+            data = VehicleState.from_response({"vehicle": vehicle}, current)
+        else:
+            data = current.merge(sections)
+        coordinator.async_push(data)
+        self.stats["applied"] += 1
+        return "applied"
+
+    def _parse(self, notification):
+        """Return (coordinator, full document, sections) of a notification"""
+        if not isinstance(notification, dict):
+            raise InvalidPush("expected an object")
+        if isinstance(notification.get("vehicle"), dict):
+            sections = notification["vehicle"]
+            vin = sections.get("vehicleId")
+            full = True
+            for key in FULL_SECTIONS:
+                if not isinstance(sections.get(key), PUSH_SECTIONS[key]):
+                    raise InvalidPush("invalid " + key)
+            # The API itself sends null for sections it has no data for, e.g. vehicleLocation
+            _check_sections(sections, allow_null=True)
+        else:
+            vin = notification.get("vin") or notification.get("vehicleId")
+            sections = {key: value for key, value in notification.items() if key in PUSH_SECTIONS}
+            full = False
+            if not sections:
+                raise InvalidPush("no vehicle data")
+            # Merged into the held document, so each section must have the shape it replaces
+            _check_sections(sections)
+
+        if "lastUpdated" in sections:
+            _timestamp(sections["lastUpdated"])
+
+        coordinator = self.coordinators.get(vin)
+        if coordinator is None:
+            raise InvalidPush("unknown vehicle", HTTPStatus.NOT_FOUND)
+        return coordinator, full, sections
+
+    def as_dict(self):
+        return {"vehicles": len(self.coordinators), **self.stats}
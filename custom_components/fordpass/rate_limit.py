@@ -0,0 +1,124 @@
+"""Request budget tracking for a FordConnect client_id"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+RATE_LIMIT_WINDOW = 3600
+RATE_LIMIT_REQUESTS = 300
+# Requests kept back for commands once the budget runs low
+URGENT_RESERVE = 20
+# Longest a request waits for budget before it is skipped instead
+MAX_DELAY = 30
+# Assumed back-off when a 429 comes without a usable Retry-After
+DEFAULT_RETRY_AFTER = 60
+
+
+class RateLimited(Exception):
+    """Raised when a request is skipped to stay within the rate limit"""
+
+    def __init__(self, retry_at):
+        super().__init__(f"Rate limited, retry in {max(retry_at - time.time(), 0):.0f}s")
+        self.retry_at = retry_at
+
+
+def parse_retry_after(value, now=None):
+    """Return the epoch time a Retry-After header allows requests again"""
+    now = time.time() if now is None else now
+    if not value:
+        return now + DEFAULT_RETRY_AFTER
+    try:
+        return now + max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return now + DEFAULT_RETRY_AFTER
+
+
+class RateLimiter:
+    """Sliding window request budget that honours Retry-After
+
+    Non-urgent requests (periodic polls) are delayed briefly or skipped when
+    the budget runs low or the API asked us to back off. Urgent requests
+    (commands) may use the reserve and wait out a short Retry-After.
+    """
+
+    def __init__(self, limit=RATE_LIMIT_REQUESTS, window=RATE_LIMIT_WINDOW, reserve=URGENT_RESERVE):
+        self.limit = limit
+        self.window = window
+        self.reserve = reserve
+        self.blocked_until = 0
+        self.rejected = 0
+        self._requests = deque()
+
+    def _expire(self, now):
+        while self._requests and self._requests[0] <= now - self.window:
+            self._requests.popleft()
+
+    @property
+    def used(self):
+        """Return the number of requests in the current window"""
+        self._expire(time.time())
+        return len(self._requests)
+
+    @property
+    def remaining(self):
+        """Return the number of requests left in the current window"""
+        return max(self.limit - self.used, 0)
+
+    def _wait_time(self, urgent, now):
+        """Return seconds until a request may be sent"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._expire(now)
+        allowed = self.limit if urgent else self.limit - self.reserve
+        if len(self._requests) < allowed:
+            return 0
+        # Wait until enough requests leave the window
+        return self._requests[len(self._requests) - allowed] + self.window - now
+
+    async def acquire(self, urgent=False):
+        """Wait for budget and count the request, or raise RateLimited"""
+        now = time.time()
+        wait = self._wait_time(urgent, now)
+        if wait > MAX_DELAY:
+            _LOGGER.debug("Skipping request, rate limit budget exhausted for %.0fs", wait)
+            raise RateLimited(now + wait)
+        if wait > 0:
+            _LOGGER.debug("Delaying request %.1fs for rate limit", wait)
+            await asyncio.sleep(wait)
+        self._requests.append(time.time())
+
+    def polling_interval(self, pollers):
+        """Return the shortest interval at which pollers can each poll within the budget
+
+        The budget is that of the whole client_id, so pollers counts every
+        vehicle on the account, not only those of one entry. The reserve is
+        left for commands.
+        """
+        if pollers <= 0:
+            return 0
+        return self.window * pollers / max(self.limit - self.reserve, 1)
+
+    def on_rate_limited(self, retry_after=None):
+        """Back off after a 429 response"""
+        self.rejected += 1
+        self.blocked_until = max(self.blocked_until, parse_retry_after(retry_after))
+        _LOGGER.info("FordConnect rate limit hit, backing off for %.0fs", self.blocked_until - time.time())
+
+    def as_dict(self):
+        """Return the budget state for diagnostics"""
+        return {
+            "limit": self.limit,
+            "window": self.window,
+            "used": self.used,
+            "remaining": self.remaining,
+            "rejected": self.rejected,
+            "blocked_until": self.blocked_until if self.blocked_until > time.time() else None,
+        }
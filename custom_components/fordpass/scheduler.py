@@ -0,0 +1,108 @@
+"""Chooses the coordinator poll interval from the vehicle state"""
+
+import logging
+import time
+from collections import deque
+
+from homeassistant.util import dt
+
+from .extractors import parse_datestr
+
+_LOGGER = logging.getLogger(__name__)
+
+POLL_INTERVAL_ACTIVE = 120
+POLL_INTERVAL_PARKED = 3600
+POLL_INTERVAL_SLEEP = 7200
+PARKED_AFTER = 3 * 3600
+
+BUDGET_WINDOW = 86400
+
+CHARGING_ACTIVE_STATES = {
+    "charging",
+    "charginginprogress",
+    "inprogress",
+    "chargestarted",
+    "chargingac",
+    "chargingdc",
+}
+
+
+def is_active(data):
+    """Return True while the engine runs, the car charges or remote start counts down"""
+    metrics = data.get("metrics", {})
+
+    if metrics.get("ignitionStatus", {}).get("value") == "ENGINE_RUNNING":
+        return True
+
+    charging = metrics.get("chargingStatus", {}).get("value")
+    if isinstance(charging, str) and charging.replace("_", "").lower() in CHARGING_ACTIVE_STATES:
+        return True
+
+    countdown = data.get("remoteStartCountdownTimer", {}).get("value", 0)
+    return isinstance(countdown, (int, float)) and countdown > 0
+
+
+def parked_for(data):
+    """Return how many seconds the ignition has been off, or None if unknown"""
+    ignition = data.get("metrics", {}).get("ignitionStatus", {})
+    if ignition.get("value") != "OFF" or not ignition.get("timeStamp"):
+        return None
+    try:
+        since = parse_datestr(ignition["timeStamp"])
+    except ValueError:
+        return None
+    return (dt.utcnow() - since).total_seconds()
+
+
+class PollScheduler:
+    """Adapts the poll interval to the vehicle state within a daily request budget"""
+
+    def __init__(self, base_interval, daily_budget):
+        self.base_interval = base_interval
+        self.daily_budget = daily_budget
+        self._requests = deque()
+
+    def record_request(self, now=None):
+        """Count a status request against the budget"""
+        self._requests.append(time.time() if now is None else now)
+
+    def requests_today(self, now=None):
+        """Return the number of requests in the last 24 hours"""
+        now = time.time() if now is None else now
+        while self._requests and self._requests[0] <= now - BUDGET_WINDOW:
+            self._requests.popleft()
+        return len(self._requests)
+
+    def state_interval(self, data):
+        """Return the preferred interval for the vehicle state, ignoring the budget"""
+        if not data:
+            return self.base_interval
+
+        if is_active(data):
+            return min(POLL_INTERVAL_ACTIVE, self.base_interval)
+
+        if data.get("metrics", {}).get("deepSleepInProgress") is True:
+            return max(POLL_INTERVAL_SLEEP, self.base_interval)
+
+        parked = parked_for(data)
+        if parked is not None and parked >= PARKED_AFTER:
+            return max(POLL_INTERVAL_PARKED, self.base_interval)
+
+        return self.base_interval
+
+    def budget_interval(self, now=None):
+        """Return the shortest interval the remaining budget allows"""
+        if not self.daily_budget:
+            return 0
+        now = time.time() if now is None else now
+        used = self.requests_today(now)
+        if used >= self.daily_budget:
+            # Wait for the oldest request to leave the window
+            return self._requests[0] + BUDGET_WINDOW - now
+        return BUDGET_WINDOW / self.daily_budget
+
+    def next_interval(self, data, now=None):
+        """Return the number of seconds until the next poll"""
+        interval = max(self.state_interval(data), self.budget_interval(now))
+        _LOGGER.debug("Next poll in %ss", round(interval))
+        return interval
@@ -1,24 +1,25 @@
 """All vehicle sensors from the accessible by the API"""
 
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 import json
 
 from homeassistant.const import (
     UnitOfTemperature,
     UnitOfLength
 )
-from homeassistant.util import dt
 
 from homeassistant.components.sensor import (
     SensorEntity,
     SensorDeviceClass,
     SensorStateClass
 )
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.util import dt
 
 
 from . import FordPassEntity
-from .const import CONF_DISTANCE_UNIT, CONF_PRESSURE_UNIT, DOMAIN, SENSORS, COORDINATOR
+from .const import CONF_DISTANCE_UNIT, CONF_PRESSURE_UNIT, DOMAIN, SENSORS, METRIC_SENSORS, TRIP_SENSORS, COORDINATORS
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -26,29 +27,25 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Add the Entities from the config."""
-    entry = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
-    sensors = []
-    for key, value in SENSORS.items():
-        sensor = CarSensor(entry, key, config_entry.options)
-        api_key = value["api_key"]
-        api_class = value.get("api_class", None)
-        sensor_type = value.get("sensor_type", None)
-        string =  isinstance(api_key, str)
-        if string and sensor_type == "single":
-            sensors.append(sensor)
-        elif string:
-            if api_key and api_class and api_key in sensor.coordinator.data.get(api_class, {}):
-                sensors.append(sensor)
-                continue
-            if api_key and api_key in sensor.coordinator.data.get("metrics", {}):
-                sensors.append(sensor)
-        else:
-            for key in api_key:
-                if key and key in sensor.coordinator.data.get("metrics", {}):
-                    sensors.append(sensor)
-                    continue
+    coordinators = hass.data[DOMAIN][config_entry.entry_id][COORDINATORS]
+
+    def vehicle_sensors(coordinator):
+        sensors = [
+            CarSensor(coordinator, key, config_entry.options)
+            for key in coordinator.capabilities["sensors"]
+        ]
+        if coordinator.capabilities["gps"]:
+            sensors.extend(TripSensor(coordinator, key) for key in TRIP_SENSORS)
+        return sensors
+
+    # The vehicle sensors follow capability changes of each vehicle
+    for entry in coordinators:
+        entry.async_add_vehicle_entities(async_add_entities, vehicle_sensors)
+    # Account wide, added once per entry on its first vehicle
+    sensors = [RateLimitSensor(coordinators[0]), ApiStatusSensor(coordinators[0])]
+    sensors.extend(MetricSensor(coordinators[0], key) for key in METRIC_SENSORS)
     _LOGGER.debug(hass.config.units)
-    async_add_entities(sensors, True)
+    async_add_entities(sensors, False)
 
 
 class CarSensor(
@@ -76,144 +73,17 @@ class CarSensor(
         # Required for HA 2022.7
         self.coordinator_context = object()
 
-    def parse_datestr(self, str):
-        return dt.as_local(datetime.strptime(str + " +0000", "%m-%d-%Y %H:%M:%S %z"))
-
     def get_value(self, ftype):
-        """Get sensor value and attributes from coordinator data"""
-
-        self.data = self.coordinator.data
-        self.metrics = self.data.get("metrics", {})
-        self.units = self.coordinator.hass.config.units
+        """Get sensor value and attributes, computed once per coordinator update"""
 
         if ftype == "state":
-            if self.sensor == "odometer":
-                odometer = self.metrics.get("odometer", None)
-
-                if odometer is not None:
-                    return round(odometer)
-
-                return None
-
-            if self.sensor == "fuel":
-                fuel_level = self.metrics.get("fuelLevel", None)
-
-                if fuel_level is not None:
-                    return round(fuel_level.get("value", 0))
-
-                return None
-
-            if self.sensor == "hvBattery":
-                soc = self.metrics.get("batteryChargeLevel", None)
-
-                if soc is not None:
-                    return round(soc.get("value", 0))
-
-                return None
-            if self.sensor == "tirePressureWarning":
-                return self.metrics.get("tirePressureWarning", "Unsupported")
-
-            if self.sensor == "gps":
-                return self.metrics.get("vehicleLocation", {}).get("value", "Unsupported")
-
-            if self.sensor == "alarm":
-                return self.metrics.get("alarmStatus", {}).get("value", "Unsupported")
-
-            if self.sensor == "ignitionStatus":
-                return self.metrics.get("ignitionStatus", {}).get("value", "Unsupported")
-
-            if self.sensor == "firmwareUpgradeInProgress":
-                return self.metrics.get("firmwareUpgradeInProgress", "Unsupported")
-
-            if self.sensor == "deepSleepInProgress":
-                return self.metrics.get("deepSleepInProgress", "Unsupported")
-
-            if self.sensor == "hvChargingStatus":
-                return self.metrics.get("chargingStatus", {}).get("value", "Unsupported")
-
-            if self.sensor == "hvPlugStatus":
-                return self.metrics.get("plugStatus", {}).get("value", "Unsupported")
-
-            if self.sensor == "doorStatus":
-                for value in self.metrics.get("doorStatus", []):
-                    if value["value"] in ["CLOSED", "Invalid", "UNKNOWN"]:
-                        continue
-                    return "Open"
-                if  self.data.get("hoodStatus", {}).get("value") == "OPEN":
-                    return "Open"
-                return "Closed"
-
-            if self.sensor == "windowPosition":
-                for window in self.data.get("windowStatus", []):
-                    windowrange = window.get("value", {}).get("doubleRange", {})
-                    if windowrange.get("lowerBound", 0.0) != 0.0 or windowrange.get("upperBound", 0.0) != 0.0:
-                        return "Open"
-                return "Closed"
-
-            if self.sensor == "lastRefresh":
-                return self.parse_datestr(self.data.get("lastUpdated", ""))
-
-            if self.sensor == "remoteStartStatus":
-                countdown_timer = self.data.get("remoteStartCountdownTimer", {}).get("value", 0)
-                return "Active" if countdown_timer > 0 else "Inactive"
-
-            if self.sensor == "speed":
-                return self.metrics.get("vehicleLocation", {}).get("speed", "Unsupported")
-
-            if self.sensor == "deepSleep":
-                return self.metrics.get("deepSleepStatus", "Unsupported")
-
-            return None
+            return self.coordinator.sensor_values.state(self.sensor)
         if ftype == "measurement":
             return SENSORS.get(self.sensor, {}).get("measurement", None)
         if ftype == "attribute":
-            if self.sensor == "odometer":
-                return {}
-            if self.sensor == "hvBattery":
-                return {
-                    "distanceToEmpty": self.metrics.get("batteryChargeLevel", {}).get("distanceToEmpty", None)
-                }
-            if self.sensor == "alarm":
-                return self.metrics.get("alarmStatus", {})
-            if self.sensor == "ignitionStatus":
-                return self.metrics.get("ignitionStatus", {})
-            if self.sensor == "firmwareUpgradeInProgress":
-                return self.metrics.get("firmwareUpgradeInProgress", {})
-            if self.sensor == "deepSleep":
-                return None
-            if self.sensor == "doorStatus":
-                doors = {}
-                for value in self.metrics.get(self.sensor, []):
-                    if "vehicleDoor" in value:
-                        if value['vehicleDoor'] == "UNSPECIFIED_FRONT":
-                            doors["FRONT_" + value['vehicleOccupantRole']] = value.get('value', None)
-                        else:
-                            doors[value['vehicleDoor']] = value.get('value', None)
-                    else:
-                        doors[value["vehicleDoor"]] = value.get('value', None)
-
-                if "hoodStatus" in self.data:
-                    doors["HOOD"] = self.data["hoodStatus"]["value"]
-
-                return doors or None
-            if self.sensor == "windowPosition":
-                windows = {}
-                for window in self.data.get("windowStatus", []):
-                    if window["vehicleWindow"] == "UNSPECIFIED_FRONT":
-                        windows[window["vehicleSide"]] = window
-                    else:
-                        windows[window["vehicleWindow"]] = window
-                return windows
-            if self.sensor == "lastRefresh":
-                return None
-
-            if self.sensor == "remoteStartStatus":
-                return {"Countdown:": self.data.get("remoteStartCountdownTimer", {}).get("value", 0)}
-
+            return self.coordinator.sensor_values.attributes(self.sensor)
         return None
 
-
-
     @property
     def name(self):
         """Return Sensor Name"""
@@ -284,3 +154,132 @@ class CarSensor(
         if "debug" in SENSORS[self.sensor]:
             return False
         return True
+
+
+class RateLimitSensor(FordPassEntity, SensorEntity):
+    """Remaining FordConnect request budget of the account"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:speedometer-slow"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator):
+        super().__init__(
+            device_id="fordpass_rate_limit_remaining",
+            name="fordpass_rate_limit_remaining",
+            coordinator=coordinator
+        )
+
+    @property
+    def native_value(self):
+        """Return the number of requests left in the window"""
+        return self.coordinator.account.rate_limiter.remaining
+
+    @property
+    def extra_state_attributes(self):
+        """Return the budget details"""
+        return self.coordinator.account.rate_limiter.as_dict()
+
+
+class ApiStatusSensor(FordPassEntity, SensorEntity):
+    """Whether the FordConnect endpoints answer or data is served from the cache"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:cloud-check-outline"
+
+    def __init__(self, coordinator):
+        super().__init__(
+            device_id="fordpass_api_status",
+            name="fordpass_api_status",
+            coordinator=coordinator
+        )
+
+    @property
+    def native_value(self):
+        """Return available, or degraded while a circuit breaker is open"""
+        return "degraded" if self.coordinator.account.breakers.open else "available"
+
+    @property
+    def extra_state_attributes(self):
+        """Return the circuit breaker state per endpoint"""
+        return self.coordinator.account.breakers.as_dict()
+
+
+class MetricSensor(FordPassEntity, SensorEntity):
+    """Client performance metric of the account, disabled by default"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, metric):
+        super().__init__(
+            device_id="fordpass_" + metric,
+            name="fordpass_" + metric,
+            coordinator=coordinator
+        )
+        self.metric = metric
+        self._attr_icon = METRIC_SENSORS[metric]["icon"]
+        self._attr_native_unit_of_measurement = METRIC_SENSORS[metric].get("measurement")
+        if METRIC_SENSORS[metric].get("state_class") == "total_increasing":
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        else:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self):
+        """Return the current value of the metric"""
+        return getattr(self.coordinator.account.metrics, self.metric)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the metric breakdown"""
+        return self.coordinator.account.metrics.attributes(self.metric)
+
+
+class TripSensor(FordPassEntity, SensorEntity):
+    """Trip statistics detected from the location samples of the vehicle"""
+
+    def __init__(self, coordinator, sensor):
+        super().__init__(
+            device_id="fordpass_" + sensor,
+            name="fordpass_" + sensor,
+            coordinator=coordinator
+        )
+        self.sensor = sensor
+        self._attr_icon = TRIP_SENSORS[sensor]["icon"]
+        self._attr_native_unit_of_measurement = TRIP_SENSORS[sensor].get("measurement")
+        if TRIP_SENSORS[sensor].get("device_class") == "distance":
+            self._attr_device_class = SensorDeviceClass.DISTANCE
+        elif TRIP_SENSORS[sensor].get("device_class") == "duration":
+            self._attr_device_class = SensorDeviceClass.DURATION
+        if TRIP_SENSORS[sensor].get("state_class") == "total_increasing":
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        else:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self):
+        """Return the trip statistic"""
+        trips = self.coordinator.trips
+        if self.sensor == "distance_today":
+            return round(trips.distance_since(dt.start_of_local_day().timestamp()) / 1000, 2)
+        if self.sensor == "trips_today":
+            return trips.trips_since(dt.start_of_local_day().timestamp())
+        trip = trips.last_trip
+        if trip is None:
+            return None
+        if self.sensor == "last_trip_distance":
+            return round(trip.distance / 1000, 2)
+        return round(trip.duration / 60)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the details of the last trip"""
+        trip = self.coordinator.trips.last_trip
+        if trip is None or self.sensor not in ("last_trip_distance", "last_trip_duration"):
+            return None
+        attributes = trip.as_dict()
+        attributes["start"] = dt.utc_from_timestamp(trip.start).isoformat()
+        attributes["end"] = dt.utc_from_timestamp(trip.end).isoformat()
+        attributes["in_progress"] = trip is self.coordinator.trips.current
+        return attributes
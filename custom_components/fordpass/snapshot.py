@@ -0,0 +1,87 @@
+"""Persisted vehicle snapshot used to start without waiting for the API"""
+
+import logging
+
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SENSORS
+from .state import VehicleState
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+
+def supported_sensors(data):
+    """Return the SENSORS keys the vehicle data supports"""
+    metrics = data.get("metrics", {})
+    sensors = []
+    for key, value in SENSORS.items():
+        api_key = value["api_key"]
+        api_class = value.get("api_class", None)
+        sensor_type = value.get("sensor_type", None)
+        string = isinstance(api_key, str)
+        if string and sensor_type == "single":
+            sensors.append(key)
+        elif string:
+            if api_key and api_class and api_key in data.get(api_class, {}):
+                sensors.append(key)
+                continue
+            if api_key and api_key in metrics:
+                sensors.append(key)
+        elif any(k and k in metrics for k in api_key):
+            sensors.append(key)
+    return sensors
+
+
+def detect_capabilities(data):
+    """Return which entities the vehicle data supports"""
+    if not data:
+        return None
+    lock_status = data.get("metrics", {}).get("lockStatus")
+    return {
+        "sensors": supported_sensors(data),
+        "lock": bool(lock_status) and lock_status.get("value") != "ERROR",
+        "gps": data.get("vehicleLocation") is not None,
+    }
+
+
+class SnapshotStore:
+    """Stores the last vehicle data and capabilities of a config entry, per VIN in a fleet"""
+
+    def __init__(self, hass, entry_id, vin=None):
+        key = f"{DOMAIN}.snapshot.{entry_id}" if vin is None else f"{DOMAIN}.snapshot.{entry_id}.{vin}"
+        self._store = Store(hass, STORAGE_VERSION, key)
+        self._data = None
+
+    async def async_load(self):
+        """Return the stored snapshot, or None"""
+        try:
+            snapshot = await self._store.async_load()
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.warning("Could not restore fordpass snapshot: %s", ex)
+            return None
+        if not snapshot or not snapshot.get("data") or not snapshot.get("capabilities"):
+            return None
+        return snapshot
+
+    def async_save(self, data, capabilities):
+        """Schedule saving the latest data, writes are batched"""
+        self._data = (data, capabilities)
+        self._store.async_delay_save(self._snapshot_data, SAVE_DELAY)
+
+    async def async_save_now(self, data, capabilities):
+        """Save the latest data immediately"""
+        self._data = (data, capabilities)
+        await self._store.async_save(self._snapshot_data())
+
+    def _snapshot_data(self):
+        data, capabilities = self._data
+        if isinstance(data, VehicleState):
+            data = data.as_dict()
+        return {"data": data, "capabilities": capabilities}
+
+    async def async_remove(self):
+        """Remove the stored snapshot"""
+        await self._store.async_remove()
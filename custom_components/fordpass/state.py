@@ -0,0 +1,199 @@
+"""Vehicle state parsed once from a FordConnect v3 response"""
+
+from collections.abc import Mapping
+
+
+def share_unchanged(old, new):
+    """Put the objects of old into new wherever the values are equal
+
+    new is changed in place, so the response document and the state built
+    from it share every unchanged sub-object with the previous state.
+    """
+    for key, value in new.items():
+        if key not in old:
+            continue
+        previous = old[key]
+        if previous is value:
+            continue
+        if previous == value:
+            new[key] = previous
+        elif isinstance(previous, dict) and isinstance(value, dict):
+            share_unchanged(previous, value)
+    return new
+
+
+class Metrics(Mapping):
+    """vehicleStatus and vehicleDetails as one mapping, without copying them"""
+
+    __slots__ = ("_status", "_details")
+
+    def __init__(self, status, details):
+        self._status = status
+        self._details = details
+
+    def __getitem__(self, key):
+        # vehicleDetails wins, like the merged dict used before
+        if key in self._details:
+            return self._details[key]
+        return self._status[key]
+
+    def get(self, key, default=None):
+        if key in self._details:
+            return self._details[key]
+        return self._status.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._details or key in self._status
+
+    def __iter__(self):
+        yield from self._details
+        for key in self._status:
+            if key not in self._details:
+                yield key
+
+    def __len__(self):
+        return len(self._details) + sum(1 for key in self._status if key not in self._details)
+
+    def __eq__(self, other):
+        if isinstance(other, Metrics) and other._status is self._status and other._details is self._details:
+            return True
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+
+class VehicleState(Mapping):
+    """Read-only view of the vehicle section of a v3 response
+
+    Behaves like the document it wraps with an extra "metrics" key, and has
+    typed accessors for the fields entities use. Door and window details are
+    only decoded when asked for.
+    """
+
+    __slots__ = ("_vehicle", "_metrics", "_doors", "_windows")
+
+    def __init__(self, vehicle):
+        self._vehicle = vehicle
+        self._metrics = Metrics(vehicle.get("vehicleStatus", {}), vehicle.get("vehicleDetails", {}))
+        self._doors = None
+        self._windows = None
+
+    @classmethod
+    def from_response(cls, result, previous=None):
+        """Parse a v3 response, sharing unchanged parts with the previous state"""
+        vehicle = result["vehicle"]
+        if previous is not None and previous._vehicle is not vehicle:
+            share_unchanged(previous._vehicle, vehicle)
+        return cls(vehicle)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build the state from as_dict() output, e.g. a stored snapshot"""
+        if isinstance(data, VehicleState):
+            return data
+        return cls({key: value for key, value in data.items() if key != "metrics"})
+
+    def merge(self, sections):
+        """Return a new state with the sections of a partial update applied
+
+        Mapping sections are merged one level deep, anything else replaces
+        the current value. All other parts are shared with this state.
+        """
+        vehicle = dict(self._vehicle)
+        for key, value in sections.items():
+            current = vehicle.get(key)
+            if isinstance(value, dict) and isinstance(current, dict):
+                value = {**current, **value}
+            vehicle[key] = value
+        return VehicleState(share_unchanged(self._vehicle, vehicle))
+
+    def as_dict(self):
+        """Return a plain, JSON serializable copy"""
+        return {**self._vehicle, "metrics": dict(self._metrics)}
+
+    def __getitem__(self, key):
+        if key == "metrics":
+            return self._metrics
+        return self._vehicle[key]
+
+    def get(self, key, default=None):
+        if key == "metrics":
+            return self._metrics
+        return self._vehicle.get(key, default)
+
+    def __contains__(self, key):
+        return key == "metrics" or key in self._vehicle
+
+    def __iter__(self):
+        yield from self._vehicle
+        yield "metrics"
+
+    def __len__(self):
+        return len(self._vehicle) + 1
+
+    def __eq__(self, other):
+        if isinstance(other, VehicleState):
+            return self._vehicle == other._vehicle
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    @property
+    def vin(self):
+        return self._vehicle.get("vehicleId")
+
+    @property
+    def model(self):
+        return f"{self._vehicle.get('modelYear')} {self._vehicle.get('modelName')}"
+
+    @property
+    def lock_status(self):
+        """Return the lockStatus value, or None when the car does not report it"""
+        lock_status = self._metrics.get("lockStatus")
+        return lock_status.get("value") if lock_status else None
+
+    @property
+    def location(self):
+        """Return the vehicleLocation section, or None"""
+        return self._vehicle.get("vehicleLocation")
+
+    @property
+    def engine_running(self):
+        """Return True when the engine runs, remote started or not"""
+        if (self._metrics.get("ignitionStatus") or {}).get("value") == "ENGINE_RUNNING":
+            return True
+        return (self._metrics.get("remoteStartStatus") or {}).get("status") == "ENGINE_RUNNING"
+
+    @property
+    def doors(self):
+        """Return door (and hood) name to status, decoded on first use"""
+        if self._doors is None:
+            doors = {}
+            for value in self._metrics.get("doorStatus", []):
+                if "vehicleDoor" not in value:
+                    continue
+                if value["vehicleDoor"] == "UNSPECIFIED_FRONT":
+                    doors["FRONT_" + value["vehicleOccupantRole"]] = value.get("value", None)
+                else:
+                    doors[value["vehicleDoor"]] = value.get("value", None)
+            if "hoodStatus" in self._vehicle:
+                doors["HOOD"] = self._vehicle["hoodStatus"]["value"]
+            self._doors = doors
+        return self._doors
+
+    @property
+    def windows(self):
+        """Return window name to window status, decoded on first use"""
+        if self._windows is None:
+            windows = {}
+            for window in self._vehicle.get("windowStatus", []):
+                if window["vehicleWindow"] == "UNSPECIFIED_FRONT":
+                    windows[window["vehicleSide"]] = window
+                else:
+                    windows[window["vehicleWindow"]] = window
+            self._windows = windows
+        return self._windows
@@ -4,20 +4,19 @@ import logging
 from homeassistant.components.switch import SwitchEntity
 
 from . import FordPassEntity
-from .const import DOMAIN, SWITCHES, COORDINATOR
+from .const import DOMAIN, SWITCHES, COORDINATORS
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Add the Switch from the config."""
-    entry = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR]
-
-    # switches = [Switch(entry)]
-    # async_add_entities(switches, False)
-    for key, value in SWITCHES.items():
-        sw = Switch(entry, key, config_entry.options)
-        async_add_entities([sw], False)
+    switches = [
+        Switch(entry, key, config_entry.options)
+        for entry in hass.data[DOMAIN][config_entry.entry_id][COORDINATORS]
+        for key in SWITCHES
+    ]
+    async_add_entities(switches, False)
 
 
 class Switch(FordPassEntity, SwitchEntity):
@@ -35,19 +34,13 @@ class Switch(FordPassEntity, SwitchEntity):
     async def async_turn_on(self, **kwargs):
         """Send request to vehicle on switch status on"""
         if self.switch == "ignition":
-            await self.coordinator.hass.async_add_executor_job(
-                self.coordinator.vehicle.start
-            )
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.vehicle.start(self._command_progress)
         self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
         """Send request to vehicle on switch status off"""
         if self.switch == "ignition":
-            await self.coordinator.hass.async_add_executor_job(
-                self.coordinator.vehicle.stop
-            )
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.vehicle.stop(self._command_progress)
         self.async_write_ha_state()
 
     @property
@@ -64,19 +57,7 @@ class Switch(FordPassEntity, SwitchEntity):
     def is_on(self):
         """Check status of switch"""
         if self.switch == "ignition":
-            metrics = self.coordinator.data.get("metrics", {})
-
-            ignition_status = metrics.get("ignitionStatus", {})
-            remote_start_status = metrics.get("remoteStartStatus", {})
-
-            _LOGGER.debug(ignition_status)
-            _LOGGER.debug(remote_start_status)
-
-            if ignition_status.get("value", "OFF") == "ENGINE_RUNNING":
-                return True
-
-            if remote_start_status.get("status", "OFF") == "ENGINE_RUNNING":
-                return True
+            return self.coordinator.data.engine_running
 
         return False
 
@@ -84,3 +65,8 @@ class Switch(FordPassEntity, SwitchEntity):
     def icon(self):
         """Return icon for switch"""
         return SWITCHES[self.switch]["icon"]
+
+    @property
+    def extra_state_attributes(self):
+        """Return the status of the last remote command"""
+        return {"command_status": self._command_status}
@@ -0,0 +1,302 @@
+"""Columnar time series of vehicle telemetry with hourly and daily rollups"""
+
+import logging
+import math
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+_LOGGER = logging.getLogger(__name__)
+
+NAN = float("nan")
+
+# Field name -> path of the numeric value in the vehicle data
+TELEMETRY_FIELDS = {
+    "odometer": ("metrics", "odometer"),
+    "fuelLevel": ("metrics", "fuelLevel", "value"),
+    "fuelRange": ("metrics", "fuelLevel", "distanceToEmpty"),
+    "batteryChargeLevel": ("metrics", "batteryChargeLevel", "value"),
+    "batteryRange": ("metrics", "batteryChargeLevel", "distanceToEmpty"),
+    "speed": ("vehicleLocation", "speed"),
+    "tirePressureWarning": ("metrics", "tirePressureWarning"),
+}
+
+# Rollup name -> bucket size in seconds, buckets are aligned to UTC
+ROLLUPS = {"hour": 3600, "day": 86400}
+STATS = ("min", "max", "mean")
+
+# Windows up to this many seconds are answered from raw samples or hourly rollups
+RAW_WINDOW = 2 * 86400
+HOURLY_WINDOW = 60 * 86400
+
+ITEM_SIZE = array("d").itemsize
+
+
+def extract_telemetry(data):
+    """Return field -> float (NaN when missing) for the vehicle data"""
+    values = {}
+    for field, path in TELEMETRY_FIELDS.items():
+        value = data
+        for key in path:
+            value = value.get(key) if hasattr(value, "get") else None
+            if value is None:
+                break
+        if isinstance(value, bool):
+            value = float(value)
+        elif isinstance(value, (int, float)):
+            value = float(value)
+        elif isinstance(value, dict) and "value" in value:
+            # Status sections such as tirePressureWarning, 1.0 when not normal
+            value = 0.0 if value["value"] in ("NORMAL", False, None) else 1.0
+        else:
+            value = NAN
+        values[field] = value
+    return values
+
+
+class Column:
+    """Append-only file of float64 values, read through a memory map"""
+
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self._mapped_size = 0
+        self._size = os.path.getsize(path) if os.path.exists(path) else 0
+
+    def __len__(self):
+        return self._size // ITEM_SIZE
+
+    def truncate(self, length):
+        """Drop values past length, e.g. a half written row after a crash"""
+        if length < len(self):
+            with open(self.path, "r+b") as outfile:
+                outfile.truncate(length * ITEM_SIZE)
+            self._size = length * ITEM_SIZE
+            self._map = None
+
+    def append(self, values):
+        with open(self.path, "ab") as outfile:
+            outfile.write(values.tobytes())
+        self._size += len(values) * ITEM_SIZE
+
+    def _mapped(self):
+        if self._size == 0:
+            return None
+        if self._map is None or self._mapped_size != self._size:
+            # Views of an older map keep it alive until they are released
+            with open(self.path, "rb") as infile:
+                self._map = mmap.mmap(infile.fileno(), self._size, access=mmap.ACCESS_READ)
+            self._mapped_size = self._size
+        return self._map
+
+    def read(self, start=0, stop=None):
+        """Return values[start:stop] as an array"""
+        values = array("d")
+        mapped = self._mapped()
+        if mapped is not None:
+            stop = len(self) if stop is None else min(stop, len(self))
+            values.frombytes(mapped[start * ITEM_SIZE:stop * ITEM_SIZE])
+        return values
+
+    def search(self, value, right=False):
+        """Return the insertion point of value, the column must be sorted"""
+        mapped = self._mapped()
+        if mapped is None:
+            return 0
+        with memoryview(mapped) as raw, raw.cast("d") as values:
+            return bisect_right(values, value) if right else bisect_left(values, value)
+
+    def last(self):
+        return self.read(len(self) - 1)[0] if len(self) else None
+
+    def close(self):
+        self._map = None
+
+
+class Series:
+    """A directory of equally long columns, one of them the time"""
+
+    def __init__(self, directory, columns):
+        os.makedirs(directory, exist_ok=True)
+        self.time = Column(os.path.join(directory, "time.f64"))
+        self.columns = {name: Column(os.path.join(directory, name + ".f64")) for name in columns}
+        length = min(len(column) for column in (self.time, *self.columns.values()))
+        for column in (self.time, *self.columns.values()):
+            column.truncate(length)
+
+    def __len__(self):
+        return len(self.time)
+
+    def append(self, timestamps, rows):
+        """Append timestamps and the matching dicts of column values"""
+        for name, column in self.columns.items():
+            column.append(array("d", (row.get(name, NAN) for row in rows)))
+        # Time last, a row only counts once all its values are written
+        self.time.append(array("d", timestamps))
+
+    def window(self, start, end):
+        """Return the row range with start <= time <= end"""
+        return self.time.search(start), self.time.search(end, right=True)
+
+    def read(self, first, last, columns):
+        return self.time.read(first, last), {name: self.columns[name].read(first, last) for name in columns}
+
+    def close(self):
+        for column in (self.time, *self.columns.values()):
+            column.close()
+
+
+class Rollup:
+    """Min, max and mean per field over fixed, UTC aligned buckets"""
+
+    def __init__(self, directory, size, fields):
+        self.size = size
+        self.fields = fields
+        columns = [f"{field}.{stat}" for field in fields for stat in STATS]
+        self.series = Series(directory, columns + ["count"])
+        self._start = None
+        self._stats = {}
+        self._count = 0
+
+    def bucket(self, timestamp):
+        return timestamp - timestamp % self.size
+
+    @property
+    def resume_from(self):
+        """Return the time from which raw samples belong to the open bucket"""
+        last = self.series.time.last()
+        return None if last is None else last + self.size
+
+    def add(self, timestamp, values):
+        """Add a sample, writing the previous bucket once a new one starts"""
+        bucket = self.bucket(timestamp)
+        if self._start is not None and bucket != self._start:
+            self.series.append([self._start], [self._row()])
+            self._start = None
+        if self._start is None:
+            self._start = bucket
+            self._stats = {}
+            self._count = 0
+        self._count += 1
+        for field, value in values.items():
+            if math.isnan(value):
+                continue
+            stats = self._stats.get(field)
+            if stats is None:
+                self._stats[field] = [value, value, value, 1]
+            else:
+                stats[0] = min(stats[0], value)
+                stats[1] = max(stats[1], value)
+                stats[2] += value
+                stats[3] += 1
+
+    def _row(self):
+        row = {"count": float(self._count)}
+        for field, (low, high, total, count) in self._stats.items():
+            row[field + ".min"] = low
+            row[field + ".max"] = high
+            row[field + ".mean"] = total / count
+        return row
+
+    def open_bucket(self):
+        """Return (start, row) of the bucket still being filled, or None"""
+        if self._start is None:
+            return None
+        return self._start, self._row()
+
+
+def _json_values(values):
+    """Return the values as a list with None for NaN, which JSON lacks"""
+    return [None if value != value else value for value in values.tolist()]
+
+
+class TelemetryStore:
+    """Append-only telemetry of one vehicle, queried through memory maps
+
+    Every sample goes to a raw series and into hourly and daily rollups.
+    Each series is a directory with one float64 file per column, so a
+    chart reads only the columns it shows. Writes are blocking, run them
+    in the executor.
+    """
+
+    def __init__(self, directory, fields=tuple(TELEMETRY_FIELDS)):
+        self.directory = directory
+        self.fields = fields
+        self._lock = threading.Lock()
+        self.raw = Series(os.path.join(directory, "raw"), fields)
+        self.rollups = {
+            name: Rollup(os.path.join(directory, name), size, fields)
+            for name, size in ROLLUPS.items()
+        }
+        self._reopen_buckets()
+
+    def _reopen_buckets(self):
+        """Rebuild the open rollup buckets from the raw samples after them"""
+        for rollup in self.rollups.values():
+            resume_from = rollup.resume_from
+            first = 0 if resume_from is None else self.raw.time.search(resume_from)
+            timestamps, columns = self.raw.read(first, None, self.fields)
+            for index, timestamp in enumerate(timestamps):
+                rollup.add(timestamp, {field: columns[field][index] for field in self.fields})
+
+    def append(self, timestamp, values):
+        """Store a sample, returns False when it is not newer than the last one"""
+        with self._lock:
+            last = self.raw.time.last()
+            if last is not None and timestamp <= last:
+                return False
+            self.raw.append([timestamp], [values])
+            for rollup in self.rollups.values():
+                rollup.add(timestamp, values)
+            return True
+
+    @staticmethod
+    def pick_resolution(start, end):
+        if end - start <= RAW_WINDOW:
+            return "raw"
+        if end - start <= HOURLY_WINDOW:
+            return "hour"
+        return "day"
+
+    def query(self, start, end, resolution=None, fields=None):
+        """Return the samples or rollups between two epoch times
+
+        Resolution is "raw", "hour" or "day", picked from the window length
+        when not given. Rollups include the bucket still being filled.
+        """
+        fields = list(fields or self.fields)
+        resolution = resolution or self.pick_resolution(start, end)
+        with self._lock:
+            if resolution == "raw":
+                first, last = self.raw.window(start, end)
+                timestamps, columns = self.raw.read(first, last, fields)
+                return {
+                    "resolution": resolution,
+                    "time": list(timestamps),
+                    **{field: _json_values(columns[field]) for field in fields},
+                }
+
+            rollup = self.rollups[resolution]
+            names = [f"{field}.{stat}" for field in fields for stat in STATS]
+            first, last = rollup.series.window(rollup.bucket(start), end)
+            timestamps, columns = rollup.series.read(first, last, names)
+            timestamps = list(timestamps)
+            columns = {name: _json_values(values) for name, values in columns.items()}
+            open_bucket = rollup.open_bucket()
+            if open_bucket is not None and rollup.bucket(start) <= open_bucket[0] <= end:
+                timestamps.append(open_bucket[0])
+                for name in names:
+                    columns[name].extend(_json_values(array("d", [open_bucket[1].get(name, NAN)])))
+
+        result = {"resolution": resolution, "time": timestamps}
+        for field in fields:
+            result[field] = {stat: columns[f"{field}.{stat}"] for stat in STATS}
+        return result
+
+    def close(self):
+        with self._lock:
+            self.raw.close()
+            for rollup in self.rollups.values():
+                rollup.series.close()
@@ -0,0 +1,151 @@
+"""In-memory FordConnect token handling"""
+
+import asyncio
+import logging
+import time
+
+from .deadline import create_detached_task
+from .persistence import atomic_write_json, read_json, remove_json
+
+_LOGGER = logging.getLogger(__name__)
+
+# Refresh this many seconds before the token expires
+REFRESH_MARGIN = 300
+# Wait this long before retrying a failed proactive refresh
+REFRESH_RETRY_DELAY = 60
+
+
+class TokenManager:
+    """Keeps the OAuth token in memory and refreshes it ahead of expiry
+
+    The token file is read once, concurrent refreshes share a single request
+    and the file is only rewritten, in the executor, when the token changes.
+    """
+
+    def __init__(self, token_location, refresh_func, refresh_margin=REFRESH_MARGIN):
+        self.token_location = token_location
+        self._refresh_func = refresh_func
+        self._refresh_margin = refresh_margin
+        self._token = None
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._refresh_task = None
+        self._refresh_timer = None
+        self._write_task = None
+        self._retry_after = 0
+
+    @property
+    def access_token(self):
+        """Return the current access token, without refreshing it"""
+        return self._token.get("access_token") if self._token else None
+
+    @property
+    def expires_at(self):
+        """Return the expiry time of the current token"""
+        return self._token.get("expires_on") if self._token else None
+
+    async def async_get_access_token(self):
+        """Return a valid access token, refreshing it first if it has expired"""
+        if not self._loaded:
+            await self._async_load()
+
+        expires_at = self.expires_at
+        if expires_at:
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                _LOGGER.debug("No token, or has expired, requesting new token")
+                await self.async_refresh()
+            elif remaining <= self._refresh_margin and time.time() >= self._retry_after:
+                self._start_refresh()
+
+        return self.access_token
+
+    async def async_set(self, token):
+        """Replace the token, e.g. after the initial authorization"""
+        self._loaded = True
+        self._update(token)
+
+    async def async_refresh(self):
+        """Refresh the token, joining a refresh that is already running"""
+        return await asyncio.shield(self._start_refresh())
+
+    async def async_clear(self):
+        """Forget the in-memory token and remove the token file"""
+        self.close()
+        self._token = None
+        self._loaded = False
+        await asyncio.get_running_loop().run_in_executor(None, self.remove_token)
+
+    def close(self):
+        """Stop any scheduled refresh"""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+    def _start_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            # Shared by every caller, so bound by none of their deadlines
+            self._refresh_task = create_detached_task(self._async_do_refresh())
+            self._refresh_task.add_done_callback(self._refresh_done)
+        return self._refresh_task
+
+    async def _async_do_refresh(self):
+        _LOGGER.info("Refreshing fordpass token")
+        try:
+            result = await self._refresh_func(self._token)
+        except Exception:
+            self._retry_after = time.time() + REFRESH_RETRY_DELAY
+            raise
+        if result:
+            self._update(result)
+        return result
+
+    async def _async_load(self):
+        async with self._load_lock:
+            if self._loaded:
+                return
+            token = await asyncio.get_running_loop().run_in_executor(None, self.read_token)
+            self._loaded = True
+            if token:
+                self._token = token
+                self._schedule_refresh()
+
+    def _update(self, token):
+        if token == self._token:
+            return
+        self._token = token
+        self._schedule_refresh()
+        self._write_task = asyncio.get_running_loop().run_in_executor(None, self.write_token, token)
+        self._write_task.add_done_callback(self._write_done)
+
+    def _write_done(self, future):
+        if not future.cancelled() and future.exception() is not None:
+            _LOGGER.warning("Could not save fordpass token: %s", future.exception())
+
+    def _schedule_refresh(self):
+        self.close()
+        expires_at = self.expires_at
+        if not expires_at:
+            return
+        delay = max(expires_at - time.time() - self._refresh_margin, 0)
+        self._refresh_timer = asyncio.get_running_loop().call_later(delay, self._refresh_due)
+
+    def _refresh_due(self):
+        self._refresh_timer = None
+        self._start_refresh()
+
+    def _refresh_done(self, task):
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.warning("Token refresh failed: %s", task.exception())
+
+    def write_token(self, token):
+        """Save token to file for reuse"""
+        atomic_write_json(self.token_location, token)
+
+    def remove_token(self):
+        """Remove the saved token file"""
+        remove_json(self.token_location)
+
+    def read_token(self):
+        """Read saved token from file, returns None if there is none"""
+        return read_json(self.token_location)
@@ -0,0 +1,128 @@
+"""Trips of a vehicle detected from its location samples"""
+
+import logging
+import math
+from collections import deque
+
+_LOGGER = logging.getLogger(__name__)
+
+TRIP_HISTORY_SIZE = 50
+# Movement below this many metres between samples is GPS noise
+MIN_MOVE = 75
+# A trip ends when the car has not moved for this many seconds
+STOP_AFTER = 600
+
+EARTH_RADIUS = 6371008.8
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Return the distance in metres between two points"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(min(a, 1.0)))
+
+
+class Trip:
+    """A journey between two stops"""
+
+    __slots__ = ("start", "end", "distance", "start_location", "end_location", "max_speed")
+
+    def __init__(self, start, location):
+        self.start = start
+        self.end = start
+        self.distance = 0.0
+        self.start_location = location
+        self.end_location = location
+        self.max_speed = 0.0
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def as_dict(self):
+        return {
+            "start": self.start,
+            "end": self.end,
+            "distance": round(self.distance / 1000, 2),
+            "duration": round(self.duration),
+            "start_location": self.start_location,
+            "end_location": self.end_location,
+            "max_speed": self.max_speed,
+        }
+
+
+class TripDetector:
+    """Splits location samples into trips as they arrive
+
+    Every new sample only looks at the previous one, so only that one is
+    kept. A trip starts when the car moves and ends once it has stood still
+    for STOP_AFTER seconds.
+    """
+
+    def __init__(self, trip_history=TRIP_HISTORY_SIZE):
+        # (timestamp, latitude, longitude, speed) of the newest sample
+        self.last_sample = None
+        self.trips = deque(maxlen=trip_history)
+        self.current = None
+        self._anchor = None
+        self._last_move = None
+
+    def add(self, timestamp, latitude, longitude, speed=0.0):
+        """Add a location sample, returns True when it changed the trips"""
+        previous = self.last_sample
+        if previous is not None and timestamp <= previous[0]:
+            # A repeat of the last sample
+            return False
+        self.last_sample = (timestamp, latitude, longitude, speed or 0.0)
+        if previous is None:
+            self._anchor = (latitude, longitude)
+            return False
+
+        # Measured from the last place the car stood, so slow GPS drift never adds up
+        moved = haversine(self._anchor[0], self._anchor[1], latitude, longitude)
+        if moved >= MIN_MOVE or (speed or 0) > 0:
+            if self.current is not None and timestamp - self._last_move >= STOP_AFTER:
+                # Parked in between without a sample to end the trip, it ended where the car stopped
+                self._end_trip()
+            if self.current is None:
+                # After a long gap the car left at an unknown time, start the trip at this sample
+                start = previous[0] if timestamp - previous[0] < STOP_AFTER else timestamp
+                self.current = Trip(start, self._anchor)
+            self.current.distance += moved
+            self.current.end = timestamp
+            self.current.end_location = (latitude, longitude)
+            self.current.max_speed = max(self.current.max_speed, speed or 0.0)
+            self._anchor = (latitude, longitude)
+            self._last_move = timestamp
+            return True
+
+        if self.current is not None and timestamp - self._last_move >= STOP_AFTER:
+            self._end_trip()
+            return True
+        return False
+
+    def _end_trip(self):
+        _LOGGER.debug("Trip of %.1f km ended", self.current.distance / 1000)
+        self.trips.append(self.current)
+        self.current = None
+
+    @property
+    def last_trip(self):
+        """Return the running trip, or the last finished one"""
+        if self.current is not None:
+            return self.current
+        return self.trips[-1] if self.trips else None
+
+    def distance_since(self, timestamp):
+        """Return the metres driven in trips since a point in time"""
+        total = sum(trip.distance for trip in self.trips if trip.start >= timestamp)
+        if self.current is not None and self.current.start >= timestamp:
+            total += self.current.distance
+        return total
+
+    def trips_since(self, timestamp):
+        trips = sum(1 for trip in self.trips if trip.start >= timestamp)
+        return trips + (self.current is not None and self.current.start >= timestamp)
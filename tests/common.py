@@ -0,0 +1,58 @@
+"""Home Assistant with FordPass entries talking to the FordConnect stand-in"""
+
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if os.path.join(ROOT, "benchmarks") not in sys.path:
+    sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# pylint: disable=wrong-import-position
+from bench_e2e import make_account, write_token  # noqa: E402
+from fordconnect_standin import FordConnectStandin, StandinConfig  # noqa: E402
+
+from homeassistant import bootstrap, runner  # noqa: E402
+from homeassistant.config_entries import ConfigEntry  # noqa: E402
+
+from custom_components.fordpass.const import (  # noqa: E402
+    ACCOUNTS,
+    CONF_DISTANCE_UNIT,
+    CONF_PRESSURE_UNIT,
+    DEFAULT_DISTANCE_UNIT,
+    DEFAULT_PRESSURE_UNIT,
+    DOMAIN,
+    VIN,
+)
+
+__all__ = ["FordConnectStandin", "StandinConfig", "async_start_hass", "async_add_entry", "use_standin"]
+
+
+async def async_start_hass(config_dir):
+    """Boot Home Assistant with an empty configuration"""
+    with open(os.path.join(config_dir, "configuration.yaml"), "w", encoding="utf-8") as outfile:
+        outfile.write("homeassistant:\n  name: test\n")
+    hass = await bootstrap.async_setup_hass(runner.RuntimeConfig(config_dir=str(config_dir), skip_pip=True))
+    logging.getLogger().setLevel(logging.WARNING)
+    return hass
+
+
+def use_standin(hass, standin, directory, client_id):
+    """Register an account for client_id that talks to the stand-in, entries on it share it"""
+    account = make_account(None, standin, str(directory), client_id)
+    write_token(account, standin, 3600)
+    hass.data.setdefault(DOMAIN, {}).setdefault(ACCOUNTS, {})[client_id] = account
+    return account
+
+
+async def async_add_entry(hass, standin, directory, vin, client_id="test", options=None):
+    """Add and set up a single vehicle entry"""
+    use_standin(hass, standin, directory, client_id)
+    entry = ConfigEntry(
+        version=1, minor_version=1, domain=DOMAIN, title=vin, source="user",
+        data={"client_id": client_id, "client_secret": "secret", VIN: vin},
+        options={CONF_PRESSURE_UNIT: DEFAULT_PRESSURE_UNIT, CONF_DISTANCE_UNIT: DEFAULT_DISTANCE_UNIT, **(options or {})},
+    )
+    await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+    return entry
@@ -0,0 +1,63 @@
+"""Tests for serving FordConnect responses from the cache"""
+
+import asyncio
+import logging
+
+import aiohttp
+import pytest
+
+from custom_components.fordpass.circuit_breaker import CircuitBreakers
+
+from .common import FordConnectStandin, StandinConfig
+from bench_e2e import make_account, write_token
+
+
+def run_with_account(tmp_path, test):
+    async def scenario():
+        standin = await FordConnectStandin(StandinConfig(vehicles=2)).start()
+        account = make_account(None, standin, str(tmp_path))
+        write_token(account, standin, 3600)
+        try:
+            await test(standin, account)
+        finally:
+            await account.async_close()
+            await standin.stop()
+
+    asyncio.run(scenario())
+
+
+def test_uncached_vehicle_list_shows_new_vehicles_and_errors(tmp_path):
+    async def test(standin, account):
+        assert len(await account.vehicles()) == 2
+        standin.add_vehicle("1FMCU9J94NU999999")
+        # The cached list is still fresh, the config flow asks the API
+        assert len(await account.vehicles()) == 2
+        assert len(await account.vehicles(cached=False)) == 3
+
+        standin.config.error_rate = 1.0
+        with pytest.raises(aiohttp.ClientResponseError):
+            await account.vehicles(cached=False)
+
+    run_with_account(tmp_path, test)
+
+
+def test_failed_refresh_served_from_cache_is_logged_once(tmp_path, caplog):
+    async def test(standin, account):
+        # Keep the circuit closed, every refresh should try the API
+        account.breakers = CircuitBreakers(threshold=100)
+        vehicle = account.vehicle(next(iter(standin.vehicles)))
+        await vehicle.status(cached=False)
+
+        standin.config.error_rate = 1.0
+        with caplog.at_level(logging.INFO, logger="custom_components.fordpass"):
+            for _ in range(2):
+                assert await vehicle.status(cached=False)
+            warnings = [record for record in caplog.records if record.levelno == logging.WARNING and record.name.endswith("fordpass_new")]
+            assert len(warnings) == 1
+
+            standin.config.error_rate = 0.0
+            standin.update_vehicle(vehicle.vin, "vehicleDetails", "odometer", 1.0)
+            await vehicle.status(cached=False)
+            assert any("works again" in record.message for record in caplog.records)
+
+    run_with_account(tmp_path, test)
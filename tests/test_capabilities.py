@@ -0,0 +1,54 @@
+"""Tests for following capability changes of a vehicle"""
+
+from homeassistant.config_entries import ConfigEntryState
+
+from custom_components.fordpass import CAPABILITY_CONFIRMATIONS
+
+from .test_entities import changed_document, run_with_entry
+
+TRACKER = "device_tracker.fordpass_tracker"
+TRIP_SENSOR = "sensor.fordpass_trips_today"
+
+
+async def poll(hass, coordinator, odometer, location):
+    coordinator.async_set_vehicle_data(changed_document(coordinator, odometer, location))
+    await hass.async_block_till_done()
+
+
+def test_transient_change_keeps_entities(tmp_path):
+    async def test(hass, coordinator):
+        location = coordinator.data.location
+
+        await poll(hass, coordinator, 1000.0, None)
+        await poll(hass, coordinator, 1001.0, location)
+
+        assert hass.states.get(TRACKER) is not None
+        assert coordinator.capabilities["gps"]
+
+    run_with_entry(tmp_path, test)
+
+
+def test_confirmed_change_updates_entities(tmp_path):
+    async def test(hass, coordinator):
+        entry = coordinator.entry
+        location = coordinator.data.location
+        lock = hass.states.get("lock.fordpass_doorlock")
+
+        for odometer in range(CAPABILITY_CONFIRMATIONS):
+            assert hass.states.get(TRACKER) is not None
+            await poll(hass, coordinator, 1000.0 + odometer, None)
+
+        assert entry.state is ConfigEntryState.LOADED
+        assert hass.states.get(TRACKER) is None
+        assert hass.states.get(TRIP_SENSOR) is None
+        # Entities of unchanged capabilities are kept, not recreated
+        assert hass.states.get("lock.fordpass_doorlock").last_changed == lock.last_changed
+
+        for odometer in range(CAPABILITY_CONFIRMATIONS):
+            await poll(hass, coordinator, 2000.0 + odometer, location)
+
+        assert entry.state is ConfigEntryState.LOADED
+        assert hass.states.get(TRACKER) is not None
+        assert hass.states.get(TRIP_SENSOR) is not None
+
+    run_with_entry(tmp_path, test)
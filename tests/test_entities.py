@@ -0,0 +1,61 @@
+"""Tests for publishing coordinator updates to the entities"""
+
+import asyncio
+import copy
+
+from custom_components.fordpass.const import COORDINATOR, DOMAIN
+from custom_components.fordpass.device_tracker import CarTracker
+from custom_components.fordpass.state import VehicleState
+
+from .common import FordConnectStandin, async_add_entry, async_start_hass
+
+
+def run_with_entry(tmp_path, test):
+    async def scenario():
+        standin = await FordConnectStandin().start()
+        hass = await async_start_hass(tmp_path)
+        try:
+            entry = await async_add_entry(hass, standin, tmp_path, next(iter(standin.vehicles)))
+            await test(hass, hass.data[DOMAIN][entry.entry_id][COORDINATOR])
+        finally:
+            await hass.async_stop(force=True)
+            await standin.stop()
+
+    asyncio.run(scenario())
+
+
+def changed_document(coordinator, odometer, location):
+    vehicle = copy.deepcopy(coordinator.data.as_dict())
+    del vehicle["metrics"]
+    vehicle["vehicleDetails"]["odometer"] = odometer
+    vehicle["vehicleLocation"] = location
+    return VehicleState(vehicle)
+
+
+def test_null_location_does_not_stop_other_entities(tmp_path):
+    async def test(hass, coordinator):
+        assert hass.states.get("device_tracker.fordpass_tracker").state != "unknown"
+
+        coordinator.async_set_vehicle_data(changed_document(coordinator, 12345.0, None))
+        await hass.async_block_till_done()
+
+        assert hass.states.get("sensor.fordpass_odometer").state == "12345"
+        assert hass.states.get("device_tracker.fordpass_tracker").state == "unknown"
+
+    run_with_entry(tmp_path, test)
+
+
+def test_raising_entity_does_not_stop_other_entities(tmp_path, monkeypatch):
+    async def test(hass, coordinator):
+        location = coordinator.data.location
+
+        def broken(self):
+            raise KeyError("latitude")
+
+        monkeypatch.setattr(CarTracker, "latitude", property(broken))
+        coordinator.async_set_vehicle_data(changed_document(coordinator, 23456.0, {**location, "latitude": 1.0}))
+        await hass.async_block_till_done()
+
+        assert hass.states.get("sensor.fordpass_odometer").state == "23456"
+
+    run_with_entry(tmp_path, test)
@@ -0,0 +1,135 @@
+"""Parity of the compiled sensor extractors with the per-sensor code they replaced"""
+
+import copy
+import json
+import os
+from datetime import datetime
+
+import pytest
+from homeassistant.util import dt
+
+from custom_components.fordpass.const import SENSORS
+from custom_components.fordpass.extractors import SensorValues
+from custom_components.fordpass.state import VehicleState
+
+PAYLOAD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "payloads", "vehicle_v3.json")
+
+
+def baseline_value(sensor, data, ftype):
+    """CarSensor.get_value before the extractors, on the merged document it used"""
+    metrics = data.get("metrics", {})
+    if ftype == "state":
+        if sensor == "odometer":
+            odometer = metrics.get("odometer", None)
+            return round(odometer) if odometer is not None else None
+        if sensor == "fuel":
+            fuel_level = metrics.get("fuelLevel", None)
+            return round(fuel_level.get("value", 0)) if fuel_level is not None else None
+        if sensor == "hvBattery":
+            soc = metrics.get("batteryChargeLevel", None)
+            return round(soc.get("value", 0)) if soc is not None else None
+        if sensor == "tirePressureWarning":
+            return metrics.get("tirePressureWarning", "Unsupported")
+        if sensor == "alarm":
+            return metrics.get("alarmStatus", {}).get("value", "Unsupported")
+        if sensor == "ignitionStatus":
+            return metrics.get("ignitionStatus", {}).get("value", "Unsupported")
+        if sensor == "firmwareUpgradeInProgress":
+            return metrics.get("firmwareUpgradeInProgress", "Unsupported")
+        if sensor == "deepSleepInProgress":
+            return metrics.get("deepSleepInProgress", "Unsupported")
+        if sensor == "hvChargingStatus":
+            return metrics.get("chargingStatus", {}).get("value", "Unsupported")
+        if sensor == "hvPlugStatus":
+            return metrics.get("plugStatus", {}).get("value", "Unsupported")
+        if sensor == "doorStatus":
+            for value in metrics.get("doorStatus", []):
+                if value["value"] in ["CLOSED", "Invalid", "UNKNOWN"]:
+                    continue
+                return "Open"
+            if data.get("hoodStatus", {}).get("value") == "OPEN":
+                return "Open"
+            return "Closed"
+        if sensor == "windowPosition":
+            for window in data.get("windowStatus", []):
+                windowrange = window.get("value", {}).get("doubleRange", {})
+                if windowrange.get("lowerBound", 0.0) != 0.0 or windowrange.get("upperBound", 0.0) != 0.0:
+                    return "Open"
+            return "Closed"
+        if sensor == "lastRefresh":
+            return dt.as_local(datetime.strptime(data.get("lastUpdated", "") + " +0000", "%m-%d-%Y %H:%M:%S %z"))
+        if sensor == "remoteStartStatus":
+            countdown_timer = data.get("remoteStartCountdownTimer", {}).get("value", 0)
+            return "Active" if countdown_timer > 0 else "Inactive"
+        if sensor == "speed":
+            return metrics.get("vehicleLocation", {}).get("speed", "Unsupported")
+        if sensor == "deepSleep":
+            return metrics.get("deepSleepStatus", "Unsupported")
+        return None
+
+    if sensor == "odometer":
+        return {}
+    if sensor == "hvBattery":
+        return {"distanceToEmpty": metrics.get("batteryChargeLevel", {}).get("distanceToEmpty", None)}
+    if sensor == "alarm":
+        return metrics.get("alarmStatus", {})
+    if sensor == "ignitionStatus":
+        return metrics.get("ignitionStatus", {})
+    if sensor == "firmwareUpgradeInProgress":
+        return metrics.get("firmwareUpgradeInProgress", {})
+    if sensor == "doorStatus":
+        doors = {}
+        for value in metrics.get("doorStatus", []):
+            if value["vehicleDoor"] == "UNSPECIFIED_FRONT":
+                doors["FRONT_" + value["vehicleOccupantRole"]] = value.get("value", None)
+            else:
+                doors[value["vehicleDoor"]] = value.get("value", None)
+        if "hoodStatus" in data:
+            doors["HOOD"] = data["hoodStatus"]["value"]
+        return doors or None
+    if sensor == "windowPosition":
+        windows = {}
+        for window in data.get("windowStatus", []):
+            if window["vehicleWindow"] == "UNSPECIFIED_FRONT":
+                windows[window["vehicleSide"]] = window
+            else:
+                windows[window["vehicleWindow"]] = window
+        return windows
+    if sensor == "remoteStartStatus":
+        return {"Countdown:": data.get("remoteStartCountdownTimer", {}).get("value", 0)}
+    return None
+
+
+def edit(vehicle, change):
+    vehicle = copy.deepcopy(vehicle)
+    change(vehicle)
+    return vehicle
+
+
+def documents():
+    with open(PAYLOAD, encoding="utf-8") as infile:
+        vehicle = json.load(infile)["vehicle"]
+    status, details = "vehicleStatus", "vehicleDetails"
+    return {
+        "recorded": vehicle,
+        "fuel without value": edit(vehicle, lambda v: v[details]["fuelLevel"].pop("value")),
+        "no fuel level": edit(vehicle, lambda v: v[details].pop("fuelLevel")),
+        "battery without value": edit(vehicle, lambda v: v[details].__setitem__("batteryChargeLevel", {"distanceToEmpty": 120})),
+        "no alarm": edit(vehicle, lambda v: v[status].pop("alarmStatus", None)),
+        "firmware upgrade": edit(vehicle, lambda v: v[status].__setitem__("firmwareUpgradeInProgress", {"value": True, "timeStamp": "10-18-2026 11:39:48"})),
+        "door open": edit(vehicle, lambda v: v[status]["doorStatus"][0].__setitem__("value", "AJAR")),
+        "hood open": edit(vehicle, lambda v: v.__setitem__("hoodStatus", {"value": "OPEN"})),
+        "remote start": edit(vehicle, lambda v: v["remoteStartCountdownTimer"].__setitem__("value", 540)),
+    }
+
+
+@pytest.mark.parametrize("name", list(documents()))
+def test_extractors_match_baseline(name):
+    vehicle = documents()[name]
+    merged = {**vehicle, "metrics": {**vehicle["vehicleStatus"], **vehicle["vehicleDetails"]}}
+    values = SensorValues(SENSORS)
+    values.update(VehicleState(vehicle))
+
+    for sensor in SENSORS:
+        assert values.state(sensor) == baseline_value(sensor, merged, "state"), sensor
+        assert values.attributes(sensor) == baseline_value(sensor, merged, "attribute"), sensor
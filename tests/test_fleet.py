@@ -0,0 +1,42 @@
+"""Tests for sizing fleet refreshes to the request budget"""
+
+import logging
+import time
+
+from custom_components.fordpass.fleet import FleetRefresher
+from custom_components.fordpass.rate_limit import RateLimiter
+
+
+async def refresh(vin):
+    return None
+
+
+def test_polling_interval_shares_the_budget():
+    limiter = RateLimiter(limit=300, window=3600, reserve=20)
+
+    assert limiter.polling_interval(0) == 0
+    assert limiter.polling_interval(28) == 360
+    assert limiter.polling_interval(56) == 720
+
+
+def test_refresher_stretches_the_interval_to_the_budget(caplog):
+    refresher = FleetRefresher(refresh, 60, min_interval=lambda: 600)
+    start = time.monotonic()
+
+    with caplog.at_level(logging.WARNING):
+        refresher.add(["one", "two"])
+
+    # First slots spread over the interval the budget allows, not the configured one
+    assert max(refresher._due.values()) - start >= 599  # pylint: disable=protected-access
+    assert refresher.budget_limited
+    assert "does not fit the FordConnect request budget" in caplog.text
+
+
+def test_refresher_keeps_the_interval_within_the_budget():
+    refresher = FleetRefresher(refresh, 900, min_interval=lambda: 600)
+    start = time.monotonic()
+
+    refresher.add(["one", "two"])
+
+    assert max(refresher._due.values()) - start <= 901  # pylint: disable=protected-access
+    assert not refresher.budget_limited
@@ -0,0 +1,97 @@
+"""Tests for push mode, fed the documents benchmarks/push_payloads.py posts"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.fordpass import FordPassDataUpdateCoordinator
+from custom_components.fordpass.fordpass_new import Account
+from custom_components.fordpass.push import InvalidPush, PushReceiver
+from custom_components.fordpass.scheduler import PollScheduler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from push_payloads import updates  # noqa: E402  pylint: disable=wrong-import-position
+
+VIN = "1FMCU9J94NU000001"
+
+
+async def run_with_coordinator(tmp_path, test):
+    hass = HomeAssistant(str(tmp_path))
+    account = Account(None, "client", "secret", token_location=str(tmp_path / "token.txt"), cache_location=str(tmp_path) + "/")
+    coordinator = FordPassDataUpdateCoordinator(hass, account, VIN, 300, scheduler=PollScheduler(300, 1000))
+    try:
+        test(PushReceiver([coordinator]), coordinator)
+    finally:
+        await account.async_close()
+        await hass.async_stop(force=True)
+
+
+def test_parse_accepts_recorded_documents(tmp_path):
+    def test(receiver, coordinator):
+        for notification in updates(VIN, 20, stale=False):
+            found, full, sections = receiver._parse(notification)  # pylint: disable=protected-access
+            assert found is coordinator
+            assert full == ("vehicle" in notification)
+            assert sections
+
+    asyncio.run(run_with_coordinator(tmp_path, test))
+
+
+def test_recorded_documents_reach_the_coordinator(tmp_path):
+    def test(receiver, coordinator):
+        results = [receiver.apply(notification) for notification in updates(VIN, 20, stale=True)]
+
+        assert results[0] == "applied"
+        assert results.count("stale") == 4
+        assert receiver.stats["applied"] == 17
+        data = coordinator.data
+        assert data.vin == VIN
+        assert data["remoteStartCountdownTimer"]["value"] == 0
+        assert data.lock_status == "LOCKED"
+        assert coordinator.sensor_values.state("remoteStartStatus") == "Inactive"
+
+    asyncio.run(run_with_coordinator(tmp_path, test))
+
+
+def test_partial_update_with_a_bare_countdown_is_rejected(tmp_path):
+    def test(receiver, coordinator):
+        receiver.apply(next(updates(VIN, 0, stale=False)))
+        with pytest.raises(InvalidPush):
+            receiver.apply({"vin": VIN, "remoteStartCountdownTimer": 600})
+        assert coordinator.data["remoteStartCountdownTimer"]["value"] == 0
+
+    asyncio.run(run_with_coordinator(tmp_path, test))
+
+
+def test_full_document_with_a_wrong_section_is_rejected(tmp_path):
+    def test(receiver, coordinator):
+        full = next(updates(VIN, 0, stale=False))
+        receiver.apply(full)
+        for broken in ({"vehicleStatus": "LOCKED"}, {"windowStatus": {}}, {"vehicleDetails": None}):
+            with pytest.raises(InvalidPush):
+                receiver.apply({"vehicle": {**full["vehicle"], **broken}})
+        without_status = {key: value for key, value in full["vehicle"].items() if key != "vehicleStatus"}
+        with pytest.raises(InvalidPush):
+            receiver.apply({"vehicle": without_status})
+        # The API sends null for a location it does not have
+        assert receiver.apply({"vehicle": {**full["vehicle"], "vehicleLocation": None}}) == "applied"
+
+    asyncio.run(run_with_coordinator(tmp_path, test))
+
+
+def test_poll_corrects_a_pushed_update(tmp_path):
+    def test(receiver, coordinator):
+        response = next(updates(VIN, 0, stale=False))
+        coordinator.async_push(coordinator.vehicle._parse_status(response))  # pylint: disable=protected-access
+        receiver.apply({"vin": VIN, "hoodStatus": {"value": "OPEN"}})
+        assert coordinator.data["hoodStatus"]["value"] == "OPEN"
+
+        # The safety net poll still returns the document from before the push
+        polled = coordinator.vehicle._parse_status(response)  # pylint: disable=protected-access
+        assert polled["hoodStatus"]["value"] == response["vehicle"]["hoodStatus"]["value"]
+
+    asyncio.run(run_with_coordinator(tmp_path, test))
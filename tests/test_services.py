@@ -0,0 +1,49 @@
+"""Tests for the services with more than one entry loaded"""
+
+import asyncio
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.fordpass.const import DOMAIN
+
+from .common import FordConnectStandin, StandinConfig, async_add_entry, async_start_hass, use_standin
+
+
+def test_services_find_their_vehicle_at_call_time(tmp_path):
+    async def scenario():
+        standin = await FordConnectStandin(StandinConfig(vehicles=2)).start()
+        hass = await async_start_hass(tmp_path)
+        first, second = standin.vehicles
+        try:
+            entry_one = await async_add_entry(hass, standin, tmp_path, first, "one")
+            entry_two = await async_add_entry(hass, standin, tmp_path, second, "two")
+
+            # The second entry registered last, the call must still reach the first vehicle
+            before = dict(standin.status_requests)
+            await hass.services.async_call(DOMAIN, "poll_api", {"vin": first}, blocking=True)
+            assert standin.status_requests[first] == before[first] + 1
+            assert standin.status_requests[second] == before[second]
+
+            with pytest.raises(HomeAssistantError):
+                await hass.services.async_call(DOMAIN, "poll_api", {"vin": "UNKNOWN"}, blocking=True)
+
+            # Setting the first entry up again gives it a new account, services use that one
+            assert await hass.config_entries.async_unload(entry_one.entry_id)
+            use_standin(hass, standin, tmp_path, "one")
+            assert await hass.config_entries.async_setup(entry_one.entry_id)
+            before = dict(standin.status_requests)
+            await hass.services.async_call(DOMAIN, "poll_api", {"vin": first}, blocking=True)
+            assert standin.status_requests[first] == before[first] + 1
+            assert standin.status_requests[second] == before[second]
+
+            assert await hass.config_entries.async_unload(entry_one.entry_id)
+            assert hass.services.has_service(DOMAIN, "poll_api")
+            assert await hass.config_entries.async_unload(entry_two.entry_id)
+            assert not hass.services.has_service(DOMAIN, "poll_api")
+            assert not hass.services.has_service(DOMAIN, "telemetry")
+        finally:
+            await hass.async_stop(force=True)
+            await standin.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+"""Tests for recording telemetry and locations of a vehicle"""
+
+import copy
+import time
+
+import pytest
+import voluptuous as vol
+
+from custom_components.fordpass import TELEMETRY_DIRECTORY, TELEMETRY_SCHEMA
+from custom_components.fordpass.state import VehicleState
+from custom_components.fordpass.telemetry import TelemetryStore
+
+from .test_entities import changed_document, run_with_entry
+
+
+def test_samples_are_stored_before_unload(tmp_path):
+    async def test(hass, coordinator):
+        for odometer in range(5):
+            vehicle = copy.deepcopy(changed_document(coordinator, 1000.0 + odometer, coordinator.data.location).as_dict())
+            vehicle["lastUpdated"] = time.strftime("%m-%d-%Y %H:%M:%S", time.gmtime(time.time() - 60 + odometer))
+            coordinator.async_set_vehicle_data(VehicleState(vehicle))
+        # Unload right away, the queued samples must still be written
+        assert await hass.config_entries.async_unload(coordinator.entry.entry_id)
+        assert coordinator.telemetry is None
+
+        store = TelemetryStore(hass.config.path(TELEMETRY_DIRECTORY, coordinator.vin))
+        samples = store.query(0, time.time() + 60, "raw", ["odometer"])
+        store.close()
+        assert samples["odometer"][-5:] == [1000.0, 1001.0, 1002.0, 1003.0, 1004.0]
+
+    run_with_entry(tmp_path, test)
+
+
+@pytest.mark.parametrize("location", [
+    {"latitude": 52.0, "longitude": None},
+    {"latitude": 52.0},
+    {"latitude": "north", "longitude": 4.9},
+])
+def test_unusable_location_is_skipped(tmp_path, location):
+    async def test(hass, coordinator):
+        last_sample = coordinator.trips.last_sample
+        document = changed_document(coordinator, 1000.0, {**location, "timeStamp": "01-01-2030 00:00:00"})
+
+        coordinator.async_set_vehicle_data(document)
+        await hass.async_block_till_done()
+
+        assert coordinator.trips.last_sample == last_sample
+        assert hass.states.get("sensor.fordpass_odometer").state == "1000"
+
+    run_with_entry(tmp_path, test)
+
+
+def test_hours_match_the_service_description():
+    with pytest.raises(vol.Invalid):
+        TELEMETRY_SCHEMA({"vin": "1", "hours": 0})
+    assert TELEMETRY_SCHEMA({"vin": "1", "hours": 1})["hours"] == 1
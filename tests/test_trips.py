@@ -0,0 +1,65 @@
+"""Tests for the trip detection"""
+
+from custom_components.fordpass.trips import STOP_AFTER, TripDetector
+
+START = 1_760_000_000.0
+# Roughly 110 m of latitude
+STEP = 0.001
+
+
+def drive(detector, start, latitude, samples):
+    """Add one sample a minute moving north, returns the last time and latitude"""
+    timestamp = start
+    for _ in range(samples):
+        timestamp += 60
+        latitude += STEP
+        detector.add(timestamp, latitude, 4.9, 50.0)
+    return timestamp, latitude
+
+
+def test_single_trip_ends_after_standing_still():
+    detector = TripDetector()
+    detector.add(START, 52.0, 4.9)
+    end, latitude = drive(detector, START, 52.0, 10)
+    assert detector.current is not None
+
+    detector.add(end + STOP_AFTER, latitude, 4.9)
+    assert detector.current is None
+    assert len(detector.trips) == 1
+    trip = detector.trips[0]
+    assert trip.start == START
+    assert trip.end == end
+    assert 1000 < trip.distance < 1200
+
+
+def test_long_park_without_samples_splits_trips():
+    """A park only shows as a gap, location samples arrive when the car moves"""
+    detector = TripDetector()
+    detector.add(START, 52.0, 4.9)
+    first_end, latitude = drive(detector, START, 52.0, 10)
+
+    park_end = first_end + 5 * 3600
+    second_end, _ = drive(detector, park_end, latitude, 10)
+
+    assert len(detector.trips) == 1
+    first = detector.trips[0]
+    assert first.start == START
+    assert first.end == first_end
+
+    second = detector.current
+    assert second is not None
+    # Starts at the first sample after the park, the park is in neither trip
+    assert second.start == park_end + 60
+    assert second.end == second_end
+    assert second.duration < STOP_AFTER
+    assert detector.trips_since(START) == 2
+    assert 2000 < detector.distance_since(START) < 2400
+
+
+def test_repeated_sample_is_ignored():
+    detector = TripDetector()
+    detector.add(START, 52.0, 4.9)
+    end, latitude = drive(detector, START, 52.0, 3)
+
+    assert not detector.add(end, latitude + STEP, 4.9, 50.0)
+    assert detector.last_sample == (end, latitude, 4.9, 50.0)